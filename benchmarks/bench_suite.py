@@ -0,0 +1,365 @@
+"""
+Reproducible benchmark suite for the exporters and vis().
+
+Builds a synthetic AnnData-like dataset and times write_laz_to_bytes,
+export_annotations_blob, export_continuous_obs_blob,
+export_continuous_gene_blob and the full vis() dispatch, uncached and
+served from the in-memory export cache (the first run fills it, the
+best of the others is a hit; the disk cache is off). For each it
+records wall time (best of ``--repeat`` runs), bytes produced and peak
+RSS, and writes everything to JSON together with the dataset parameters
+and the git commit, so runs from different commits can be compared with
+``--compare``.
+
+Usage:
+    python benchmarks/bench_suite.py --n-obs 1000000 --output bench.json
+    python benchmarks/bench_suite.py --n-obs 1000000 --compare bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+import spatialvista as spv
+from spatialvista.exporter import (
+    export_annotations_blob,
+    export_continuous_gene_blob,
+    export_continuous_obs_blob,
+    write_laz_to_bytes,
+)
+
+
+def make_dataset(
+    n_obs,
+    n_vars=500,
+    density=0.02,
+    n_categories=20,
+    n_sections=10,
+    n_annotations=2,
+    n_continuous=2,
+    dim=3,
+    seed=0,
+):
+    """
+    Synthetic AnnData stand-in that scales to tens of millions of cells.
+
+    X is CSR with ``round(n_vars * density)`` distinct genes per cell,
+    obs holds categorical "celltype" (``n_categories`` levels), "section"
+    (``n_sections`` levels), ``n_annotations`` further categoricals
+    "anno{i}" and ``n_continuous`` float columns "cont{i}", and
+    obsm["spatial"] holds uniform ``dim``-D coordinates.
+    """
+    rng = np.random.default_rng(seed)
+
+    # evenly spaced columns from a random start give distinct, sortable
+    # genes per row without a per-row sample
+    k = max(1, round(n_vars * density))
+    step = n_vars // k
+    start = rng.integers(0, n_vars, size=(n_obs, 1))
+    cols = np.sort((start + np.arange(k) * step) % n_vars, axis=1)
+    X = sp.csr_matrix(
+        (
+            rng.random(n_obs * k, dtype=np.float32) * 10,
+            cols.ravel().astype(np.int32),
+            np.arange(0, n_obs * k + 1, k, dtype=np.int64),
+        ),
+        shape=(n_obs, n_vars),
+    )
+    del cols, start
+
+    def categorical(n_levels, prefix):
+        return pd.Categorical.from_codes(
+            rng.integers(0, n_levels, n_obs),
+            categories=[f"{prefix}{i}" for i in range(n_levels)],
+        )
+
+    obs = {
+        "celltype": categorical(n_categories, "type"),
+        "section": categorical(n_sections, "section"),
+    }
+    for i in range(n_annotations):
+        obs[f"anno{i}"] = categorical(n_categories, f"anno{i}_")
+    for i in range(n_continuous):
+        obs[f"cont{i}"] = rng.normal(size=n_obs)
+
+    return SimpleNamespace(
+        X=X,
+        obs=pd.DataFrame(obs),
+        obsm={"spatial": rng.uniform(0, 10_000, size=(n_obs, dim))},
+        var_names=pd.Index([f"gene{i}" for i in range(n_vars)]),
+        layers={},
+        n_obs=n_obs,
+    )
+
+
+def _reset_peak_rss():
+    """Reset the kernel's peak-RSS counter (Linux); no-op elsewhere."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _rss_mb(field):
+    """VmRSS / VmHWM from /proc in MB, or None if unavailable."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _peak_rss_mb():
+    peak = _rss_mb("VmHWM")
+    if peak is not None:
+        return peak
+    # ru_maxrss is KiB on Linux and bytes on macOS (process lifetime peak)
+    scale = 1 / 1024 / 1024 if sys.platform == "darwin" else 1 / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def _nbytes(value):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(v) for v in value)
+    return 0
+
+
+def _vis_bytes(w):
+    return sum(
+        _nbytes(getattr(w, name))
+        for name in (
+            "laz_bytes",
+            "position_bytes",
+            "annotation_bins",
+            "continuous_bins",
+        )
+    )
+
+
+def _benchmarks(data, genes, vis_kwargs=None):
+    annotations = [c for c in data.obs if c.startswith("anno")]
+    continuous = [c for c in data.obs if c.startswith("cont")]
+    precision = (vis_kwargs or {}).get("precision")
+
+    def vis(cache):
+        return _vis_bytes(
+            spv.vis(
+                data,
+                position="spatial",
+                color="celltype",
+                section="section",
+                annotations=annotations,
+                continuous=continuous,
+                genes=genes,
+                cache=cache,
+                _wait_for_all_sends=True,
+                **(vis_kwargs or {}),
+            )
+        )
+
+    return {
+        "write_laz_to_bytes": lambda: _nbytes(
+            write_laz_to_bytes(data, "spatial")
+        ),
+        "export_annotations_blob": lambda: _nbytes(
+            export_annotations_blob(data, "celltype", "section", annotations)[1]
+        ),
+        "export_continuous_obs_blob": lambda: _nbytes(
+            export_continuous_obs_blob(
+                data, continuous, precision=precision
+            )[1]
+        ),
+        "export_continuous_gene_blob": lambda: _nbytes(
+            export_continuous_gene_blob(data, genes, precision=precision)[1]
+        ),
+        "vis": lambda: vis(cache=False),
+        "vis_memory_cache": lambda: vis(cache=True),
+    }
+
+
+def run(fn, repeat):
+    """Best wall time over ``repeat`` runs, bytes and peak RSS."""
+    _reset_peak_rss()
+    base = _rss_mb("VmRSS")
+    times = []
+    nbytes = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        nbytes = fn()
+        times.append(time.perf_counter() - t0)
+    peak = _peak_rss_mb()
+    return {
+        "wall_s": min(times),
+        "wall_s_all": times,
+        "bytes": int(nbytes),
+        "peak_rss_mb": round(peak, 1),
+        "rss_delta_mb": None if base is None else round(peak - base, 1),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _ratio(result, baseline, key):
+    """``result[key] / baseline[key]``, NaN without a baseline value."""
+    return result[key] / baseline[key] if baseline[key] else float("nan")
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    print(f"\ncompared with {baseline_path}")
+    print(f"{'benchmark':<30}{'time':>10}{'bytes':>10}{'peak RSS':>10}")
+    for r in results:
+        old = baseline.get(r["name"])
+        if old is None:
+            continue
+        print(
+            f"{r['name']:<30}{_ratio(r, old, 'wall_s'):>9.2f}x"
+            f"{_ratio(r, old, 'bytes'):>9.2f}x"
+            f"{_ratio(r, old, 'peak_rss_mb'):>9.2f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n-obs", type=int, default=1_000_000)
+    parser.add_argument("--n-vars", type=int, default=500)
+    parser.add_argument("--density", type=float, default=0.02)
+    parser.add_argument("--n-categories", type=int, default=20)
+    parser.add_argument("--n-sections", type=int, default=10)
+    parser.add_argument("--n-annotations", type=int, default=2)
+    parser.add_argument("--n-continuous", type=int, default=2)
+    parser.add_argument("--n-genes", type=int, default=20)
+    parser.add_argument("--dim", type=int, choices=[2, 3], default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--export-workers",
+        type=int,
+        default=None,
+        help="vis(export_workers=...); 1 runs the stages sequentially",
+    )
+    parser.add_argument(
+        "--export-processes",
+        type=int,
+        default=0,
+        help="vis(export_processes=...)",
+    )
+    parser.add_argument(
+        "--precision",
+        default=None,
+        help="vis(precision=...) for continuous values and genes, e.g. auto",
+    )
+    parser.add_argument(
+        "--only", nargs="+", default=None, help="benchmarks to run"
+    )
+    parser.add_argument("--output", default=None, help="write JSON here")
+    parser.add_argument(
+        "--compare", default=None, help="JSON from an earlier run"
+    )
+    args = parser.parse_args()
+
+    spv.set_log_level("WARNING")
+    os.environ["SPATIALVISTA_NO_CACHE"] = "1"
+
+    params = {
+        k: getattr(args, k)
+        for k in (
+            "n_obs",
+            "n_vars",
+            "density",
+            "n_categories",
+            "n_sections",
+            "n_annotations",
+            "n_continuous",
+            "n_genes",
+            "dim",
+            "seed",
+            "repeat",
+            "export_workers",
+            "export_processes",
+            "precision",
+        )
+    }
+    t0 = time.perf_counter()
+    data = make_dataset(
+        args.n_obs,
+        n_vars=args.n_vars,
+        density=args.density,
+        n_categories=args.n_categories,
+        n_sections=args.n_sections,
+        n_annotations=args.n_annotations,
+        n_continuous=args.n_continuous,
+        dim=args.dim,
+        seed=args.seed,
+    )
+    genes = list(data.var_names[: args.n_genes])
+    print(f"dataset {params} built in {time.perf_counter() - t0:.1f}s")
+
+    results = []
+    print(f"{'benchmark':<30}{'wall s':>10}{'MB':>10}{'peak RSS MB':>13}")
+    vis_kwargs = {
+        "export_workers": args.export_workers,
+        "export_processes": args.export_processes,
+        "precision": args.precision,
+    }
+    for name, fn in _benchmarks(data, genes, vis_kwargs).items():
+        if args.only and name not in args.only:
+            continue
+        r = {"name": name, **run(fn, args.repeat)}
+        results.append(r)
+        print(
+            f"{name:<30}{r['wall_s']:>10.3f}{r['bytes'] / 1e6:>10.1f}"
+            f"{r['peak_rss_mb']:>13.0f}"
+        )
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "params": params,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
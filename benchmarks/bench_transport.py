@@ -0,0 +1,90 @@
+"""
+Benchmark position transports: LAS/LAZ, raw float32 and quantized integers.
+
+Reports the kernel-side encode time and payload size of each transport,
+for the single-blob path and for LOD levels. Decoding cost on the frontend
+is not measured here; raw buffers are used without decoding while LAZ is
+decompressed in a web worker.
+
+Usage:
+    python benchmarks/bench_transport.py --n-obs 1000000 --mode 3D
+"""
+
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from spatialvista.exporter import (
+    export_positions_quantized,
+    export_positions_raw,
+    write_laz_to_bytes,
+)
+from spatialvista.lod import export_lod_blobs
+
+
+def make_adata(n_obs, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    coords = rng.uniform(0, 10_000, size=(n_obs, dim))
+    return SimpleNamespace(obsm={"spatial": coords}, n_obs=n_obs)
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n-obs", type=int, default=1_000_000)
+    parser.add_argument("--mode", choices=["2D", "3D"], default="3D")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=None,
+        help="position tolerance for the quantized transport",
+    )
+    args = parser.parse_args()
+
+    dim = 3 if args.mode == "3D" else 2
+    adata = make_adata(args.n_obs, dim)
+    print(f"n_obs={args.n_obs} mode={args.mode}")
+    print(f"{'path':<12}{'transport':<11}{'encode':>10}{'MB':>10}")
+
+    laz, t_laz = timed(write_laz_to_bytes, adata, "spatial", args.mode)
+    lazc, t_lazc = timed(
+        write_laz_to_bytes, adata, "spatial", args.mode, compress=True
+    )
+    (_, raw), t_raw = timed(export_positions_raw, adata, "spatial", args.mode)
+    (cfg, q), t_q = timed(
+        export_positions_quantized,
+        adata,
+        "spatial",
+        args.mode,
+        tolerance=args.tolerance,
+    )
+    print(f"{'single':<12}{'laz':<11}{t_laz:>9.3f}s{len(laz) / 1e6:>10.1f}")
+    print(
+        f"{'single':<12}{'laz-comp':<11}{t_lazc:>9.3f}s{len(lazc) / 1e6:>10.1f}"
+    )
+    print(f"{'single':<12}{'raw':<11}{t_raw:>9.3f}s{len(raw) / 1e6:>10.1f}")
+    print(f"{'single':<12}{'quantized':<11}{t_q:>9.3f}s{len(q) / 1e6:>10.1f}")
+    print(f"  quantized dtype={cfg['DType']} max step={max(cfg['Scale']):.3g}")
+
+    for transport in ("laz", "raw", "quantized"):
+        (_, levels, _), t = timed(
+            export_lod_blobs,
+            adata,
+            "spatial",
+            args.mode,
+            transport=transport,
+            tolerance=args.tolerance,
+        )
+        mb = sum(len(b) for b in levels) / 1e6
+        print(f"{'lod':<12}{transport:<11}{t:>9.3f}s{mb:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
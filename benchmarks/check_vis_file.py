@@ -0,0 +1,126 @@
+"""
+Round-trip check of vis_file against vis on the same AnnData.
+
+Writes a small synthetic AnnData to .h5ad and to .zarr with anndata, then
+checks that vis_file on each store exports the same positions,
+annotations, continuous obs and genes as vis on the in-memory AnnData.
+CSR, CSC and dense X are covered. Needs anndata, h5py and zarr.
+
+Usage:
+    python benchmarks/check_vis_file.py --n-obs 20000
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+import anndata as ad
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+import spatialvista as spv
+
+# Widget traits holding exported buffers and their configs
+_TRAITS = (
+    "laz_bytes",
+    "position_config",
+    "position_bytes",
+    "annotation_config",
+    "annotation_bins",
+    "continuous_config",
+    "continuous_bins",
+)
+
+
+def make_adata(n_obs, n_vars=200, density=0.05, x_format="csr", seed=0):
+    rng = np.random.default_rng(seed)
+    X = sp.random(
+        n_obs,
+        n_vars,
+        density=density,
+        format="csr",
+        dtype=np.float32,
+        random_state=seed,
+    )
+    if x_format == "csc":
+        X = X.tocsc()
+    elif x_format == "dense":
+        X = X.toarray()
+    obs = pd.DataFrame(
+        {
+            "celltype": pd.Categorical(
+                rng.choice([f"type{i}" for i in range(12)], n_obs)
+            ),
+            "section": pd.Categorical(
+                rng.choice([f"s{i}" for i in range(4)], n_obs)
+            ),
+            "score": rng.normal(size=n_obs),
+        },
+        index=[f"cell{i}" for i in range(n_obs)],
+    )
+    adata = ad.AnnData(
+        X=X,
+        obs=obs,
+        var=pd.DataFrame(index=[f"gene{i}" for i in range(n_vars)]),
+    )
+    adata.obsm["spatial"] = rng.uniform(0, 1000, size=(n_obs, 3))
+    return adata
+
+
+def _exports(widget):
+    exports = {name: getattr(widget, name) for name in _TRAITS}
+    # a fresh random id per export
+    exports["annotation_config"] = {
+        k: v for k, v in exports["annotation_config"].items() if k != "Id"
+    }
+    return exports
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(map(_same, a, b))
+    if isinstance(a, (bytes, bytearray, memoryview)):
+        return bytes(a) == bytes(b)
+    return a == b
+
+
+def check(adata, path, genes):
+    kwargs = {
+        "position": "spatial",
+        "color": "celltype",
+        "section": "section",
+        "continuous": ["score"],
+        "genes": genes,
+        "cache": False,
+        "_wait_for_all_sends": True,
+    }
+    expected = _exports(spv.vis(adata, **kwargs))
+    got = _exports(spv.vis_file(path, **kwargs))
+    mismatched = [k for k in _TRAITS if not _same(expected[k], got[k])]
+    if mismatched:
+        raise AssertionError(f"{path.name}: {mismatched} differ from vis()")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n-obs", type=int, default=20_000)
+    args = parser.parse_args()
+
+    genes = ["gene1", "gene7", "gene42"]
+    with tempfile.TemporaryDirectory() as tmp:
+        for x_format in ("csr", "csc", "dense"):
+            adata = make_adata(args.n_obs, x_format=x_format)
+            h5ad = Path(tmp) / f"{x_format}.h5ad"
+            zarr = Path(tmp) / f"{x_format}.zarr"
+            adata.write_h5ad(h5ad)
+            adata.write_zarr(zarr)
+            for path in (h5ad, zarr):
+                check(adata, path, genes)
+                print(f"{path.name:<12} ok")
+
+
+if __name__ == "__main__":
+    main()
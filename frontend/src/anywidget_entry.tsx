@@ -1,7 +1,11 @@
 import "./index.css";
 import { mountWidget } from "./widget_mount";
+import { listenForTraitDeltas } from "./utils/traitDeltas";
 
 export default {
+  initialize({ model }: any) {
+    return listenForTraitDeltas(model);
+  },
   render({ el, model }: any) {
     mountWidget(el, model);
   },
@@ -1,4 +1,4 @@
-import React from "react";
+import React, { useMemo, useState } from "react";
 import {
   CommandDialog,
   CommandEmpty,
@@ -8,7 +8,13 @@ import {
   CommandList,
   CommandSeparator,
 } from "@/components/ui//command";
-import { CircleCheckBigIcon, FrownIcon, ListRestartIcon } from "lucide-react";
+import {
+  CircleCheckBigIcon,
+  DownloadIcon,
+  FrownIcon,
+  ListRestartIcon,
+  LoaderCircleIcon,
+} from "lucide-react";
 
 import type { ContinuousField } from "@/types";
 
@@ -16,19 +22,30 @@ interface ContinuousSelectionDialogProps {
   open: boolean;
   activeContinuous: string | null;
   continuousFields: Record<string, ContinuousField>;
+  // all genes that can be fetched from the kernel on demand
+  geneNames?: string[];
+  pendingGene?: string | null;
   onOpenChange: (open: boolean) => void;
   onSelectContinuous: (name: string | null) => void;
+  onRequestGene?: (gene: string) => void;
 }
 
+// Limit on-demand suggestions so large gene lists stay responsive
+const MAX_GENE_SUGGESTIONS = 50;
+
 export const ContinuousSelectionDialog: React.FC<
   ContinuousSelectionDialogProps
 > = ({
   open,
   activeContinuous,
   continuousFields,
+  geneNames = [],
+  pendingGene = null,
   onOpenChange,
   onSelectContinuous,
+  onRequestGene,
 }) => {
+  const [query, setQuery] = useState("");
   // const fields = Object.values(continuousFields);
 
   const geneFields = Object.values(continuousFields).filter(
@@ -39,9 +56,28 @@ export const ContinuousSelectionDialog: React.FC<
     (f) => f.ContinuousConfig.Source === "obs",
   );
 
+  // genes that match the query but have not been loaded yet
+  const geneSuggestions = useMemo(() => {
+    const q = query.trim().toLowerCase();
+    if (!q || !onRequestGene) return [];
+    const out: string[] = [];
+    for (const gene of geneNames) {
+      if (continuousFields[`Gene:${gene}`]) continue;
+      if (gene.toLowerCase().includes(q)) {
+        out.push(gene);
+        if (out.length >= MAX_GENE_SUGGESTIONS) break;
+      }
+    }
+    return out;
+  }, [query, geneNames, continuousFields, onRequestGene]);
+
   return (
     <CommandDialog open={open} onOpenChange={onOpenChange}>
-      <CommandInput placeholder="Search numeric fields..." />
+      <CommandInput
+        placeholder="Search numeric fields..."
+        value={query}
+        onValueChange={setQuery}
+      />
       <CommandList>
         <CommandEmpty>
           <div className="flex items-center flex-col text-center py-4">
@@ -137,6 +173,32 @@ export const ContinuousSelectionDialog: React.FC<
             );
           })}
         </CommandGroup>
+
+        {/* Genes fetched from the kernel on demand */}
+        {geneSuggestions.length > 0 && (
+          <CommandGroup heading="All Genes">
+            {geneSuggestions.map((gene) => (
+              <CommandItem
+                key={`fetch-${gene}`}
+                value={gene}
+                keywords={[gene, "gene"]}
+                onSelect={() => {
+                  onRequestGene?.(gene);
+                  onOpenChange(false);
+                }}
+              >
+                <span className="mr-2">
+                  {pendingGene === gene ? (
+                    <LoaderCircleIcon className="h-4 w-4 animate-spin" />
+                  ) : (
+                    <DownloadIcon className="h-4 w-4" />
+                  )}
+                </span>
+                <span>{gene}</span>
+              </CommandItem>
+            ))}
+          </CommandGroup>
+        )}
       </CommandList>
     </CommandDialog>
   );
@@ -17,11 +17,14 @@ import {
   type AnnotationType,
   type LayoutMode,
   type LoadedData,
+  type TransferProgress,
 } from "@/types";
 
 interface VisualizationAreaProps {
   // Basic states
   isLoaded: boolean;
+  // bytes received so far by a chunked transfer, if any
+  transferProgress?: TransferProgress | null;
   showPointCloud: boolean;
   showScatterplot: boolean;
   layoutMode: LayoutMode;
@@ -60,6 +63,7 @@ interface VisualizationAreaProps {
 
 export const VisualizationArea: React.FC<VisualizationAreaProps> = ({
   isLoaded,
+  transferProgress,
   showPointCloud,
   showScatterplot,
   layoutMode,
@@ -129,10 +133,11 @@ export const VisualizationArea: React.FC<VisualizationAreaProps> = ({
       if (!coordinate || !layer || !loadedData) return null;
 
       const extData = loadedData.extData;
+      const origin = loadedData.header.origin ?? [0, 0, 0];
 
       let tooltipContent = `
           <div>
-            <b>Position:</b> ${coordinate.map((v: number) => v.toFixed(1)).join(", ")}<br/>
+            <b>Position:</b> ${coordinate.map((v: number, k: number) => (v + origin[k]).toFixed(1)).join(", ")}<br/>
         `;
 
       // iter all annos
@@ -148,7 +153,11 @@ export const VisualizationArea: React.FC<VisualizationAreaProps> = ({
           let label = `Unknown (${code})`;
 
           if (items) {
-            const hit = items.find((it) => it.Code === Number(code));
+            // items are listed by code; find() covers any other order
+            const hit =
+              items[Number(code)]?.Code === Number(code)
+                ? items[Number(code)]
+                : items.find((it) => it.Code === Number(code));
             if (hit?.Name != null) {
               label = String(hit.Name);
             }
@@ -201,7 +210,7 @@ export const VisualizationArea: React.FC<VisualizationAreaProps> = ({
     <>
       {/* Loading Overlay */}
 
-      {!isLoaded && <LoadingOverlay />}
+      {!isLoaded && <LoadingOverlay progress={transferProgress} />}
 
       {/* DeckGL Component */}
       <DeckGL
@@ -269,8 +278,10 @@ export const VisualizationArea: React.FC<VisualizationAreaProps> = ({
 };
 
 // Loading Overlay Sub-component
-const LoadingOverlay: React.FC = () => (
-  <div className="absolute inset-0 flex items-center justify-center z-10">
+const LoadingOverlay: React.FC<{ progress?: TransferProgress | null }> = ({
+  progress,
+}) => (
+  <div className="absolute inset-0 flex flex-col items-center justify-center z-10">
     <RingLoader
       color="#B967C7"
       cssOverride={{}}
@@ -278,6 +289,12 @@ const LoadingOverlay: React.FC = () => (
       size={200}
       speedMultiplier={0.5}
     />
+    {progress && progress.totalBytes > 0 && (
+      <div className="mt-4 text-sm text-muted-foreground tabular-nums">
+        {Math.floor((100 * progress.receivedBytes) / progress.totalBytes)}% of{" "}
+        {(progress.totalBytes / 1e6).toFixed(1)} MB
+      </div>
+    )}
   </div>
 );
 
@@ -20,3 +20,7 @@ export const INITIAL_2D_VIEW_STATE: OrthographicViewState = {
 };
 
 export const MAX_CONCURRENT_PREVIEWS = 2;
+
+// Genes fetched on demand that are kept in the browser (least recently used
+// ones are dropped; the kernel keeps its own byte-bounded cache)
+export const MAX_FETCHED_GENES = 16;
@@ -43,10 +43,13 @@ export const useAnnotationStates = (
 
     const { DefaultAnnoType, AvailableAnnoTypes } = annotationConfig;
 
-    setColoringAnnotation(
-      AvailableAnnoTypes.includes(DefaultAnnoType)
-        ? DefaultAnnoType
-        : AvailableAnnoTypes[0],
+    // keep the user's choice when annotations are added or removed later
+    setColoringAnnotation((prev) =>
+      AvailableAnnoTypes.includes(prev)
+        ? prev
+        : AvailableAnnoTypes.includes(DefaultAnnoType)
+          ? DefaultAnnoType
+          : AvailableAnnoTypes[0],
     );
   }, [annotationConfig]);
 
@@ -58,11 +61,13 @@ export const useAnnotationStates = (
 
   useEffect(() => {
     if (!annotationConfig) return;
-    const initial: SelectedCategories = {};
-    annotationConfig.AvailableAnnoTypes.forEach((t: string) => {
-      initial[t] = null;
+    setSelectedCategories((prev) => {
+      const initial: SelectedCategories = {};
+      annotationConfig.AvailableAnnoTypes.forEach((t: string) => {
+        initial[t] = prev[t] ?? null;
+      });
+      return initial;
     });
-    setSelectedCategories(initial);
   }, [annotationConfig]);
 
   /* ----------------------------
@@ -74,11 +79,13 @@ export const useAnnotationStates = (
 
   useEffect(() => {
     if (!annotationConfig) return;
-    const initial: HiddenCategoryIds = {};
-    annotationConfig.AvailableAnnoTypes.forEach((t: string) => {
-      initial[t] = new Set();
+    setHiddenCategoryIds((prev) => {
+      const initial: HiddenCategoryIds = {};
+      annotationConfig.AvailableAnnoTypes.forEach((t: string) => {
+        initial[t] = prev[t] ?? new Set();
+      });
+      return initial;
     });
-    setHiddenCategoryIds(initial);
   }, [annotationConfig]);
 
   /* ----------------------------
@@ -132,11 +139,13 @@ export const useAnnotationStates = (
 
   useEffect(() => {
     if (!annotationConfig) return;
-    const initial: CustomColors = {};
-    annotationConfig.AvailableAnnoTypes.forEach((t: string) => {
-      initial[t] = {};
+    setCustomColors((prev) => {
+      const initial: CustomColors = {};
+      annotationConfig.AvailableAnnoTypes.forEach((t: string) => {
+        initial[t] = prev[t] ?? {};
+      });
+      return initial;
     });
-    setCustomColors(initial);
   }, [annotationConfig]);
 
   /* ----------------------------
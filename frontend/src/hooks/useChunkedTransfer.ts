@@ -0,0 +1,138 @@
+import { useEffect, useState } from "react";
+import type { TransferManifest, TransferProgress } from "@/types";
+
+// models whose transfer is already driven by a mounted view
+const activeModels = new WeakSet<object>();
+
+type Assembly = {
+  version: number;
+  target: string;
+  data: Uint8Array;
+  receivedBytes: number;
+};
+
+/**
+ * useChunkedTransfer - receive buffer traits streamed in chunks by the kernel
+ * (vis(transfer="chunked")).
+ *
+ * Once `transfer_manifest` lists buffers, {type: "transfer_start"} asks the
+ * kernel to stream them as {type: "transfer_chunk", id, version, target, key,
+ * seq, offset, nbytes} messages with one buffer each. Every chunk is copied
+ * into a preallocated buffer and acknowledged with {type: "transfer_ack"},
+ * which lets the kernel send the next one. When all buffers of a trait have
+ * arrived the assembled value is set on the model locally (as a DataView, or
+ * a dict of DataViews for annotation_bins / continuous_bins), so the usual
+ * change:<trait> handlers pick it up. Returns the overall progress, or null
+ * when nothing is transferred in chunks.
+ */
+export const useChunkedTransfer = (
+  // eslint-disable-next-line @typescript-eslint/no-explicit-any
+  model: any,
+): TransferProgress | null => {
+  const [progress, setProgress] = useState<TransferProgress | null>(null);
+
+  useEffect(() => {
+    if (!model || activeModels.has(model)) return;
+    activeModels.add(model);
+
+    const assemblies = new Map<string, Assembly>();
+    let manifest: TransferManifest | null = null;
+    let started = false;
+
+    const isComplete = (id: string) => {
+      const entry = manifest?.Buffers[id];
+      const a = assemblies.get(id);
+      return (
+        !!entry &&
+        !!a &&
+        a.version === entry.Version &&
+        a.receivedBytes === entry.NBytes
+      );
+    };
+
+    const deliver = (target: string) => {
+      const spec = manifest?.Targets[target];
+      if (!spec || !spec.Buffers.every(isComplete)) return;
+      const view = (id: string) =>
+        new DataView(assemblies.get(id)!.data.buffer);
+      if (spec.Keyed) {
+        const value: Record<string, DataView> = {};
+        for (const id of spec.Buffers) {
+          value[manifest!.Buffers[id].Key!] = view(id);
+        }
+        model.set(target, value);
+      } else {
+        model.set(target, view(spec.Buffers[0]));
+      }
+    };
+
+    const report = () => {
+      if (!manifest) return;
+      let receivedBytes = 0;
+      let totalBytes = 0;
+      for (const [id, entry] of Object.entries(manifest.Buffers)) {
+        const a = assemblies.get(id);
+        totalBytes += entry.NBytes;
+        if (a && a.version === entry.Version) receivedBytes += a.receivedBytes;
+      }
+      setProgress({ receivedBytes, totalBytes });
+    };
+
+    const onManifest = () => {
+      const next: TransferManifest | null = model.get("transfer_manifest");
+      if (!next?.Buffers || !Object.keys(next.Buffers).length) return;
+      manifest = next;
+      if (!started) {
+        started = true;
+        model.send({ type: "transfer_start" });
+      }
+      // buffers may have arrived before the manifest that lists them
+      for (const target of Object.keys(next.Targets)) deliver(target);
+      report();
+    };
+
+    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+    const onMessage = (msg: any, buffers: DataView[]) => {
+      if (msg?.type !== "transfer_chunk" || !buffers?.length) return;
+      const dv = buffers[0];
+
+      let a = assemblies.get(msg.id);
+      if (!a || a.version !== msg.version) {
+        a = {
+          version: msg.version,
+          target: msg.target,
+          data: new Uint8Array(msg.nbytes),
+          receivedBytes: 0,
+        };
+        assemblies.set(msg.id, a);
+      }
+      a.data.set(
+        new Uint8Array(dv.buffer, dv.byteOffset, dv.byteLength),
+        msg.offset,
+      );
+      a.receivedBytes += dv.byteLength;
+
+      model.send({
+        type: "transfer_ack",
+        id: msg.id,
+        version: msg.version,
+        seq: msg.seq,
+      });
+
+      if (a.receivedBytes === msg.nbytes) deliver(a.target);
+      report();
+    };
+
+    model.on("msg:custom", onMessage);
+    model.on("change:transfer_manifest", onManifest);
+    onManifest();
+
+    return () => {
+      activeModels.delete(model);
+      model.off("msg:custom", onMessage);
+      model.off("change:transfer_manifest", onManifest);
+    };
+  }, [model]);
+
+  return progress;
+};
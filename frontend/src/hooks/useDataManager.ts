@@ -5,8 +5,12 @@ import type {
   LASMesh,
   LoadedData,
   AnnotationType,
+  BoundingBox,
+  LodConfig,
+  PositionConfig,
 } from "@/types";
 import { INITIAL_VIEW_STATE } from "@/config/constants";
+import { relativeBoundingBox } from "@/utils/helpers";
 
 // type AnnotationType = string;
 
@@ -44,6 +48,35 @@ export const useDataManager = ({
     Set<AnnotationType>
   >(new Set());
 
+  // Center the camera on the bounding box and publish the loaded data
+  const applyLoadedData = useCallback(
+    (data: LoadedData) => {
+      if (!data.header.boundingBox) return;
+      const [mins, maxs] = data.header.boundingBox;
+
+      const widthForZoom =
+        typeof parentWidth === "number" && parentWidth > 0
+          ? parentWidth
+          : window.innerWidth;
+      console.log(" width", widthForZoom);
+      const camera = {
+        ...INITIAL_VIEW_STATE,
+        target: [
+          (mins[0] + maxs[0]) / 2,
+          (mins[1] + maxs[1]) / 2,
+          (mins[2] + maxs[2]) / 2,
+        ],
+        zoom: Math.log2(widthForZoom / (maxs[0] - mins[0])) - 2,
+      };
+      updateViewState(camera);
+      setInitialCamera(camera);
+      setLoadedData(data);
+      setIsLoaded(true);
+      setActiveZoom("standard");
+    },
+    [parentWidth, setActiveZoom, setInitialCamera, updateViewState],
+  );
+
   const onDataLoad = useCallback(
     // eslint-disable-next-line @typescript-eslint/no-explicit-any
     (data: any) => {
@@ -68,44 +101,107 @@ export const useDataManager = ({
       data.attributes.COLOR_0 = undefined;
       data.attributes.POSITION = undefined;
 
-      if (header.boundingBox) {
-        const [mins, maxs] = header.boundingBox;
-
-        const widthForZoom =
-          typeof parentWidth === "number" && parentWidth > 0
-            ? parentWidth
-            : window.innerWidth;
-        console.log(" width", widthForZoom);
-        updateViewState({
-          ...INITIAL_VIEW_STATE,
-          target: [
-            (mins[0] + maxs[0]) / 2,
-            (mins[1] + maxs[1]) / 2,
-            (mins[2] + maxs[2]) / 2,
+      applyLoadedData(data);
+
+      if (onLoad) {
+        onLoad({ count: header.vertexCount, progress: 1 });
+      }
+
+      console.timeEnd("Data load");
+    },
+    [onLoad, applyLoadedData],
+  );
+
+  // Positions that arrive without LAZ are used as-is: world coordinates for
+  // transport="raw", coordinates relative to config.Offset for "quantized"
+  const onPositionsLoad = useCallback(
+    (positions: Float32Array, config: PositionConfig) => {
+      const quantized = config.Transport === "quantized";
+      const [mins, maxs] = quantized
+        ? relativeBoundingBox(config.BoundingBox, config.Offset)
+        : config.BoundingBox;
+      applyLoadedData({
+        header: {
+          boundingBox: [
+            [mins[0], mins[1], mins[2]],
+            [maxs[0], maxs[1], maxs[2]],
           ],
-          zoom: Math.log2(widthForZoom / (maxs[0] - mins[0])) - 2,
+          vertexCount: config.PointCount,
+          origin: quantized ? config.Offset : undefined,
+        },
+        attributes: {},
+        extData: {
+          numeric: null,
+          annotations: {},
+          POSITION: { value: positions },
+        },
+      });
+
+      if (onLoad) {
+        onLoad({ count: config.PointCount, progress: 1 });
+      }
+    },
+    [onLoad, applyLoadedData],
+  );
+
+  // LOD levels: positions are copied into one preallocated buffer holding the
+  // full cloud, and the rendered vertex count grows as levels arrive.
+  const onLodLevelLoad = useCallback(
+    (
+      positions: Float32Array | Float64Array,
+      boundingBox: BoundingBox,
+      level: number,
+      config: LodConfig,
+    ) => {
+      const start = level > 0 ? config.LevelOffsets[level - 1] : 0;
+      const stop = config.LevelOffsets[level];
+      const quantized = config.Transport === "quantized";
+      // quantized levels arrive with the full bbox, already made relative
+      const [mins, maxs] = quantized
+        ? boundingBox
+        : (config.BoundingBox ?? boundingBox);
+
+      if (level === 0) {
+        const value =
+          config.Transport === "raw" || quantized
+            ? new Float32Array(config.PointCount * 3)
+            : new Float64Array(config.PointCount * 3);
+        value.set(positions, 0);
+        applyLoadedData({
+          header: {
+            boundingBox: [
+              [mins[0], mins[1], mins[2]],
+              [maxs[0], maxs[1], maxs[2]],
+            ],
+            vertexCount: stop,
+            origin: quantized ? config.Offset : undefined,
+          },
+          attributes: {},
+          extData: {
+            numeric: null,
+            annotations: {},
+            POSITION: { value },
+          },
         });
-        setInitialCamera({
-          ...INITIAL_VIEW_STATE,
-          target: [
-            (mins[0] + maxs[0]) / 2,
-            (mins[1] + maxs[1]) / 2,
-            (mins[2] + maxs[2]) / 2,
-          ],
-          zoom: Math.log2(widthForZoom / (maxs[0] - mins[0])) - 2,
+      } else {
+        setLoadedData((prev) => {
+          if (!prev) return prev;
+          const [bmin, bmax] = prev.header.boundingBox;
+          for (let k = 0; k < 3; k++) {
+            bmin[k] = Math.min(bmin[k], mins[k]);
+            bmax[k] = Math.max(bmax[k], maxs[k]);
+          }
+          prev.extData.POSITION.value.set(positions, start * 3);
+          prev.header.vertexCount = Math.max(prev.header.vertexCount, stop);
+          return { ...prev };
         });
-        setLoadedData(data);
-        setIsLoaded(true);
-        setActiveZoom("standard");
       }
 
       if (onLoad) {
-        onLoad({ count: header.vertexCount, progress: 1 });
+        onLoad({ count: stop, progress: stop / config.PointCount });
       }
-
-      console.timeEnd("Data load");
     },
-    [onLoad, parentWidth, setActiveZoom, setInitialCamera, updateViewState],
+    [onLoad, applyLoadedData],
   );
 
   // Preload annotations when data or annotation config changes
@@ -123,6 +219,13 @@ export const useDataManager = ({
         changed = true;
       }
     }
+    // annotations removed with widget.remove_trait
+    for (const anno of Object.keys(anns)) {
+      if (!annotationConfig.AvailableAnnoTypes.includes(anno)) {
+        delete anns[anno];
+        changed = true;
+      }
+    }
 
     if (changed) {
       setLoadedAnnotations(new Set(Object.keys(anns)));
@@ -156,6 +259,8 @@ export const useDataManager = ({
     loadedAnnotations,
     loadNumericField,
     onDataLoad,
+    onLodLevelLoad,
+    onPositionsLoad,
     numericField,
     setLoadedData,
   };
@@ -0,0 +1,110 @@
+import { useState, useCallback, useEffect, useRef } from "react";
+import { MAX_FETCHED_GENES } from "@/config/constants";
+import { decodeContinuousValues } from "@/utils/helpers";
+import type { ContinuousConfig, ContinuousField } from "@/types";
+
+export interface UseGeneFetcherReturn {
+  // States
+  geneNames: string[];
+  fetchedFields: Record<string, ContinuousField>;
+  pendingGene: string | null;
+  // field key of the last requested gene once it has arrived
+  readyKey: string | null;
+
+  // Actions
+  requestGene: (gene: string) => void;
+  clearReadyKey: () => void;
+}
+
+/**
+ * useGeneFetcher - fetch gene expression from the kernel on demand.
+ *
+ * The kernel answers {type: "gene_request", gene} with
+ * {type: "gene", key, config} plus one buffer, or {type: "gene_error"}.
+ * Only the MAX_FETCHED_GENES most recently requested genes are kept.
+ */
+export const useGeneFetcher = (
+  // eslint-disable-next-line @typescript-eslint/no-explicit-any
+  model: any,
+  enabled: boolean,
+): UseGeneFetcherReturn => {
+  const [geneNames, setGeneNames] = useState<string[]>([]);
+  const [fetchedFields, setFetchedFields] = useState<
+    Record<string, ContinuousField>
+  >({});
+  const [pendingGene, setPendingGene] = useState<string | null>(null);
+  const [readyKey, setReadyKey] = useState<string | null>(null);
+  const pendingRef = useRef<string | null>(null);
+
+  // gene -> field key, least recently used first
+  const recentRef = useRef<Map<string, string>>(new Map());
+
+  useEffect(() => {
+    if (!model || !enabled) return;
+
+    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+    const handler = (msg: any, buffers: DataView[]) => {
+      if (msg?.type === "gene_list") {
+        setGeneNames(msg.genes ?? []);
+      } else if (msg?.type === "gene" && buffers?.length) {
+        const config = msg.config as ContinuousConfig;
+        const values = decodeContinuousValues(buffers[0], config);
+
+        const recent = recentRef.current;
+        recent.delete(msg.gene);
+        recent.set(msg.gene, msg.key);
+        const evicted: string[] = [];
+        while (recent.size > MAX_FETCHED_GENES) {
+          const [oldGene, oldKey] = recent.entries().next().value!;
+          recent.delete(oldGene);
+          evicted.push(oldKey);
+        }
+
+        setFetchedFields((prev) => {
+          const next = { ...prev };
+          for (const key of evicted) delete next[key];
+          next[msg.key] = { name: msg.key, values, ContinuousConfig: config };
+          return next;
+        });
+
+        if (pendingRef.current === msg.gene) {
+          pendingRef.current = null;
+          setPendingGene(null);
+          setReadyKey(msg.key);
+        }
+      } else if (msg?.type === "gene_error") {
+        console.warn(`[SpatialVista] Gene "${msg.gene}": ${msg.error}`);
+        if (pendingRef.current === msg.gene) {
+          pendingRef.current = null;
+          setPendingGene(null);
+        }
+      }
+    };
+
+    model.on("msg:custom", handler);
+    model.send({ type: "gene_list_request" });
+
+    return () => model.off("msg:custom", handler);
+  }, [model, enabled]);
+
+  const requestGene = useCallback(
+    (gene: string) => {
+      if (!model || !enabled) return;
+      pendingRef.current = gene;
+      setPendingGene(gene);
+      model.send({ type: "gene_request", gene });
+    },
+    [model, enabled],
+  );
+
+  const clearReadyKey = useCallback(() => setReadyKey(null), []);
+
+  return {
+    geneNames,
+    fetchedFields,
+    pendingGene,
+    readyKey,
+    requestGene,
+    clearReadyKey,
+  };
+};
@@ -1,10 +1,11 @@
-import { useState, useCallback } from "react";
+import { useState, useCallback, useEffect, useRef } from "react";
 import {
+  decodeKernelLayout,
   generateHistogramPositions,
   generateTreemapPositions,
 } from "@/utils/layout";
 import type { OrbitViewState } from "@deck.gl/core";
-import type { LayoutMode } from "@/types";
+import type { KernelLayoutConfig, LayoutMode } from "@/types";
 
 export interface UseLayoutModeReturn {
   // States
@@ -25,51 +26,122 @@ export const useLayoutMode = (
   initialCamera: OrbitViewState,
   updateViewState: (viewState: OrbitViewState) => void,
   setPointSize: (size: number) => void,
+  // eslint-disable-next-line @typescript-eslint/no-explicit-any
+  model: any = null,
+  // Whether the kernel serves layouts (GlobalConfig.KernelLayouts)
+  kernelLayouts = false,
 ): UseLayoutModeReturn => {
   const [FancyPositions, setFancyPositions] = useState<Float32Array | null>(
     null,
   );
 
-  // Toggle layout mode between 3D and 2D treemap
-  const toggleLayoutMode = useCallback(() => {
-    if ((layoutMode === "3d" || layoutMode === "2d") && coloringAnnotation) {
-      if (currentTrait) {
+  // Decoded kernel layouts by "layout|annotation|trait", so toggling back
+  // to a layout neither asks the kernel nor recomputes it
+  const kernelCacheRef = useRef<Map<string, Float32Array>>(new Map());
+  const pendingRef = useRef<string | null>(null);
+
+  const showLayout = useCallback(
+    (mode: LayoutMode, positions: Float32Array) => {
+      setFancyPositions(positions);
+      setLayoutMode(mode);
+      setPointSize(mode === "2d-histogram" ? 3 : 2);
+      updateViewState({
+        ...initialCamera,
+        rotationX: 0,
+        zoom: (initialCamera.zoom as number) + 1,
+        transitionDuration: 0,
+      });
+    },
+    [initialCamera, updateViewState, setLayoutMode, setPointSize],
+  );
+
+  // Compute the layout in the browser (without kernel layouts, or when the
+  // kernel could not compute it)
+  const showLocalLayout = useCallback(
+    (annotation: string, trait: string | null) => {
+      if (trait) {
         const histogramPos = generateHistogramPositions(
           loadedData,
-          currentTrait,
-          coloringAnnotation,
+          trait,
+          annotation,
         );
         if (histogramPos) {
           console.log("Generated histogram positions for trait analysis");
-          setFancyPositions(histogramPos);
-          setLayoutMode("2d-histogram");
-          setPointSize(3);
-          updateViewState({
-            ...initialCamera,
-            rotationX: 0,
-            zoom: (initialCamera.zoom as number) + 1,
-            transitionDuration: 0,
-          });
+          showLayout("2d-histogram", histogramPos);
         }
       } else {
-        const treemapPos = generateTreemapPositions(
-          loadedData,
-          coloringAnnotation,
-        );
+        const treemapPos = generateTreemapPositions(loadedData, annotation);
         if (treemapPos) {
           console.log("Generated treemap positions for annotation analysis");
-          setFancyPositions(treemapPos);
-          setLayoutMode("2d-treemap");
-          setPointSize(2);
-          updateViewState({
-            ...initialCamera,
-            rotationX: 0,
-            zoom: (initialCamera.zoom as number) + 1,
-            transitionDuration: 0,
-          });
+          showLayout("2d-treemap", treemapPos);
         }
       }
+    },
+    [loadedData, showLayout],
+  );
+
+  // Layouts depend on the loaded points
+  useEffect(() => {
+    kernelCacheRef.current.clear();
+  }, [loadedData]);
+
+  useEffect(() => {
+    if (!model || !kernelLayouts) return;
+
+    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+    const handler = (msg: any, buffers: DataView[]) => {
+      if (msg?.type !== "layout" && msg?.type !== "layout_error") return;
+      const key = `${msg.layout}|${msg.annotation}|${msg.trait ?? ""}`;
+      if (pendingRef.current !== key) return;
+      pendingRef.current = null;
+
+      if (msg.type === "layout" && buffers?.length) {
+        const positions = decodeKernelLayout(
+          buffers[0],
+          msg.config as KernelLayoutConfig,
+          loadedData?.header?.origin,
+        );
+        kernelCacheRef.current.set(key, positions);
+        showLayout(
+          msg.layout === "histogram" ? "2d-histogram" : "2d-treemap",
+          positions,
+        );
+      } else {
+        console.warn(`[SpatialVista] Kernel layout ${key}: ${msg.error}`);
+        showLocalLayout(msg.annotation, msg.trait ?? null);
+      }
+    };
+
+    model.on("msg:custom", handler);
+    return () => model.off("msg:custom", handler);
+  }, [model, kernelLayouts, loadedData, showLayout, showLocalLayout]);
+
+  // Toggle layout mode between 3D and 2D treemap
+  const toggleLayoutMode = useCallback(() => {
+    if ((layoutMode === "3d" || layoutMode === "2d") && coloringAnnotation) {
+      if (!model || !kernelLayouts) {
+        showLocalLayout(coloringAnnotation, currentTrait);
+        return;
+      }
+      const layout = currentTrait ? "histogram" : "treemap";
+      const key = `${layout}|${coloringAnnotation}|${currentTrait ?? ""}`;
+      const cached = kernelCacheRef.current.get(key);
+      if (cached) {
+        showLayout(
+          layout === "histogram" ? "2d-histogram" : "2d-treemap",
+          cached,
+        );
+        return;
+      }
+      pendingRef.current = key;
+      model.send({
+        type: "layout_request",
+        layout,
+        annotation: coloringAnnotation,
+        trait: currentTrait,
+      });
     } else {
+      pendingRef.current = null;
       setLayoutMode("3d");
       updateViewState({
         ...initialCamera,
@@ -82,7 +154,10 @@ export const useLayoutMode = (
     layoutMode,
     currentTrait,
     coloringAnnotation,
-    loadedData,
+    model,
+    kernelLayouts,
+    showLayout,
+    showLocalLayout,
     initialCamera,
     updateViewState,
     setLayoutMode,
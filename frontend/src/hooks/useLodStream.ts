@@ -0,0 +1,91 @@
+import { useEffect, useRef } from "react";
+import { parse } from "@loaders.gl/core";
+import { LASWorkerLoader } from "@loaders.gl/las";
+import lasWorkerUrl from "@/utils/las-worker.js?url";
+import {
+  dequantizePositions,
+  float32View,
+  relativeBoundingBox,
+} from "@/utils/helpers";
+import type { BoundingBox, LASMesh, LodConfig } from "@/types";
+
+/**
+ * useLodStream - request LOD levels from the kernel and decode them in order.
+ *
+ * Levels arrive as custom messages ({type: "lod_level", level, levels}) with a
+ * single buffer each: LAZ (decoded in the LAS worker), raw float32 xyz or
+ * quantized grid coordinates, depending on `lodConfig.Transport`. Quantized
+ * levels are decoded relative to `lodConfig.Offset`. Levels are handed to `onLevel` strictly
+ * in order so the loaded points always form a prefix of the exported
+ * (LOD-ordered) arrays.
+ */
+export const useLodStream = (
+  // eslint-disable-next-line @typescript-eslint/no-explicit-any
+  model: any,
+  lodConfig: LodConfig | null,
+  onLevel: (
+    positions: Float32Array | Float64Array,
+    boundingBox: BoundingBox,
+    level: number,
+    config: LodConfig,
+  ) => void,
+) => {
+  // keep the latest callback without re-requesting levels when it changes
+  const onLevelRef = useRef(onLevel);
+  onLevelRef.current = onLevel;
+
+  useEffect(() => {
+    if (!model || !lodConfig || !lodConfig.Levels) return;
+
+    let cancelled = false;
+    let chain: Promise<void> = Promise.resolve();
+
+    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+    const handler = (msg: any, buffers: DataView[]) => {
+      if (msg?.type !== "lod_level" || !buffers?.length) return;
+      const dv = buffers[0];
+      let decoded: Promise<[Float32Array | Float64Array, BoundingBox]>;
+      if (lodConfig.Transport === "raw") {
+        decoded = Promise.resolve([float32View(dv), lodConfig.BoundingBox!]);
+      } else if (lodConfig.Transport === "quantized") {
+        decoded = Promise.resolve([
+          dequantizePositions(dv, {
+            DType: lodConfig.DType!,
+            Scale: lodConfig.Scale!,
+          }),
+          relativeBoundingBox(lodConfig.BoundingBox!, lodConfig.Offset!),
+        ]);
+      } else {
+        decoded = parse(
+          dv.buffer.slice(dv.byteOffset, dv.byteOffset + dv.byteLength),
+          LASWorkerLoader,
+          { las: { workerUrl: lasWorkerUrl } },
+        ).then((mesh) => {
+          const m = mesh as LASMesh;
+          return [
+            m.attributes.POSITION.value as Float32Array | Float64Array,
+            m.header!.boundingBox as BoundingBox,
+          ];
+        });
+      }
+
+      chain = chain.then(async () => {
+        try {
+          const [positions, bbox] = await decoded;
+          if (!cancelled)
+            onLevelRef.current(positions, bbox, msg.level, lodConfig);
+        } catch (e) {
+          console.error(`[SpatialVista] Failed to decode LOD level`, e);
+        }
+      });
+    };
+
+    model.on("msg:custom", handler);
+    model.send({ type: "lod_request" });
+
+    return () => {
+      cancelled = true;
+      model.off("msg:custom", handler);
+    };
+  }, [model, lodConfig]);
+};
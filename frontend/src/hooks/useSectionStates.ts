@@ -44,6 +44,26 @@ export const useSectionStates = (
   // then annotationConfig.DefaultAnnoType, then fallback to "section")
   const sliceKey = slicekeyname ?? "section";
 
+  // Point indices of one section: its range when the kernel sent a
+  // SectionIndex for this key, otherwise a scan of the annotation codes
+  const sectionPointIndices = useCallback(
+    (sectionId: number): number[] => {
+      const sectionIndex = annotationConfig?.SectionIndex;
+      if (sectionIndex?.Key === sliceKey) {
+        const range = sectionIndex.Ranges[String(sectionId)];
+        if (!range) return [];
+        const [start, stop] = range;
+        return Array.from({ length: stop - start }, (_, k) => start + k);
+      }
+      const sectionAnnotations = loadedData.extData.annotations[sliceKey];
+      return Array.from(
+        { length: sectionAnnotations.length },
+        (_, i) => i,
+      ).filter((i) => sectionAnnotations[i] === sectionId);
+    },
+    [loadedData, annotationConfig, sliceKey],
+  );
+
   // Filter point function
   const filterSectionPoints = useCallback(() => {
     if (
@@ -53,17 +73,12 @@ export const useSectionStates = (
     )
       return;
 
-    const sectionAnnotations = loadedData.extData.annotations[sliceKey];
-
     console.time(`Filter section ${currentSectionID}`);
-    const filteredIndices = Array.from(
-      { length: sectionAnnotations.length },
-      (_, i) => i,
-    ).filter((i) => sectionAnnotations[i] === currentSectionID);
+    const filteredIndices = sectionPointIndices(currentSectionID);
     console.timeEnd(`Filter section ${currentSectionID}`);
 
     setFilteredSectionPoints(filteredIndices);
-  }, [loadedData, currentSectionID, sliceKey]);
+  }, [loadedData, currentSectionID, sliceKey, sectionPointIndices]);
 
   // Watch currentSectionID for filter points
   useEffect(() => {
@@ -102,11 +117,7 @@ export const useSectionStates = (
 
     try {
       // filter
-      const sectionAnnotations = loadedData.extData.annotations[sliceKey];
-      const filteredIndices = Array.from(
-        { length: sectionAnnotations.length },
-        (_, i) => i,
-      ).filter((i) => sectionAnnotations[i] === sectionId);
+      const filteredIndices = sectionPointIndices(sectionId);
 
       if (filteredIndices.length === 0) {
         console.log(`No points found for section ${sectionId}`);
@@ -1,4 +1,4 @@
-import { useRef, useCallback, useEffect, useState } from "react";
+import { useRef, useCallback, useEffect, useMemo, useState } from "react";
 import { Device } from "@luma.gl/core";
 
 // Hooks
@@ -9,6 +9,9 @@ import { useAnnotationStates } from "@/hooks/useAnnotationStates";
 import { useUIStates } from "@/hooks/useUIStates";
 import { useSectionStates } from "@/hooks/useSectionStates";
 import { useLayoutMode } from "@/hooks/useLayoutMode";
+import { useLodStream } from "@/hooks/useLodStream";
+import { useGeneFetcher } from "@/hooks/useGeneFetcher";
+import { useChunkedTransfer } from "@/hooks/useChunkedTransfer";
 
 // Components
 import { VisHeader } from "@/components/layout/VisHeader";
@@ -19,12 +22,19 @@ import { ContinuousSelectionDialog } from "@/components/dialogs/ContinuousSelect
 import { ColorPickerDialog } from "@/components/dialogs/ColorPickerDialog";
 
 import { useWidgetModel } from "@/widget_context";
-import { parseContinuousArray } from "@/utils/helpers";
-import { decodeFloat16 } from "@/utils/helpers";
+import {
+  decodeAnnotationDictionary,
+  decodeContinuousValues,
+  dequantizePositions,
+  float32View,
+} from "@/utils/helpers";
 import type {
   AnnotationConfig,
+  AnnotationMapItem,
   ContinuousConfig,
   ContinuousField,
+  LodConfig,
+  PositionConfig,
 } from "@/types";
 
 export default function Vis({
@@ -105,97 +115,139 @@ export default function Vis({
 
   const [activeContinuous, setActiveContinuous] = useState<string | null>(null);
 
-  useEffect(() => {
-    if (!model) return;
+  // Genes fetched from the kernel on demand
+  const onDemandGenes = !!globalConfig?.GlobalConfig?.OnDemandGenes;
+  const geneFetcher = useGeneFetcher(model, onDemandGenes);
+  const allContinuousFields = useMemo(
+    () => ({ ...continuousFields, ...geneFetcher.fetchedFields }),
+    [continuousFields, geneFetcher.fetchedFields],
+  );
 
-    const configMap: Record<string, ContinuousConfig> =
-      model.get("continuous_config");
-    const bins = model.get("continuous_bins");
+  // Buffers streamed in chunks (vis(transfer="chunked")) are set on the model
+  // as they complete
+  const transferProgress = useChunkedTransfer(model);
 
-    if (!configMap || !bins) return;
+  useEffect(() => {
+    if (!model) return;
+    const handler = () => {
+      const configMap: Record<string, ContinuousConfig> =
+        model.get("continuous_config");
+      const bins = model.get("continuous_bins");
 
-    const parsed: Record<string, ContinuousField> = {};
+      if (!configMap || !bins) return;
 
-    for (const [name, config] of Object.entries(configMap) as [
-      string,
-      ContinuousConfig,
-    ][]) {
-      const dv = bins[name] as DataView | undefined;
-      if (!dv) continue;
+      const parsed: Record<string, ContinuousField> = {};
 
-      const raw = parseContinuousArray(dv, config.DType);
+      for (const [name, config] of Object.entries(configMap) as [
+        string,
+        ContinuousConfig,
+      ][]) {
+        const dv = bins[name] as DataView | undefined;
+        if (!dv) continue;
 
-      const values =
-        config.DType === "float16" ? decodeFloat16(raw as Uint16Array) : raw;
+        const values = decodeContinuousValues(dv, config);
 
-      parsed[name] = {
-        name,
-        values,
-        ContinuousConfig: config,
-      };
-    }
+        parsed[name] = {
+          name,
+          values,
+          ContinuousConfig: config,
+        };
+      }
 
-    setContinuousFields(parsed);
+      setContinuousFields(parsed);
+    };
+    model.on("change:continuous_bins", handler);
+    model.on("change:continuous_config", handler);
+    handler();
+    return () => {
+      model.off("change:continuous_bins", handler);
+      model.off("change:continuous_config", handler);
+    };
   }, [model]);
 
   useEffect(() => {
     if (!model) return;
+    // decoded dictionaries, so config and bins changes decode them once
+    const dictionaries = new WeakMap<DataView, AnnotationMapItem[]>();
+    const handler = () => {
+      const config = model.get("annotation_config");
+      const bins = model.get("annotation_bins");
 
-    const config = model.get("annotation_config");
-    const bins = model.get("annotation_bins");
-
-    if (!config || !bins) return;
-
-    const parsedBins: Record<string, Uint8Array | Uint16Array | Uint32Array> =
-      {};
-
-    for (const anno of config.AvailableAnnoTypes) {
-      const dv = bins[anno] as DataView | undefined;
-      if (!dv) continue;
+      if (!config || !bins) return;
 
-      const dtype = config.AnnoDtypes?.[anno];
+      const parsedBins: Record<
+        string,
+        Uint8Array | Uint16Array | Uint32Array
+      > = {};
 
-      if (!dtype) {
-        console.warn(
-          `[SpatialVista] Missing AnnoDtypes for annotation "${anno}", skip.`,
-        );
-        continue;
-      }
+      for (const anno of config.AvailableAnnoTypes) {
+        const dv = bins[anno] as DataView | undefined;
+        if (!dv) continue;
 
-      switch (dtype) {
-        case "uint8":
-          parsedBins[anno] = new Uint8Array(
-            dv.buffer,
-            dv.byteOffset,
-            dv.byteLength,
-          );
-          break;
+        const dtype = config.AnnoDtypes?.[anno];
 
-        case "uint16":
-          parsedBins[anno] = new Uint16Array(
-            dv.buffer,
-            dv.byteOffset,
-            dv.byteLength / 2,
+        if (!dtype) {
+          console.warn(
+            `[SpatialVista] Missing AnnoDtypes for annotation "${anno}", skip.`,
           );
-          break;
+          continue;
+        }
 
-        case "uint32":
-          parsedBins[anno] = new Uint32Array(
-            dv.buffer,
-            dv.byteOffset,
-            dv.byteLength / 4,
-          );
-          break;
+        switch (dtype) {
+          case "uint8":
+            parsedBins[anno] = new Uint8Array(
+              dv.buffer,
+              dv.byteOffset,
+              dv.byteLength,
+            );
+            break;
+
+          case "uint16":
+            parsedBins[anno] = new Uint16Array(
+              dv.buffer,
+              dv.byteOffset,
+              dv.byteLength / 2,
+            );
+            break;
+
+          case "uint32":
+            parsedBins[anno] = new Uint32Array(
+              dv.buffer,
+              dv.byteOffset,
+              dv.byteLength / 4,
+            );
+            break;
+
+          default:
+            console.error(
+              `[SpatialVista] Unsupported annotation dtype "${dtype}" for "${anno}"`,
+            );
+        }
+      }
 
-        default:
-          console.error(
-            `[SpatialVista] Unsupported annotation dtype "${dtype}" for "${anno}"`,
-          );
+      // binary dictionaries of high-cardinality annotations become Items
+      const annoMaps: AnnotationConfig["AnnoMaps"] = { ...config.AnnoMaps };
+      for (const [anno, map] of Object.entries(annoMaps)) {
+        const dv = map.Dictionary ? bins[map.Dictionary] : undefined;
+        if (map.Items || !dv) continue;
+        let items = dictionaries.get(dv);
+        if (!items) {
+          items = decodeAnnotationDictionary(dv, map.Categories ?? 0);
+          dictionaries.set(dv, items);
+        }
+        annoMaps[anno] = { ...map, Items: items };
       }
-    }
 
-    setAnnotationConfig(config);
-    setAnnotationBins(parsedBins);
+      setAnnotationConfig({ ...config, AnnoMaps: annoMaps });
+      setAnnotationBins(parsedBins);
+    };
+    model.on("change:annotation_bins", handler);
+    model.on("change:annotation_config", handler);
+    handler();
+    return () => {
+      model.off("change:annotation_bins", handler);
+      model.off("change:annotation_config", handler);
+    };
   }, [model]);
 
   useEffect(() => {
@@ -234,6 +286,20 @@ export default function Vis({
     };
   }, [model]);
 
+  // LOD config: when present, points are streamed level by level instead of
+  // arriving as a single laz_bytes blob
+  const [lodConfig, setLodConfig] = useState<LodConfig | null>(null);
+  useEffect(() => {
+    if (!model) return;
+    const handler = () => {
+      const cfg = model.get("lod_config");
+      setLodConfig(cfg && cfg.Levels ? cfg : null);
+    };
+    model.on("change:lod_config", handler);
+    handler();
+    return () => model.off("change:lod_config", handler);
+  }, [model]);
+
   // measure viz container width and keep it updated
   useEffect(() => {
     const el = vizContainerRef.current;
@@ -265,6 +331,8 @@ export default function Vis({
     numericField,
     loadNumericField,
     onDataLoad,
+    onLodLevelLoad,
+    onPositionsLoad,
   } = useDataManager({
     onLoad,
     updateViewState: viewStates.updateViewState,
@@ -275,6 +343,32 @@ export default function Vis({
     parentWidth: containerWidth,
   });
 
+  useLodStream(model, lodConfig, onLodLevelLoad);
+
+  // Positions sent without LAZ (transport="raw" or "quantized")
+  useEffect(() => {
+    if (!model) return;
+    const handler = () => {
+      const config: PositionConfig | null = model.get("position_config");
+      const dv: DataView | null = model.get("position_bytes");
+      if (!config?.Transport || !dv?.byteLength) return;
+      const positions =
+        config.Transport === "quantized"
+          ? dequantizePositions(dv, config)
+          : float32View(dv);
+      onPositionsLoad(positions, config);
+    };
+    model.on("change:position_bytes", handler);
+    model.on("change:position_config", handler);
+    handler();
+    return () => {
+      model.off("change:position_bytes", handler);
+      model.off("change:position_config", handler);
+    };
+    // onPositionsLoad changes with the container width; only react to data
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [model]);
+
   const handleSelectContinuous = useCallback(
     (name: string | null) => {
       setActiveContinuous(name);
@@ -286,7 +380,7 @@ export default function Vis({
         return;
       }
 
-      const field = continuousFields[name];
+      const field = allContinuousFields[name];
       if (!field) {
         loadNumericField(null, loadedData);
         return;
@@ -296,8 +390,17 @@ export default function Vis({
 
       uiStates.setNumericThreshold(field.ContinuousConfig.Min);
     },
-    [loadedData, continuousFields, loadNumericField, uiStates],
+    [loadedData, allContinuousFields, loadNumericField, uiStates],
   );
+
+  // select a requested gene as soon as it arrives
+  const { readyKey, clearReadyKey } = geneFetcher;
+  useEffect(() => {
+    if (readyKey && allContinuousFields[readyKey]) {
+      handleSelectContinuous(readyKey);
+      clearReadyKey();
+    }
+  }, [readyKey, allContinuousFields, handleSelectContinuous, clearReadyKey]);
   useEffect(() => {
     viewStates.setIsLoaded?.(isLoaded);
   }, [isLoaded, viewStates]);
@@ -327,6 +430,8 @@ export default function Vis({
     viewStates.initialCamera,
     viewStates.updateViewState,
     uiStates.setPointSize,
+    model,
+    !!globalConfig?.GlobalConfig?.KernelLayouts,
   );
 
   // After deck gl render
@@ -489,6 +594,7 @@ export default function Vis({
           {
             <VisualizationArea
               isLoaded={isLoaded}
+              transferProgress={transferProgress}
               showPointCloud={uiStates.showPointCloud}
               showScatterplot={uiStates.showScatterplot}
               layoutMode={viewStates.layoutMode}
@@ -556,9 +662,12 @@ export default function Vis({
       <ContinuousSelectionDialog
         open={uiStates.continuousOpen} // 可以之后改名
         activeContinuous={activeContinuous}
-        continuousFields={continuousFields}
+        continuousFields={allContinuousFields}
+        geneNames={geneFetcher.geneNames}
+        pendingGene={geneFetcher.pendingGene}
         onOpenChange={uiStates.setContinuousOpen}
         onSelectContinuous={handleSelectContinuous}
+        onRequestGene={geneFetcher.requestGene}
       />
 
       <ColorPickerDialog
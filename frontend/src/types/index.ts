@@ -23,20 +23,80 @@ export interface ColorParams {
 export interface LoadedDataHeader {
   boundingBox: [[number, number, number], [number, number, number]];
   vertexCount: number;
+  // World position of the local origin when positions (and boundingBox) are
+  // stored relative to it (transport="quantized")
+  origin?: [number, number, number];
 }
 
+export type BoundingBox = [[number, number, number], [number, number, number]];
+
+export type LodConfig = {
+  Levels: number;
+  LevelOffsets: number[];
+  PointCount: number;
+  Transport?: "laz" | "raw" | "quantized";
+  BoundingBox?: BoundingBox;
+  // transport="quantized" only
+  DType?: "uint16" | "uint32";
+  Scale?: [number, number, number];
+  Offset?: [number, number, number];
+};
+
+// Grid layout of quantized positions: world = Offset + q * Scale (per axis)
+export type PositionQuantization = {
+  DType: "uint16" | "uint32";
+  Scale: [number, number, number];
+  Offset: [number, number, number];
+};
+
+// Treemap/histogram x, y positions computed by the kernel (layout_request)
+export type KernelLayoutConfig = {
+  DType: "uint16" | "uint32";
+  Scale: [number, number];
+  Offset: [number, number];
+  PointCount: number;
+};
+
+// Layout of position_bytes (positions sent without LAZ)
+export type PositionConfig =
+  | {
+      Transport: "raw";
+      DType: "float32";
+      PointCount: number;
+      BoundingBox: BoundingBox;
+    }
+  | (PositionQuantization & {
+      Transport: "quantized";
+      PointCount: number;
+      BoundingBox: BoundingBox;
+    });
+
 export type AnnotationConfig = {
   Id: string;
   AnnoDtypes: Record<string, string>;
   AvailableAnnoTypes: string[];
   DefaultAnnoType: string;
-  AnnoMaps: Record<string, { Items: AnnotationMapItem[] }>;
+  AnnoMaps: Record<string, AnnotationMap>;
+  // point range [start, stop) of every code of Key, when each section is
+  // contiguous in the point order
+  SectionIndex?: { Key: string; Ranges: Record<string, [number, number]> };
+};
+
+// Categories of an annotation: JSON Items, or for high-cardinality
+// annotations the annotation_bins key of a binary dictionary (see
+// decodeAnnotationDictionary), expanded into Items when loaded
+export type AnnotationMap = {
+  Items?: AnnotationMapItem[];
+  Dictionary?: string;
+  Categories?: number;
 };
 
 export type AnnotationMapItem = {
   Code: number;
   Name: string;
   Color: ColorRGB;
+  // points of the category
+  Count?: number;
 };
 
 export type ContinuousConfig = {
@@ -44,6 +104,22 @@ export type ContinuousConfig = {
   Source: string;
   Min: number;
   Max: number;
+  // uint8/uint16 codes: value = Offset + code * Scale (then expm1 when
+  // Log); the top code marks NaN
+  Quantization?: { Scale: number; Offset: number; Log: boolean };
+  // "sparse": delta-encoded row indices (IndexDType) followed by NNZ values
+  Encoding?: "dense" | "sparse";
+  NNZ?: number;
+  IndexDType?: "uint16" | "uint32";
+  Length?: number;
+  // summary statistics computed by the kernel (non-NaN values)
+  Count?: number;
+  Mean?: number | null;
+  Quantiles?: { Levels: number[]; Values: (number | null)[] };
+  // SUMMARY_BINS equal bins over [Min, Max]
+  Histogram?: { Bins: number; Counts: number[] };
+  // annotation -> mean per category code (null: no values)
+  CategoryMeans?: Record<string, (number | null)[]>;
 };
 
 export type ContinuousField = {
@@ -57,7 +133,7 @@ export interface ExtData {
   numeric: ContinuousField | null;
   annotations: Record<string, Uint8Array | Uint16Array | Uint32Array | null>;
   POSITION: {
-    value: Float64Array;
+    value: Float64Array | Float32Array;
   };
 }
 
@@ -68,3 +144,25 @@ export interface LoadedData {
     [key: string]: unknown; // deck.gl attributes
   };
 }
+
+// Buffers streamed by vis(transfer="chunked") instead of trait syncs
+export type TransferManifest = {
+  ChunkBytes: number;
+  Window: number;
+  Buffers: Record<
+    string,
+    {
+      Target: string;
+      Key: string | null;
+      Version: number;
+      NBytes: number;
+      Chunks: number;
+    }
+  >;
+  Targets: Record<string, { Keyed: boolean; Buffers: string[] }>;
+};
+
+export type TransferProgress = {
+  receivedBytes: number;
+  totalBytes: number;
+};
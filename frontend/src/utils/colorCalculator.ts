@@ -1,5 +1,5 @@
 import type { ColorRGB, ExtData, ColorRGBA } from "@/types";
-import { hexToRgb } from "./helpers";
+import { colorRange, hexToRgb } from "./helpers";
 type AnnotationType = string;
 export interface ColorCalculatorParams {
   selectedCategories: Record<AnnotationType, number | null>;
@@ -84,15 +84,14 @@ export const calculatePointColor = (
   if (extData.numeric) {
     const continuounsfield = extData.numeric;
     const values = continuounsfield.values;
-    const min = continuounsfield.ContinuousConfig.Min;
-    const max = continuounsfield.ContinuousConfig.Max;
+    const [min, max] = colorRange(continuounsfield.ContinuousConfig);
     const v = values[index];
 
     if (v < NumericThreshold) {
       return [0, 0, 0, 5];
     }
 
-    const t = (v - min) / (max - min + 1e-6);
+    const t = Math.min(Math.max((v - min) / (max - min + 1e-6), 0), 1);
     return [
       Math.floor(255 * t),
       50,
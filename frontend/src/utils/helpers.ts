@@ -1,4 +1,10 @@
 import { median } from "simple-statistics";
+import type {
+  AnnotationMapItem,
+  BoundingBox,
+  ContinuousConfig,
+  PositionQuantization,
+} from "@/types";
 
 export const hexToRgb = (hex: string): [number, number, number] => {
   hex = hex.replace(/^#/, "");
@@ -15,19 +21,117 @@ export const calculateMedian = (values: number[]): number => {
   return median(values);
 };
 
+// View a float32 buffer without copying (copy only if misaligned)
+export function float32View(dv: DataView): Float32Array {
+  if (dv.byteOffset % 4 === 0) {
+    return new Float32Array(dv.buffer, dv.byteOffset, dv.byteLength / 4);
+  }
+  return new Float32Array(
+    dv.buffer.slice(dv.byteOffset, dv.byteOffset + dv.byteLength),
+  );
+}
+
+// Decode bbox-relative grid coordinates (transport="quantized") into float32
+// positions relative to the grid origin (`Offset`). Keeping the origin out of
+// the float32 values preserves precision for large absolute coordinates.
+export function dequantizePositions(
+  dv: DataView,
+  config: Pick<PositionQuantization, "DType" | "Scale">,
+): Float32Array {
+  const Grid = config.DType === "uint32" ? Uint32Array : Uint16Array;
+  const q =
+    dv.byteOffset % Grid.BYTES_PER_ELEMENT === 0
+      ? new Grid(
+          dv.buffer,
+          dv.byteOffset,
+          dv.byteLength / Grid.BYTES_PER_ELEMENT,
+        )
+      : new Grid(
+          dv.buffer.slice(dv.byteOffset, dv.byteOffset + dv.byteLength),
+        );
+  const [sx, sy, sz] = config.Scale;
+  const out = new Float32Array(q.length);
+  for (let i = 0; i < q.length; i += 3) {
+    out[i] = q[i] * sx;
+    out[i + 1] = q[i + 1] * sy;
+    out[i + 2] = q[i + 2] * sz;
+  }
+  return out;
+}
+
+// Shift a bounding box into the frame of a local origin
+export function relativeBoundingBox(
+  [mins, maxs]: BoundingBox,
+  origin: [number, number, number],
+): BoundingBox {
+  return [
+    [mins[0] - origin[0], mins[1] - origin[1], mins[2] - origin[2]],
+    [maxs[0] - origin[0], maxs[1] - origin[1], maxs[2] - origin[2]],
+  ];
+}
+
 export function parseContinuousArray(dv: DataView, dtype: string) {
+  // values after the indices of a sparse buffer may be misaligned
+  const aligned = (size: number) =>
+    dv.byteOffset % size === 0
+      ? dv
+      : new DataView(
+          dv.buffer.slice(dv.byteOffset, dv.byteOffset + dv.byteLength),
+        );
   switch (dtype) {
-    case "float32":
-      return new Float32Array(dv.buffer, dv.byteOffset, dv.byteLength / 4);
+    case "float32": {
+      const v = aligned(4);
+      return new Float32Array(v.buffer, v.byteOffset, v.byteLength / 4);
+    }
     case "float16":
-      return new Uint16Array(dv.buffer, dv.byteOffset, dv.byteLength / 2);
-    case "uint16":
-      return new Uint16Array(dv.buffer, dv.byteOffset, dv.byteLength / 2);
+    case "uint16": {
+      const v = aligned(2);
+      return new Uint16Array(v.buffer, v.byteOffset, v.byteLength / 2);
+    }
+    case "uint8":
+      return new Uint8Array(dv.buffer, dv.byteOffset, dv.byteLength);
     default:
       throw new Error(`Unsupported DType: ${dtype}`);
   }
 }
 
+// Map quantized codes (vis(precision="uint8" | "uint16" | "log-...")) back
+// to values
+export function dequantizeValues(
+  codes: Uint8Array | Uint16Array,
+  quantization: NonNullable<ContinuousConfig["Quantization"]>,
+): Float32Array {
+  const { Scale, Offset, Log } = quantization;
+  const nanCode = codes instanceof Uint8Array ? 0xff : 0xffff;
+  const output = new Float32Array(codes.length);
+  for (let i = 0; i < codes.length; i++) {
+    const q = codes[i];
+    if (q === nanCode) {
+      output[i] = NaN;
+      continue;
+    }
+    const v = Offset + q * Scale;
+    output[i] = Log ? Math.expm1(v) : v;
+  }
+  return output;
+}
+
+// Buffer values as numbers: float16 expanded, quantized codes dequantized
+function decodeValueArray(
+  dv: DataView,
+  config: ContinuousConfig,
+): Float32Array | Uint16Array {
+  const raw = parseContinuousArray(dv, config.DType);
+  if (config.Quantization) {
+    return dequantizeValues(
+      raw as Uint8Array | Uint16Array,
+      config.Quantization,
+    );
+  }
+  if (config.DType === "float16") return decodeFloat16(raw as Uint16Array);
+  return raw as Float32Array | Uint16Array;
+}
+
 export function decodeFloat16(input: Uint16Array): Float32Array {
   const output = new Float32Array(input.length);
 
@@ -61,3 +165,84 @@ export function decodeFloat16(input: Uint16Array): Float32Array {
 
   return output;
 }
+
+// Rebuild a dense vector from the sparse layout: NNZ delta-encoded row
+// indices followed by NNZ values; rows not listed are zero.
+export function decodeSparseContinuous(
+  dv: DataView,
+  config: ContinuousConfig,
+): Float32Array {
+  const nnz = config.NNZ ?? 0;
+  const output = new Float32Array(config.Length ?? 0);
+  if (nnz === 0) return output;
+
+  const deltas =
+    config.IndexDType === "uint32"
+      ? new Uint32Array(dv.buffer, dv.byteOffset, nnz)
+      : new Uint16Array(dv.buffer, dv.byteOffset, nnz);
+  const valuesView = new DataView(
+    dv.buffer,
+    dv.byteOffset + deltas.byteLength,
+    dv.byteLength - deltas.byteLength,
+  );
+  const values = decodeValueArray(valuesView, config);
+
+  let row = 0;
+  for (let i = 0; i < nnz; i++) {
+    row += deltas[i];
+    output[row] = values[i];
+  }
+  return output;
+}
+
+export function decodeContinuousValues(
+  dv: DataView,
+  config: ContinuousConfig,
+): Float32Array | Uint16Array {
+  if (config.Encoding === "sparse") {
+    return decodeSparseContinuous(dv, config);
+  }
+  return decodeValueArray(dv, config);
+}
+
+// Color scale range of a continuous trait: its 1st to 99th percentile when
+// the kernel sent quantiles (robust to outliers), else [Min, Max]
+export function colorRange(config: ContinuousConfig): [number, number] {
+  const q = config.Quantiles;
+  if (q) {
+    const lo = q.Values[q.Levels.indexOf(0.01)];
+    const hi = q.Values[q.Levels.indexOf(0.99)];
+    if (lo != null && hi != null && hi > lo) return [lo, hi];
+  }
+  return [config.Min, config.Max];
+}
+
+// Expand a binary category dictionary (export_annotations_blob, for
+// annotations with many categories) into items. Layout, little-endian:
+// uint32 offsets (n + 1), uint32 counts (n), uint8 RGB (n * 3), UTF-8 names
+export function decodeAnnotationDictionary(
+  dv: DataView,
+  n: number,
+): AnnotationMapItem[] {
+  const bytes = new Uint8Array(dv.buffer, dv.byteOffset, dv.byteLength);
+  const offsets = new Uint32Array(bytes.slice(0, 4 * (n + 1)).buffer);
+  const counts = new Uint32Array(
+    bytes.slice(4 * (n + 1), 4 * (2 * n + 1)).buffer,
+  );
+  const colorsStart = 4 * (2 * n + 1);
+  const namesStart = colorsStart + 3 * n;
+  const decoder = new TextDecoder();
+  const items: AnnotationMapItem[] = new Array(n);
+  for (let i = 0; i < n; i++) {
+    const c = colorsStart + 3 * i;
+    items[i] = {
+      Code: i,
+      Name: decoder.decode(
+        bytes.subarray(namesStart + offsets[i], namesStart + offsets[i + 1]),
+      ),
+      Color: [bytes[c], bytes[c + 1], bytes[c + 2]],
+      Count: counts[i],
+    };
+  }
+  return items;
+}
@@ -1,4 +1,4 @@
-import type { LoadedData } from "@/types";
+import type { KernelLayoutConfig, LoadedData } from "@/types";
 
 export interface TreemapRect {
   category: number;
@@ -240,3 +240,34 @@ export const generateHistogramPositions = (
 
   return histogramPos;
 };
+
+// Expand kernel layout positions (uint16/uint32 x, y grid steps) into the
+// frame of the loaded positions, which are relative to `origin` for
+// transport="quantized"
+export const decodeKernelLayout = (
+  dv: DataView,
+  config: KernelLayoutConfig,
+  origin?: [number, number, number],
+): Float32Array => {
+  const Grid = config.DType === "uint32" ? Uint32Array : Uint16Array;
+  const q =
+    dv.byteOffset % Grid.BYTES_PER_ELEMENT === 0
+      ? new Grid(
+          dv.buffer,
+          dv.byteOffset,
+          dv.byteLength / Grid.BYTES_PER_ELEMENT,
+        )
+      : new Grid(
+          dv.buffer.slice(dv.byteOffset, dv.byteOffset + dv.byteLength),
+        );
+  const [sx, sy] = config.Scale;
+  const ox = config.Offset[0] - (origin?.[0] ?? 0);
+  const oy = config.Offset[1] - (origin?.[1] ?? 0);
+  const out = new Float32Array(config.PointCount * 3);
+  for (let i = 0; i < config.PointCount; i++) {
+    out[i * 3] = ox + q[i * 2] * sx;
+    out[i * 3 + 1] = oy + q[i * 2 + 1] * sy;
+    out[i * 3 + 2] = (Math.random() - 0.5) * 0.01;
+  }
+  return out;
+};
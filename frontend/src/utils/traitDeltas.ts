@@ -0,0 +1,64 @@
+import type { AnnotationConfig } from "@/types";
+
+/**
+ * listenForTraitDeltas - merge traits added or removed after display
+ * (widget.add_genes / add_continuous / add_annotations / remove_trait) into
+ * the model.
+ *
+ * The kernel sends {type: "traits_delta", kind, configs, keys, removed} with
+ * one buffer per key. "continuous" configs are keyed by trait; "annotation"
+ * configs hold the AnnoDtypes and AnnoMaps entries of the new annotations.
+ * The merged values are set on the model locally, so the change:<trait>
+ * handlers of every view pick them up; the point cloud is left alone. With
+ * the chunked transfer `keys` is empty and the buffers arrive through
+ * useChunkedTransfer.
+ *
+ * Registered per model (anywidget `initialize`), so deltas are applied even
+ * when no view is mounted. Announces {type: "frontend_features", features:
+ * ["traits_delta"]} to the kernel, which otherwise resends the whole traits
+ * with send_state. Returns the cleanup function.
+ */
+// eslint-disable-next-line @typescript-eslint/no-explicit-any
+export function listenForTraitDeltas(model: any): () => void {
+  // eslint-disable-next-line @typescript-eslint/no-explicit-any
+  const handler = (msg: any, buffers: DataView[]) => {
+    if (msg?.type !== "traits_delta") return;
+    const removed: string[] = msg.removed ?? [];
+    const keys: string[] = msg.keys ?? [];
+
+    const binsTrait = `${msg.kind}_bins`;
+    const bins: Record<string, DataView> = { ...(model.get(binsTrait) ?? {}) };
+    for (const key of removed) delete bins[key];
+    keys.forEach((key, i) => {
+      bins[key] = buffers[i];
+    });
+    // bins first: the config change is what makes views re-read both
+    model.set(binsTrait, bins);
+
+    if (msg.kind === "continuous") {
+      const config = { ...(model.get("continuous_config") ?? {}) };
+      for (const key of removed) delete config[key];
+      Object.assign(config, msg.configs);
+      model.set("continuous_config", config);
+    } else {
+      const old: AnnotationConfig = model.get("annotation_config");
+      const added = Object.keys(msg.configs?.AnnoDtypes ?? {});
+      const keep = (k: string) => !removed.includes(k);
+      const pick = <T>(entries: Record<string, T>) =>
+        Object.fromEntries(Object.entries(entries).filter(([k]) => keep(k)));
+      model.set("annotation_config", {
+        ...old,
+        AvailableAnnoTypes: [
+          ...old.AvailableAnnoTypes.filter(keep),
+          ...added.filter((k) => !old.AvailableAnnoTypes.includes(k)),
+        ],
+        AnnoDtypes: { ...pick(old.AnnoDtypes), ...msg.configs?.AnnoDtypes },
+        AnnoMaps: { ...pick(old.AnnoMaps), ...msg.configs?.AnnoMaps },
+      });
+    }
+  };
+
+  model.on("msg:custom", handler);
+  model.send({ type: "frontend_features", features: ["traits_delta"] });
+  return () => model.off("msg:custom", handler);
+}
@@ -3,7 +3,16 @@ SpatialVista: Interactive 3D/2D spatial data visualization for Python.
 """
 
 from ._logger import get_log_level, get_logger, set_log_level
-from .visualize import vis
+from .cache import clear_cache, invalidate_cache
+from .visualize import vis, vis_file
 
 __version__ = "0.1.0"
-__all__ = ["vis", "set_log_level", "get_logger", "get_log_level"]
+__all__ = [
+    "vis",
+    "vis_file",
+    "set_log_level",
+    "get_logger",
+    "get_log_level",
+    "clear_cache",
+    "invalidate_cache",
+]
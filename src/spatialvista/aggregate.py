@@ -0,0 +1,263 @@
+# spatialvista/aggregate.py
+"""
+Voxel aggregation of the point cloud (``vis(aggregate="voxel")``).
+
+Cells are binned into a regular 3D grid and every occupied voxel becomes
+one point at the centroid of its cells. ``VoxelAggregate`` looks enough
+like AnnData for the exporters: obs columns and genes are aggregated when
+an exporter first reads them, as the majority category (categorical
+annotations) or the mean (numeric columns and genes), and the number of
+cells per voxel is available as the obs column ``VOXEL_COUNT_KEY``.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from ._logger import logger
+from .exporter import (
+    DEFAULT_CHUNK_SIZE,
+    _is_backed,
+    _iter_gene_columns,
+    _iter_gene_columns_chunked,
+    _prepare_coords,
+    _resolve_chunk_size,
+)
+from .metrics import span
+
+# Obs column holding the number of cells aggregated into each voxel
+VOXEL_COUNT_KEY = "Cells per voxel"
+
+# Dense per-voxel (or per-voxel, per-category) counting is used while the
+# table stays within this many entries per cell, sorting beyond it
+_DENSE_TABLE_RATIO = 4
+
+
+def _dense_table_ok(size: int, n_cells: int) -> bool:
+    return size <= max(_DENSE_TABLE_RATIO * n_cells, 1 << 20)
+
+
+class _VoxelObs:
+    """``obs`` of a ``VoxelAggregate``; columns are aggregated on first use."""
+
+    def __init__(self, voxels):
+        self._voxels = voxels
+        self._columns = {}
+
+    def __len__(self):
+        return self._voxels.n_obs
+
+    def __contains__(self, key):
+        return key == VOXEL_COUNT_KEY or key in self._voxels.adata.obs
+
+    def __getitem__(self, key):
+        if isinstance(key, list):
+            return pd.DataFrame({k: self[k] for k in key})
+        majority = key in self._voxels.categorical
+        column = self._columns.get((key, majority))
+        if column is None:
+            column = self._voxels._aggregate_obs(key, majority)
+            self._columns[(key, majority)] = column
+        return column
+
+
+class _VoxelMeans:
+    """
+    Expression matrix of a ``VoxelAggregate``.
+
+    Only column selections ``X[:, cols]`` are supported; they return the
+    per-voxel means of those columns as a CSR matrix, which the gene
+    exporters read like any other sparse matrix.
+    """
+
+    format = "csr"
+
+    def __init__(self, voxels, X):
+        self._voxels = voxels
+        self._X = X
+        self.shape = (voxels.n_obs, X.shape[1])
+        self.dtype = np.dtype(np.float32)
+
+    def __getitem__(self, key):
+        import scipy.sparse as sp
+
+        rows, cols = key
+        if not (isinstance(rows, slice) and rows == slice(None)):
+            raise IndexError("voxel expression supports X[:, cols] only")
+        idx = np.atleast_1d(np.arange(self.shape[1])[cols])
+        if _is_backed(self._X):
+            columns = _iter_gene_columns_chunked(
+                self._X, idx, self._voxels.chunk_size or DEFAULT_CHUNK_SIZE
+            )
+        else:
+            columns = _iter_gene_columns(self._X, idx)
+        out = np.empty((self.shape[0], len(idx)), dtype=np.float32)
+        for j, (r, v) in enumerate(columns):
+            out[:, j] = self._voxels.mean(v, rows=r)
+        return sp.csr_matrix(out)
+
+    def toarray(self):
+        return self[:, slice(None)].toarray()
+
+
+class VoxelAggregate:
+    """
+    AnnData-like view of ``adata`` with one row per occupied voxel.
+
+    Parameters
+    ----------
+    adata : AnnData
+        Cells to aggregate.
+    position_key : str
+        Key in ``adata.obsm`` with the cell coordinates.
+    voxel_size : float or sequence of float
+        Edge length of the voxels, for all axes or per axis (x, y, z).
+    mode : str, default "3D"
+        In "2D" mode z is ignored and voxels are squares.
+    categorical : sequence of str, optional
+        Obs columns aggregated by majority even though they are numeric
+        (e.g. integer cluster labels). Other categorical, string and
+        boolean columns are aggregated by majority, numeric ones by mean.
+    chunk_size : int, optional
+        Rows per chunk when reading a backed expression matrix.
+    """
+
+    def __init__(
+        self,
+        adata,
+        position_key: str,
+        voxel_size,
+        mode: str = "3D",
+        categorical=(),
+        chunk_size: int | None = None,
+    ):
+        t0 = time.perf_counter()
+        self.adata = adata
+        self.categorical = set(categorical)
+        self.chunk_size = _resolve_chunk_size(adata, chunk_size)
+
+        with span("voxels", "aggregate") as s:
+            coords = _prepare_coords(adata, position_key, mode=mode)
+            size = np.broadcast_to(
+                np.asarray(voxel_size, dtype=np.float64), (3,)
+            )
+            cell = np.floor((coords - coords.min(axis=0)) / size)
+            dims = cell.max(axis=0).astype(np.int64) + 1
+            if np.prod(dims.astype(np.float64)) >= 2**62:
+                raise ValueError(
+                    f"voxel_size {voxel_size} is too small for the extent "
+                    "of the coordinates"
+                )
+            flat = np.ravel_multi_index(cell.astype(np.int64).T, dims)
+            n_grid = int(np.prod(dims))
+            if _dense_table_ok(n_grid, len(flat)):
+                grid_counts = np.bincount(flat, minlength=n_grid)
+                occupied = np.flatnonzero(grid_counts)
+                voxel_of = np.empty(n_grid, dtype=np.intp)
+                voxel_of[occupied] = np.arange(len(occupied))
+                self.inverse = voxel_of[flat]
+                self.counts = grid_counts[occupied]
+            else:
+                _, self.inverse, self.counts = np.unique(
+                    flat, return_inverse=True, return_counts=True
+                )
+            self.n_obs = len(self.counts)
+
+            positions = np.asarray(adata.obsm[position_key], dtype=np.float64)
+            centroids = np.column_stack(
+                [
+                    np.bincount(
+                        self.inverse,
+                        weights=positions[:, d],
+                        minlength=self.n_obs,
+                    )
+                    / self.counts
+                    for d in range(positions.shape[1])
+                ]
+            )
+            s.set(voxels=self.n_obs)
+
+        self.obsm = {position_key: centroids}
+        self.obs = _VoxelObs(self)
+        self.var_names = adata.var_names
+        X = getattr(adata, "X", None)
+        self.X = None if X is None else _VoxelMeans(self, X)
+        self.layers = {
+            name: _VoxelMeans(self, layer)
+            for name, layer in getattr(adata, "layers", {}).items()
+        }
+        logger.info(
+            "VoxelAggregate: {} cells in {} voxels (voxel_size={}, up to {} "
+            "cells per voxel) in {:.3f}s",
+            len(self.inverse),
+            self.n_obs,
+            voxel_size,
+            int(self.counts.max()),
+            time.perf_counter() - t0,
+        )
+
+    def cells(self, voxels) -> np.ndarray:
+        """Obs row indices of the cells aggregated into the given voxels."""
+        return np.flatnonzero(np.isin(self.inverse, voxels))
+
+    def mean(self, values, rows=None) -> np.ndarray:
+        """
+        Per-voxel float32 mean of a column given for every cell, or for the
+        cells ``rows`` only (a sparse column, zero elsewhere). NaN values
+        are left out of the mean.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        voxel = self.inverse if rows is None else self.inverse[rows]
+        counts = self.counts
+        missing = np.isnan(values)
+        if missing.any():
+            counts = counts - np.bincount(voxel[missing], minlength=self.n_obs)
+            voxel, values = voxel[~missing], values[~missing]
+        sums = np.bincount(voxel, weights=values, minlength=self.n_obs)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (sums / counts).astype(np.float32)
+
+    def majority(self, column) -> pd.Categorical:
+        """
+        Most frequent value of ``column`` per voxel (missing values do not
+        vote). Ties go to the lowest code: the earlier category for
+        categorical columns, which keep their categories, and otherwise
+        the value appearing first in the whole column.
+        """
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes = column.cat.codes.to_numpy()
+            categories = column.cat.categories
+        else:
+            codes, categories = pd.factorize(column)
+        n_cats = max(len(categories), 1)
+
+        voted = codes >= 0
+        pairs = self.inverse[voted].astype(np.int64) * n_cats + codes[voted]
+        if _dense_table_ok(self.n_obs * n_cats, len(codes)):
+            table = np.bincount(pairs, minlength=self.n_obs * n_cats).reshape(
+                self.n_obs, n_cats
+            )
+            top = np.where(table.max(axis=1) > 0, table.argmax(axis=1), -1)
+        else:
+            top = np.full(self.n_obs, -1, dtype=np.int64)
+            pair_ids, pair_counts = np.unique(pairs, return_counts=True)
+            voxel, code = np.divmod(pair_ids, n_cats)
+            order = np.lexsort((-pair_counts, voxel))
+            voxel, code = voxel[order], code[order]
+            first = np.r_[True, voxel[1:] != voxel[:-1]]
+            top[voxel[first]] = code[first]
+        return pd.Categorical.from_codes(top, categories=categories)
+
+    def _aggregate_obs(self, key, majority: bool) -> pd.Series:
+        if key == VOXEL_COUNT_KEY:
+            return pd.Series(self.counts, name=key)
+        column = self.adata.obs[key]
+        with span(f"voxels:{key}", "aggregate"):
+            if (
+                majority
+                or not pd.api.types.is_numeric_dtype(column.dtype)
+                or pd.api.types.is_bool_dtype(column.dtype)
+            ):
+                return pd.Series(self.majority(column), name=key)
+            return pd.Series(self.mean(column.to_numpy()), name=key)
@@ -0,0 +1,795 @@
+# spatialvista/cache.py
+"""
+Caches for exported buffers.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+import weakref
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from ._logger import logger
+from .metrics import span
+
+# Default size cap of the on-disk export cache
+DEFAULT_DISK_CACHE_BYTES = 4 * 1024 * 1024 * 1024
+
+# Default size cap of the process-wide in-memory export cache
+DEFAULT_MEMORY_CACHE_BYTES = 1024 * 1024 * 1024
+
+# Elements sampled per array for the in-memory cache fingerprint
+_FINGERPRINT_SAMPLES = 64
+
+# Arrays up to this size are fingerprinted by their full content
+_FINGERPRINT_FULL_BYTES = 4 * 1024 * 1024
+
+
+def _nbytes(value) -> int:
+    """Approximate payload size of a cached value in bytes."""
+    if value is None:
+        return 0
+    if isinstance(value, memoryview):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(v) for v in value)
+    return getattr(value, "nbytes", 0)
+
+
+class ByteLRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by total payload bytes.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Upper bound on the summed size of cached values. Entries larger than
+        this are never cached.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of cached values in bytes."""
+        return self._total
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value, nbytes: int | None = None) -> None:
+        size = _nbytes(value) if nbytes is None else int(nbytes)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                logger.debug(
+                    "ByteLRUCache: not caching {} ({} bytes > max {})",
+                    key,
+                    size,
+                    self.max_bytes,
+                )
+                return
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._total += size
+            while self._total > self.max_bytes:
+                old_key = next(iter(self._entries))
+                self._remove(old_key)
+                logger.debug("ByteLRUCache: evicted {}", old_key)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            value = self._entries[key]
+            self._remove(key)
+            return value
+
+    def items(self) -> list:
+        """Snapshot of the (key, value) pairs, least recently used first."""
+        with self._lock:
+            return list(self._entries.items())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total = 0
+
+    def _remove(self, key) -> None:
+        del self._entries[key]
+        self._total -= self._sizes.pop(key)
+
+
+def _backed_location(part):
+    """
+    ``(path, dataset name)`` for on-disk arrays (h5py datasets and zarr
+    arrays, or wrappers exposing them as ``group`` like anndata backed
+    sparse matrices), None for anything else.
+    """
+    group = getattr(part, "group", None)
+    if hasattr(part, "to_memory") and group is not None:
+        part = group
+    name = getattr(part, "name", None)
+    # h5py: file.filename; zarr: store.path (v2) or store.root (v3)
+    filename = getattr(getattr(part, "file", None), "filename", None)
+    if filename is None and hasattr(part, "attrs"):
+        store = getattr(part, "store", None)
+        filename = getattr(store, "path", None) or getattr(store, "root", None)
+    if filename is None or name is None:
+        return None
+    return os.fspath(filename), name
+
+
+def _update_hash(h, part) -> None:
+    """Feed one key part into hasher ``h``; arrays are hashed by content."""
+    if part is None or isinstance(part, (str, int, float, bool)):
+        h.update(f"{type(part).__name__}:{part!r};".encode())
+    elif isinstance(part, (bytes, bytearray, memoryview)):
+        h.update(b"bytes;")
+        h.update(part)
+    elif isinstance(part, (list, tuple)):
+        h.update(f"seq{len(part)}[".encode())
+        for p in part:
+            _update_hash(h, p)
+        h.update(b"]")
+    elif isinstance(part, dict):
+        h.update(f"dict{len(part)}{{".encode())
+        for k in sorted(part, key=str):
+            _update_hash(h, k)
+            _update_hash(h, part[k])
+        h.update(b"}")
+    elif isinstance(part, (pd.Series, pd.Index, pd.Categorical)):
+        values = part.array if hasattr(part, "array") else part
+        if isinstance(values, pd.Categorical):
+            h.update(b"categorical;")
+            _update_hash(h, np.asarray(values.codes))
+            _update_hash(h, values.categories)
+        else:
+            h.update(f"pandas:{part.dtype};".encode())
+            _update_hash(h, np.asarray(values))
+    elif isinstance(part, _GeneColumns):
+        h.update(b"columns;")
+        _update_hash(h, part.X)
+    elif _backed_location(part) is not None:
+        # on-disk arrays are identified by file, dataset and file state
+        # rather than read in full
+        filename, name = _backed_location(part)
+        st = os.stat(filename)
+        h.update(
+            f"backed:{os.path.abspath(filename)}:{name}:{st.st_size}:"
+            f"{st.st_mtime_ns};".encode()
+        )
+    elif hasattr(part, "toarray") and hasattr(part, "data"):
+        # scipy sparse matrix / array
+        h.update(f"sparse:{part.format}:{part.shape};".encode())
+        for name in ("data", "indices", "indptr", "row", "col", "offsets"):
+            if hasattr(part, name):
+                _update_hash(h, np.asarray(getattr(part, name)))
+    else:
+        arr = np.asarray(part)
+        h.update(f"array:{arr.dtype.str}:{arr.shape};".encode())
+        if arr.dtype.hasobject:
+            arr = pd.util.hash_array(arr.ravel())
+        arr = np.ascontiguousarray(arr)
+        h.update(memoryview(arr).cast("B"))
+
+
+class _GeneColumns:
+    """
+    AnnData stand-in holding the columns ``idx`` of an in-memory expression
+    matrix (as ``X``, and under ``layer``), selected on first use.
+
+    As a cache key part it is the matrix itself for the in-memory cache
+    (see ``_fingerprint``) and the content of the selected columns for the
+    disk cache, so a memory hit selects nothing and a disk lookup does not
+    hash all of the matrix.
+    """
+
+    def __init__(self, matrix, idx, genes, layer=None):
+        self.matrix = matrix
+        self.var_names = pd.Index(genes)
+        self.n_obs = matrix.shape[0]
+        self._idx = idx
+        self._layer = layer
+        self._X = None
+        self._lock = threading.Lock()
+
+    @property
+    def X(self):
+        with self._lock:
+            if self._X is None:
+                with span("genes", "extract"):
+                    self._X = self.matrix[:, self._idx]
+            return self._X
+
+    @property
+    def layers(self) -> dict:
+        return {self._layer: self.X} if self._layer else {}
+
+
+def gene_export_source(adata, genes, layer=None):
+    """
+    Cache key parts and export source of the genes ``genes`` of ``adata``
+    (``X``, or ``layers[layer]``).
+
+    For an in-memory matrix the source is a ``_GeneColumns`` stand-in, so
+    the requested columns are selected once, when the disk cache key or
+    the exporter needs them. On-disk matrices are identified by file (see
+    ``_backed_location``) and exported from ``adata`` in chunks.
+
+    Returns:
+      key_parts: tuple
+      source: AnnData-like
+    """
+    from .exporter import _is_backed, _resolve_gene_indices
+
+    X = adata.layers[layer] if layer else adata.X
+    unique = list(dict.fromkeys(genes))
+    idx = _resolve_gene_indices(adata.var_names, unique)
+    if _is_backed(X) or getattr(adata, "isbacked", False):
+        return (idx, X), adata
+    columns = _GeneColumns(X, idx, unique, layer)
+    return (idx, columns), columns
+
+
+def content_hash(*parts) -> str:
+    """
+    Hash key parts (arrays, pandas objects, sparse matrices, scalars and
+    nested sequences/dicts of those) by content.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        _update_hash(h, part)
+    return h.hexdigest()
+
+
+def _to_stored(value, arrays: list):
+    """
+    JSON-safe description of ``value`` with its arrays and byte buffers
+    moved to ``arrays``. Every container is tagged, so tuples, non-string
+    dict keys and buffers load back as they were stored.
+    """
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        arrays.append(np.frombuffer(value, dtype=np.uint8))
+        return {"bytes": len(arrays) - 1}
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            raise TypeError("object arrays cannot be cached")
+        arrays.append(value)
+        return {"array": len(arrays) - 1}
+    if isinstance(value, (list, tuple)):
+        items = [_to_stored(v, arrays) for v in value]
+        return items if isinstance(value, list) else {"tuple": items}
+    if isinstance(value, dict):
+        return {
+            "dict": [
+                [_to_stored(k, arrays), _to_stored(v, arrays)]
+                for k, v in value.items()
+            ]
+        }
+    raise TypeError(f"cannot cache {type(value).__name__}")
+
+
+def _from_stored(stored, arrays):
+    """Inverse of ``_to_stored``; byte buffers load as memoryviews."""
+    if isinstance(stored, list):
+        return [_from_stored(v, arrays) for v in stored]
+    if not isinstance(stored, dict):
+        return stored
+    ((tag, item),) = stored.items()
+    if tag == "bytes":
+        return memoryview(arrays[f"a{item}"])
+    if tag == "array":
+        return arrays[f"a{item}"]
+    if tag == "tuple":
+        return tuple(_from_stored(v, arrays) for v in item)
+    if tag == "dict":
+        return {
+            _from_stored(k, arrays): _from_stored(v, arrays) for k, v in item
+        }
+    raise ValueError(f"unknown cache entry tag {tag!r}")
+
+
+class DiskCache:
+    """
+    Content-addressed on-disk cache for exporter outputs.
+
+    Entries are stored under ``path`` as uncompressed ``.npz`` files, the
+    arrays and buffers of the value plus a JSON description of its
+    structure, and are loaded without pickle. They are evicted least
+    recently used first once their total size exceeds ``max_bytes``.
+
+    Parameters
+    ----------
+    path : str or Path, optional
+        Cache directory. Defaults to ``$SPATIALVISTA_CACHE_DIR`` or
+        ``~/.cache/spatialvista``.
+    max_bytes : int, optional
+        Size cap. Defaults to ``$SPATIALVISTA_CACHE_MAX_BYTES`` or 4 GiB.
+    """
+
+    def __init__(self, path=None, max_bytes: int | None = None):
+        if path is None:
+            path = os.environ.get("SPATIALVISTA_CACHE_DIR") or (
+                Path.home() / ".cache" / "spatialvista"
+            )
+        if max_bytes is None:
+            max_bytes = int(
+                os.environ.get(
+                    "SPATIALVISTA_CACHE_MAX_BYTES", DEFAULT_DISK_CACHE_BYTES
+                )
+            )
+        self.path = Path(path)
+        self.max_bytes = int(max_bytes)
+
+    def _entry(self, key: str) -> Path:
+        return self.path / f"{key}.npz"
+
+    def get(self, key: str, default=None):
+        entry = self._entry(key)
+        try:
+            with np.load(entry, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+            structure = json.loads(arrays.pop("structure").tobytes())
+            value = _from_stored(structure, arrays)
+        except FileNotFoundError:
+            return default
+        except (
+            OSError,
+            EOFError,
+            LookupError,
+            TypeError,
+            ValueError,
+            zipfile.BadZipFile,
+        ) as e:
+            logger.warning("DiskCache: dropping unreadable {}: {}", entry, e)
+            entry.unlink(missing_ok=True)
+            return default
+        # mark as recently used for eviction
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: str, value) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        entry = self._entry(key)
+        tmp = entry.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        try:
+            arrays = []
+            structure = json.dumps(_to_stored(value, arrays))
+            with open(tmp, "wb") as f:
+                np.savez(
+                    f,
+                    structure=np.frombuffer(
+                        structure.encode(), dtype=np.uint8
+                    ),
+                    **{f"a{i}": a for i, a in enumerate(arrays)},
+                )
+            os.replace(tmp, entry)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("DiskCache: failed to write {}: {}", entry, e)
+            tmp.unlink(missing_ok=True)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used entries until under ``max_bytes``."""
+        entries = []
+        for entry in self.path.glob("*.npz"):
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                logger.debug("DiskCache: {} removed concurrently", entry.name)
+                continue
+            except OSError as e:
+                logger.warning("DiskCache: cannot stat {}: {}", entry, e)
+                continue
+            entries.append((st.st_mtime, st.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+            logger.debug("DiskCache: evicted {}", entry.name)
+
+    def clear(self) -> None:
+        # .pkl: entries of earlier versions, which are never loaded
+        for pattern in ("*.npz", "*.pkl"):
+            for entry in self.path.glob(pattern):
+                entry.unlink(missing_ok=True)
+
+
+def _array_root(arr):
+    """The ndarray owning the memory of ``arr`` (``arr`` for non-views)."""
+    while isinstance(arr.base, np.ndarray):
+        arr = arr.base
+    return arr
+
+
+def _array_fingerprint(arr, roots):
+    """
+    Identity of an ndarray's memory plus a strided sample of its values.
+
+    The owning array is added to ``roots``, so a cache entry can tell when
+    its source has been freed (and the address possibly reused). Small
+    arrays, e.g. category codes or sampled indices rebuilt on every call,
+    are identified by their content instead.
+    """
+    if arr.nbytes <= _FINGERPRINT_FULL_BYTES:
+        return ("content", content_hash(arr))
+    roots.append(_array_root(arr))
+    n = arr.size
+    sample = arr.flat[
+        np.linspace(0, n - 1, min(n, _FINGERPRINT_SAMPLES)).astype(np.int64)
+    ]
+    if sample.dtype.hasobject:
+        sample = pd.util.hash_array(sample)
+    digest = hashlib.blake2b(sample.tobytes(), digest_size=8).hexdigest()
+    return (
+        "array",
+        arr.__array_interface__["data"][0],
+        arr.shape,
+        arr.strides,
+        arr.dtype.str,
+        digest,
+    )
+
+
+def _fingerprint(part, roots):
+    """
+    Cheap in-memory cache key of one key part: large arrays are identified
+    by their memory and a sample of their values instead of being hashed in
+    full (see ``content_hash`` for the disk cache).
+    """
+    if part is None or isinstance(part, (str, int, float, bool)):
+        return part
+    if isinstance(part, (bytes, bytearray, memoryview)):
+        return ("bytes", hashlib.blake2b(part, digest_size=16).hexdigest())
+    if isinstance(part, (list, tuple)):
+        return ("seq", *(_fingerprint(p, roots) for p in part))
+    if isinstance(part, dict):
+        return (
+            "dict",
+            *(
+                (str(k), _fingerprint(part[k], roots))
+                for k in sorted(part, key=str)
+            ),
+        )
+    if isinstance(part, (pd.Series, pd.Index, pd.Categorical)):
+        values = part.array if hasattr(part, "array") else part
+        if isinstance(values, pd.Categorical):
+            return (
+                "categorical",
+                _fingerprint(np.asarray(values.codes), roots),
+                _fingerprint(values.categories, roots),
+            )
+        return (
+            "pandas",
+            str(part.dtype),
+            _fingerprint(np.asarray(values), roots),
+        )
+    if isinstance(part, _GeneColumns):
+        return ("columns", _fingerprint(part.matrix, roots))
+    if _backed_location(part) is not None:
+        filename, name = _backed_location(part)
+        st = os.stat(filename)
+        return (
+            "backed",
+            os.path.abspath(filename),
+            name,
+            st.st_size,
+            st.st_mtime_ns,
+        )
+    if hasattr(part, "toarray") and hasattr(part, "data"):
+        return (
+            "sparse",
+            part.format,
+            part.shape,
+            *(
+                _fingerprint(np.asarray(getattr(part, name)), roots)
+                for name in ("data", "indices", "indptr", "row", "col")
+                if hasattr(part, name)
+            ),
+        )
+    return _array_fingerprint(np.asarray(part), roots)
+
+
+def _source_parts(obj):
+    """The arrays an AnnData-like object or DataFrame is exported from."""
+    if hasattr(obj, "obs") and hasattr(obj, "obsm"):
+        yield from _source_parts(obj.obs)
+        yield from obj.obsm.values()
+        yield obj.X
+        yield from getattr(obj, "layers", {}).values()
+    elif isinstance(obj, pd.DataFrame):
+        for column in obj:
+            yield obj[column]
+    else:
+        yield obj
+
+
+class MemoryCache:
+    """
+    Process-wide in-memory cache of exporter outputs, shared by all widgets.
+
+    Entries are keyed by the exporter and a fingerprint of the key parts
+    (``_fingerprint``): the identity, shape, strides and dtype of every
+    large source array plus a sample of its values. This is cheap to
+    compute but does not see every in-place change; call ``invalidate``
+    (or ``spv.invalidate_cache``) after modifying a source in place.
+    Entries whose source arrays have been freed are dropped.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Size cap; least recently used entries are evicted beyond it.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MEMORY_CACHE_BYTES):
+        self._lru = ByteLRUCache(max_bytes)
+
+    @property
+    def max_bytes(self) -> int:
+        return self._lru.max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: int) -> None:
+        self._lru.max_bytes = int(value)
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of cached values in bytes."""
+        return self._lru.nbytes
+
+    def __len__(self):
+        return len(self._lru)
+
+    def key(self, name: str, key_parts):
+        """
+        Cache key of ``key_parts`` for exporter ``name``, and weak
+        references to the source arrays it was computed from (None when
+        one cannot be tracked, so the entry is never stored).
+        """
+        roots = []
+        key = (name, _fingerprint(key_parts, roots))
+        refs = []
+        for root in roots:
+            try:
+                refs.append(weakref.ref(root))
+            except TypeError:
+                return key, None
+        return key, refs
+
+    def get(self, key, default=None):
+        entry = self._lru.get(key)
+        if entry is None:
+            return default
+        refs, value = entry
+        if any(ref() is None for ref in refs):
+            self._lru.pop(key)
+            return default
+        return value
+
+    def put(self, key, refs, value) -> None:
+        if refs is None:
+            return
+        self._lru.put(key, (refs, value), nbytes=_nbytes(value))
+
+    def invalidate(self, obj) -> int:
+        """
+        Drop the entries computed from ``obj`` (an AnnData-like object, a
+        DataFrame or an array). Returns the number of entries dropped.
+        """
+        roots = []
+        for part in _source_parts(obj):
+            try:
+                _fingerprint(part, roots)
+            except (TypeError, ValueError, OSError) as e:
+                logger.debug("invalidate_cache: skipping {}: {}", type(part), e)
+        ids = {id(root) for root in roots}
+        keys = [
+            key
+            for key, (refs, _) in self._lru.items()
+            if any(id(ref()) in ids for ref in refs if ref() is not None)
+        ]
+        return sum(self._lru.pop(key) is not None for key in keys)
+
+    def clear(self) -> None:
+        self._lru.clear()
+
+
+_memory_cache = MemoryCache()
+
+
+def memory_cache_enabled() -> bool:
+    """
+    The in-memory cache is on unless ``$SPATIALVISTA_NO_MEMORY_CACHE`` is
+    set.
+    """
+    return os.environ.get("SPATIALVISTA_NO_MEMORY_CACHE", "") in ("", "0")
+
+
+def memory_cache() -> MemoryCache:
+    """
+    The process-wide ``MemoryCache``, capped by
+    ``$SPATIALVISTA_MEMORY_CACHE_MAX_BYTES`` (default 1 GiB).
+    """
+    _memory_cache.max_bytes = int(
+        os.environ.get(
+            "SPATIALVISTA_MEMORY_CACHE_MAX_BYTES", DEFAULT_MEMORY_CACHE_BYTES
+        )
+    )
+    return _memory_cache
+
+
+def disk_cache_enabled() -> bool:
+    """The disk cache is on unless ``$SPATIALVISTA_NO_CACHE`` is set."""
+    return os.environ.get("SPATIALVISTA_NO_CACHE", "") in ("", "0")
+
+
+class ExportCaches(NamedTuple):
+    """The caches ``cached_call`` consults: process memory, then disk."""
+
+    memory: MemoryCache | None = None
+    disk: DiskCache | None = None
+
+
+def export_caches(cache: bool = True) -> ExportCaches | None:
+    """The enabled export caches for a ``vis()`` call with ``cache``."""
+    if not cache:
+        return None
+    return ExportCaches(
+        memory=memory_cache() if memory_cache_enabled() else None,
+        disk=DiskCache() if disk_cache_enabled() else None,
+    )
+
+
+def cached_call(caches, name: str, key_parts, fn, *args, **kwargs):
+    """
+    Return ``fn(*args, **kwargs)``, reusing a cached result for the same
+    exporter ``name``, exporter version and ``key_parts``.
+
+    ``caches`` is an ``ExportCaches`` (or a bare ``DiskCache``); results
+    are looked up in process memory first, where a lookup costs a
+    fingerprint of the key parts, and then on disk, where it costs a full
+    content hash.
+    """
+    if isinstance(caches, DiskCache):
+        caches = ExportCaches(disk=caches)
+    if caches is None or (caches.memory is None and caches.disk is None):
+        return fn(*args, **kwargs)
+
+    from .exporter import EXPORTER_VERSION
+
+    memory = caches.memory
+    if memory is not None:
+        t0 = time.perf_counter()
+        with span(f"cache:{name}", "memory_read") as sp:
+            key, refs = memory.key(f"{name}:{EXPORTER_VERSION}", key_parts)
+            value = memory.get(key)
+            sp.set(hit=value is not None)
+        if value is not None:
+            logger.info(
+                "cache: memory hit for {} in {:.3f}s",
+                name,
+                time.perf_counter() - t0,
+            )
+            return value
+
+    if caches.disk is not None:
+        value = _disk_cached_call(
+            caches.disk, name, key_parts, fn, *args, **kwargs
+        )
+    else:
+        value = fn(*args, **kwargs)
+
+    if memory is not None:
+        with span(f"cache:{name}", "memory_write"):
+            memory.put(key, refs, value)
+    return value
+
+
+def _disk_cached_call(disk, name: str, key_parts, fn, *args, **kwargs):
+    """``cached_call`` through the disk cache only."""
+    from .exporter import EXPORTER_VERSION
+
+    t0 = time.perf_counter()
+    with span(f"cache:{name}", "hash"):
+        key = content_hash(name, EXPORTER_VERSION, *key_parts)
+    t_hash = time.perf_counter() - t0
+
+    with span(f"cache:{name}", "cache_read") as sp:
+        value = disk.get(key)
+        sp.set(hit=value is not None)
+    if value is not None:
+        logger.info(
+            "cache: hit for {} (key={} hash {:.3f}s, total {:.3f}s)",
+            name,
+            key[:12],
+            t_hash,
+            time.perf_counter() - t0,
+        )
+        return value
+
+    value = fn(*args, **kwargs)
+    with span(f"cache:{name}", "cache_write"):
+        disk.put(key, value)
+    logger.info(
+        "cache: stored {} (key={} hash {:.3f}s, total {:.3f}s)",
+        name,
+        key[:12],
+        t_hash,
+        time.perf_counter() - t0,
+    )
+    return value
+
+
+def clear_cache(disk: bool = True, memory: bool = True) -> None:
+    """
+    Delete all cached exported buffers, on disk and in process memory.
+
+    Examples
+    --------
+    >>> import spatialvista as spv
+    >>> spv.clear_cache()
+    """
+    if disk:
+        DiskCache().clear()
+    if memory:
+        _memory_cache.clear()
+
+
+def invalidate_cache(obj) -> None:
+    """
+    Forget the buffers exported from ``obj`` (an AnnData, a DataFrame or an
+    array) and kept in process memory.
+
+    The in-memory cache recognizes large source arrays by identity and a
+    sample of their values, so call this after modifying ``obj`` in place.
+    The disk cache is keyed by content and needs no invalidation.
+
+    Examples
+    --------
+    >>> adata.obs.loc[mask, "celltype"] = "T cell"
+    >>> spv.invalidate_cache(adata)
+    """
+    dropped = _memory_cache.invalidate(obj)
+    logger.info("invalidate_cache: dropped {} cached exports", dropped)
@@ -9,12 +9,69 @@ import numpy as np
 import pandas as pd
 
 from ._logger import logger
+from .metrics import span
+from .stats import CategorySums, category_counts, value_summary
+
+# Bump whenever the layout of exported buffers or configs changes; it is
+# part of every disk cache key.
+EXPORTER_VERSION = "7"
+
+# Rows processed per chunk when exporting from backed (on-disk) AnnData
+DEFAULT_CHUNK_SIZE = 65536
+
+# Annotations with at least this many categories send their dictionary
+# (names, colors, counts) as one binary buffer instead of JSON items, when
+# enabled with vis(binary_dictionaries=True)
+BINARY_DICTIONARY_MIN_CATEGORIES = 1024
+
+# annotation_bins key of the binary dictionary of an annotation
+DICTIONARY_SUFFIX = ":dictionary"
+
+# Value encodings of continuous traits (vis(precision=...)); the uint
+# encodings quantize linearly, the "log-" ones quantize log1p(value)
+PRECISIONS = (
+    "float32",
+    "float16",
+    "uint16",
+    "uint8",
+    "log-uint16",
+    "log-uint8",
+)
+
+# Largest error of precision="auto", as a fraction of the value range
+DEFAULT_PRECISION_TOLERANCE = 1e-3
+
+# Encodings tried by precision="auto", smallest first
+_AUTO_PRECISIONS = (
+    "uint8",
+    "log-uint8",
+    "uint16",
+    "log-uint16",
+    "float16",
+    "float32",
+)
+
+# Points handed to the LAS writer per call when positions are in memory:
+# bounds the point record buffer, and gives the parallel LAZ compressor
+# (50k-point chunks) enough independent chunks to spread across cores
+LAS_WRITE_POINTS = 1 << 20
 
 
 def _now():
     return time.perf_counter()
 
 
+def _as_buffer(arr) -> memoryview:
+    """
+    Flat byte view of ``arr`` for the widget comm.
+
+    The view shares memory with the array (copied only if not
+    C-contiguous), so exported buffers reach the wire without an
+    intermediate bytes object.
+    """
+    return memoryview(np.ascontiguousarray(arr)).cast("B")
+
+
 def write_bin(array, path):
     start = _now()
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -45,24 +102,84 @@ def name_to_rgb(name: str) -> tuple[int, int, int]:
     return (lift(r), lift(g), lift(b))
 
 
-def write_laz(adata, position_key, path, mode: str = "3D"):
+def names_to_rgb(names) -> np.ndarray:
     """
-    Write point cloud data to LAZ format.
+    ``name_to_rgb`` of every name, as a uint8 (n, 3) array.
 
-    Parameters
-    ----------
-    adata : AnnData
-        Annotated data object.
-    position_key : str
-        Key in adata.obsm containing spatial coordinates.
-    path : str or Path or BytesIO
-        Output path or buffer.
-    mode : str, default "3D"
-        Visualization mode: "3D" or "2D".
+    Only the md5 digests are computed per name; the color mapping runs on
+    all of them at once.
     """
-    start = _now()
-    header = laspy.LasHeader(point_format=3, version="1.2")
-    coords = np.asanyarray(adata.obsm[position_key])
+    return _encoded_names_to_rgb([str(n).encode("utf-8") for n in names])
+
+
+def _encoded_names_to_rgb(encoded) -> np.ndarray:
+    digests = b"".join(hashlib.md5(b).digest()[:3] for b in encoded)
+    rgb = np.frombuffer(digests, dtype=np.uint8).reshape(-1, 3)
+    # same lift as name_to_rgb: int() and astype both truncate
+    return (0.6 * rgb + 80).astype(np.uint8)
+
+
+def _encode_dictionary(cats, counts) -> memoryview:
+    """
+    Binary category dictionary of a high-cardinality annotation.
+
+    Layout (little-endian, n categories):
+      offsets: uint32 (n + 1), names[i] = names_utf8[offsets[i]:offsets[i+1]]
+      counts: uint32 (n), points per category
+      colors: uint8 (n, 3), ``name_to_rgb`` of every name
+      names_utf8: the concatenated UTF-8 names
+    """
+    encoded = [str(name).encode("utf-8") for name in cats]
+    n = len(encoded)
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=n)
+    offsets = np.zeros(n + 1, dtype="<u4")
+    np.cumsum(lengths, out=offsets[1:])
+    names = b"".join(encoded)
+
+    head = 4 * (n + 1) + 4 * n
+    out = np.empty(head + 3 * n + len(names), dtype=np.uint8)
+    out[: 4 * (n + 1)] = offsets.view(np.uint8)
+    out[4 * (n + 1) : head] = np.asarray(counts, dtype="<u4").view(np.uint8)
+    out[head : head + 3 * n] = _encoded_names_to_rgb(encoded).reshape(-1)
+    out[head + 3 * n :] = np.frombuffer(names, dtype=np.uint8)
+    return _as_buffer(out)
+
+
+def _take_rows(values, indices):
+    """Select (and reorder) rows of ``values``; ``indices=None`` keeps all rows."""
+    if indices is None:
+        return values
+    return values[indices]
+
+
+def _is_backed(X) -> bool:
+    """True for on-disk matrices (h5py datasets, anndata backed sparse)."""
+    return hasattr(X, "to_memory") or (
+        hasattr(X, "file") and hasattr(X, "name") and hasattr(X, "shape")
+    )
+
+
+def _resolve_chunk_size(adata, chunk_size: int | None = None):
+    """
+    Rows per chunk: ``chunk_size`` if given, ``DEFAULT_CHUNK_SIZE`` for
+    backed AnnData, otherwise None (process everything in one pass).
+    """
+    if chunk_size is not None:
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        return int(chunk_size)
+    if getattr(adata, "isbacked", False):
+        return DEFAULT_CHUNK_SIZE
+    return None
+
+
+def _to_xyz(coords, mode: str = "3D"):
+    """
+    Convert coordinates to a float64 (n, 3) array.
+
+    2D inputs get a zero z column, and in "2D" mode z is flattened to zero.
+    """
+    coords = np.asanyarray(coords)
 
     # Handle 2D coordinates: add z dimension if needed
     if coords.shape[1] == 2:
@@ -77,17 +194,59 @@ def write_laz(adata, position_key, path, mode: str = "3D"):
             f"Expected 2 or 3 spatial dimensions, got {coords.shape[1]}"
         )
 
-    x = coords[:, 0].astype(np.float64)
-    y = coords[:, 1].astype(np.float64)
-    z = coords[:, 2].astype(np.float64)
+    coords = coords.astype(np.float64)
 
     # In 2D mode, flatten z coordinate
     if mode == "2D":
-        z = np.zeros_like(x, dtype=np.float64)
+        coords[:, 2] = 0.0
+
+    return coords
+
+
+def _prepare_coords(adata, position_key, mode: str = "3D", indices=None):
+    """Read spatial coordinates as a float64 (n, 3) array."""
+    return _to_xyz(_take_rows(adata.obsm[position_key], indices), mode=mode)
+
+
+def _iter_coord_chunks(
+    adata, position_key, chunk_size, mode: str = "3D", indices=None
+):
+    """Yield float64 (m, 3) coordinate chunks of at most ``chunk_size`` rows."""
+    positions = adata.obsm[position_key]
+    n = positions.shape[0] if indices is None else len(indices)
+    for lo in range(0, n, chunk_size):
+        hi = min(lo + chunk_size, n)
+        if indices is None:
+            rows = positions[lo:hi]
+        else:
+            rows = positions[np.asarray(indices[lo:hi])]
+        yield _to_xyz(rows, mode=mode)
+
+
+def _chunked_bounds(chunks):
+    """Per-axis minimum and maximum over coordinate chunks."""
+    mins = np.full(3, np.inf)
+    maxs = np.full(3, -np.inf)
+    for coords in chunks:
+        if len(coords):
+            np.minimum(mins, coords.min(axis=0), out=mins)
+            np.maximum(maxs, coords.max(axis=0), out=maxs)
+    return mins, maxs
+
+
+def _laz_header(coords, mode: str = "3D"):
+    """Build a LAS header with scale and offset fitted to ``coords``."""
+    return _laz_header_from_bounds(
+        coords.min(axis=0), coords.max(axis=0), mode=mode
+    )
+
+
+def _laz_header_from_bounds(mins, maxs, mode: str = "3D"):
+    """Build a LAS header with scale and offset fitted to a bounding box."""
+    header = laspy.LasHeader(point_format=3, version="1.2")
 
     # Calculate scale and offset for quantization
-    mins = coords.min(axis=0)
-    maxs = coords.max(axis=0)
+    mins = np.array(mins, dtype=np.float64)
     span = maxs - mins
 
     target_int_range = 1e7
@@ -103,30 +262,146 @@ def write_laz(adata, position_key, path, mode: str = "3D"):
 
     header.offsets = mins.tolist()
     header.scales = scales.tolist()
+    return header
+
+
+def _laz_backend():
+    """Fastest available LAZ backend (multi-threaded lazrs first)."""
+    available = laspy.LazBackend.detect_available()
+    if not available:
+        raise ImportError(
+            "LAZ compression requires lazrs: pip install 'laspy[lazrs]'"
+        )
+    return available[0]
+
+
+def _write_las(coords, header, path, compress: bool = False):
+    """Write in-memory coordinates in slices of ``LAS_WRITE_POINTS``."""
+    _write_las_chunks(
+        (
+            coords[lo : lo + LAS_WRITE_POINTS]
+            for lo in range(0, coords.shape[0], LAS_WRITE_POINTS)
+        ),
+        header,
+        path,
+        compress=compress,
+    )
+
+
+def _write_las_chunks(chunks, header, path, compress: bool = False):
+    """
+    Stream coordinate chunks through one LAS writer.
+
+    Only one chunk's point record is held at a time. With ``compress`` the
+    output is LAZ, compressed by lazrs on all cores when available.
+    """
+    with laspy.open(
+        path,
+        mode="w",
+        header=header,
+        do_compress=compress,
+        laz_backend=_laz_backend() if compress else None,
+        closefd=False,
+    ) as writer:
+        for coords in chunks:
+            points = laspy.ScaleAwarePointRecord.zeros(
+                coords.shape[0], header=header
+            )
+            points.x = coords[:, 0]
+            points.y = coords[:, 1]
+            points.z = coords[:, 2]
+            writer.write_points(points)
+
+
+def write_laz(
+    adata,
+    position_key,
+    path,
+    mode: str = "3D",
+    indices=None,
+    chunk_size: int | None = None,
+    compress: bool = False,
+):
+    """
+    Write point cloud data to LAS (or compressed LAZ) format.
+
+    Parameters
+    ----------
+    adata : AnnData
+        Annotated data object.
+    position_key : str
+        Key in adata.obsm containing spatial coordinates.
+    path : str or Path or file object
+        Output path, or any writable binary stream; points are written to
+        it chunk by chunk as they are encoded.
+    mode : str, default "3D"
+        Visualization mode: "3D" or "2D".
+    indices : array-like of int, optional
+        Row indices into adata.obs selecting and ordering the exported
+        points. None exports all rows in obs order.
+    chunk_size : int, optional
+        Convert and write positions in chunks of this many rows, so that
+        temporary memory does not grow with n_obs. Defaults to
+        ``DEFAULT_CHUNK_SIZE`` for backed AnnData and a single pass
+        otherwise.
+    compress : bool, default False
+        Write LAZ instead of uncompressed LAS (about a third of the size).
+        Independent 50k-point chunks are compressed on all cores by the
+        lazrs backend.
+    """
+    start = _now()
+    chunk_size = _resolve_chunk_size(adata, chunk_size)
+    if chunk_size is None:
+        coords = _prepare_coords(
+            adata, position_key, mode=mode, indices=indices
+        )
+        header = _laz_header(coords, mode=mode)
+        _write_las(coords, header, path, compress=compress)
+        n_points = coords.shape[0]
+    else:
 
-    las = laspy.LasData(header)
-    las.x = x
-    las.y = y
-    las.z = z
+        def chunks():
+            return _iter_coord_chunks(
+                adata, position_key, chunk_size, mode=mode, indices=indices
+            )
 
-    las.write(path)
+        header = _laz_header_from_bounds(*_chunked_bounds(chunks()), mode=mode)
+        _write_las_chunks(chunks(), header, path, compress=compress)
+        n_points = header.point_count
 
     duration = _now() - start
-    n_points = coords.shape[0]
     logger.info(
-        "write_laz: wrote {} points to {} in {:.3f}s (mode={})",
+        "write_laz: wrote {} points to {} in {:.3f}s (mode={} compress={})",
         n_points,
         path,
         duration,
         mode,
+        compress,
     )
 
 
-def write_laz_to_bytes(adata, position_key, mode: str = "3D"):
+def write_laz_to_bytes(
+    adata,
+    position_key,
+    mode: str = "3D",
+    indices=None,
+    chunk_size: int | None = None,
+    compress: bool = False,
+):
     start = _now()
-    buffer = io.BytesIO()
-    write_laz(adata, position_key, buffer, mode=mode)
-    data = buffer.getvalue()
+    with span("positions", "encode", transport="laz", compress=compress) as sp:
+        buffer = io.BytesIO()
+        write_laz(
+            adata,
+            position_key,
+            buffer,
+            mode=mode,
+            indices=indices,
+            chunk_size=chunk_size,
+            compress=compress,
+        )
+        data = buffer.getvalue()
+        sp.set(nbytes=len(data))
     duration = _now() - start
     logger.info(
         "write_laz_to_bytes: produced {} bytes in {:.3f} (mode={})",
@@ -137,16 +412,296 @@ def write_laz_to_bytes(adata, position_key, mode: str = "3D"):
     return data
 
 
+def _bounding_box(coords):
+    return [coords.min(axis=0).tolist(), coords.max(axis=0).tolist()]
+
+
+def _export_positions(
+    adata,
+    position_key,
+    make_encoder,
+    mode: str = "3D",
+    indices=None,
+    chunk_size: int | None = None,
+):
+    """
+    Encode positions into one (n, 3) buffer.
+
+    ``make_encoder(mins, maxs)`` receives the bounding box and returns the
+    output dtype and a function mapping float64 coordinates to it. With a
+    chunk size, coordinates are read twice in chunks (bounds first, then
+    values) and every chunk is encoded straight into the output array.
+
+    Returns:
+      data: memoryview
+      bounds: tuple[np.ndarray, np.ndarray] (per-axis min and max)
+    """
+    chunk_size = _resolve_chunk_size(adata, chunk_size)
+    if chunk_size is None:
+        coords = _prepare_coords(
+            adata, position_key, mode=mode, indices=indices
+        )
+        bounds = coords.min(axis=0), coords.max(axis=0)
+        dtype, encode = make_encoder(*bounds)
+        return _as_buffer(encode(coords).astype(dtype, copy=False)), bounds
+
+    def chunks():
+        return _iter_coord_chunks(
+            adata, position_key, chunk_size, mode=mode, indices=indices
+        )
+
+    bounds = _chunked_bounds(chunks())
+    dtype, encode = make_encoder(*bounds)
+    n = adata.obsm[position_key].shape[0] if indices is None else len(indices)
+    out = np.empty((n, 3), dtype=dtype)
+    lo = 0
+    for coords in chunks():
+        out[lo : lo + len(coords)] = encode(coords)
+        lo += len(coords)
+    return _as_buffer(out), bounds
+
+
+def export_positions_raw(
+    adata,
+    position_key,
+    mode: str = "3D",
+    indices=None,
+    chunk_size: int | None = None,
+):
+    """
+    Export positions as a plain little-endian float32 buffer.
+
+    No codec is involved: the buffer holds x, y, z for every point
+    (row-major, shape (n, 3)) and the frontend uses it as-is. See
+    ``write_laz`` for ``chunk_size``.
+
+    Returns:
+      config: dict (Transport, DType, PointCount, BoundingBox)
+      data: memoryview
+    """
+    start = _now()
+    with span("positions", "encode", transport="raw") as sp:
+        data, (mins, maxs) = _export_positions(
+            adata,
+            position_key,
+            lambda mins, maxs: ("<f4", lambda coords: coords),
+            mode=mode,
+            indices=indices,
+            chunk_size=chunk_size,
+        )
+        sp.set(nbytes=len(data))
+    n_points = len(data) // 12
+    config = {
+        "Transport": "raw",
+        "DType": "float32",
+        "PointCount": n_points,
+        "BoundingBox": [mins.tolist(), maxs.tolist()],
+    }
+    logger.info(
+        "export_positions_raw: wrote {} points ({} bytes) in {:.3f}s (mode={})",
+        n_points,
+        len(data),
+        _now() - start,
+        mode,
+    )
+    return config, data
+
+
+def _position_quantization(mins, maxs, tolerance: float | None = None):
+    """
+    Choose the integer grid for bbox-relative position quantization.
+
+    The grid spans the bounding box with ``2**bits - 1`` steps per axis, so
+    the rounding error is at most half a step. uint16 is used when half a
+    step stays within ``tolerance`` (or when no tolerance is given),
+    otherwise uint32.
+
+    Returns:
+      dtype: str ("uint16" or "uint32")
+      scale: np.ndarray (per-axis step size)
+      offset: np.ndarray (per-axis grid origin, the bounding-box minimum)
+    """
+    offset = np.asarray(mins, dtype=np.float64)
+    span = np.asarray(maxs, dtype=np.float64) - offset
+
+    dtype = "uint16"
+    if tolerance is not None:
+        if tolerance <= 0:
+            raise ValueError(f"tolerance must be positive, got {tolerance}")
+        steps = float(span.max()) / (2.0 * tolerance)
+        if steps > np.iinfo(np.uint16).max:
+            dtype = "uint32"
+        if steps > np.iinfo(np.uint32).max:
+            logger.warning(
+                "tolerance {} is below the uint32 grid resolution; "
+                "positions are quantized to {} steps per axis",
+                tolerance,
+                np.iinfo(np.uint32).max,
+            )
+
+    max_step = np.iinfo(dtype).max
+    # flat axes (e.g. z in 2D) keep a unit scale so decoding is well defined
+    scale = np.where(span > 0, span / max_step, 1.0)
+    return dtype, scale, offset
+
+
+def _quantize_grid(coords, dtype: str, scale, offset):
+    """Round coords to grid steps (float64 values within ``dtype`` range)."""
+    q = np.rint((coords - offset) / scale)
+    return np.clip(q, 0, np.iinfo(dtype).max, out=q)
+
+
+def _quantize_positions(coords, dtype: str, scale, offset) -> memoryview:
+    """Encode coords as little-endian ``dtype`` grid coordinates."""
+    q = _quantize_grid(coords, dtype, scale, offset)
+    return _as_buffer(q.astype(np.dtype(dtype).newbyteorder("<")))
+
+
+def export_positions_quantized(
+    adata,
+    position_key,
+    mode: str = "3D",
+    indices=None,
+    tolerance: float | None = None,
+    chunk_size: int | None = None,
+):
+    """
+    Export positions as bbox-relative uint16/uint32 grid coordinates.
+
+    Each point is stored as x, y, z grid steps from the bounding-box minimum
+    (row-major, shape (n, 3)); the frontend recovers coordinates as
+    ``Offset + q * Scale`` per axis. Precision is chosen from ``tolerance``,
+    the largest acceptable absolute error in position units: uint16 when
+    it allows, uint32 otherwise. With no tolerance, uint16 is used. See
+    ``write_laz`` for ``chunk_size``.
+
+    Returns:
+      config: dict (Transport, DType, Scale, Offset, PointCount, BoundingBox)
+      data: memoryview
+    """
+    start = _now()
+    grid = {}
+
+    def make_encoder(mins, maxs):
+        dtype, scale, offset = _position_quantization(mins, maxs, tolerance)
+        grid.update(dtype=dtype, scale=scale, offset=offset)
+        return np.dtype(dtype).newbyteorder("<"), lambda coords: _quantize_grid(
+            coords, dtype, scale, offset
+        )
+
+    with span("positions", "encode", transport="quantized") as sp:
+        data, (mins, maxs) = _export_positions(
+            adata,
+            position_key,
+            make_encoder,
+            mode=mode,
+            indices=indices,
+            chunk_size=chunk_size,
+        )
+        sp.set(nbytes=len(data))
+    dtype, scale, offset = grid["dtype"], grid["scale"], grid["offset"]
+    n_points = len(data) // (3 * np.dtype(dtype).itemsize)
+    config = {
+        "Transport": "quantized",
+        "DType": dtype,
+        "Scale": scale.tolist(),
+        "Offset": offset.tolist(),
+        "PointCount": n_points,
+        "BoundingBox": [mins.tolist(), maxs.tolist()],
+    }
+    logger.info(
+        "export_positions_quantized: wrote {} points as {} ({} bytes) "
+        "in {:.3f}s (mode={})",
+        n_points,
+        dtype,
+        len(data),
+        _now() - start,
+        mode,
+    )
+    return config, data
+
+
+def _annotation_codes(col):
+    """
+    Integer codes and categories of an annotation column.
+
+    Returns:
+      codes: np.ndarray (-1 for missing values)
+      cats: array-like
+    """
+    # Fast path: if already categorical, use .cat.codes (no factorization cost)
+    try:
+        if pd.api.types.is_categorical_dtype(col.dtype):
+            # categorical: reuse codes and categories directly (no sorting/copy if possible)
+            return col.cat.codes.to_numpy(), np.asarray(col.cat.categories)
+        # use pandas.factorize which is typically faster than np.unique(return_inverse=True)
+        # factorize returns (labels, uniques)
+        return pd.factorize(col.values, sort=False)
+    except (TypeError, ValueError):
+        # fallback to numpy unique if pandas path fails for some reason
+        cats, codes = np.unique(np.asarray(col), return_inverse=True)
+        return codes, cats
+
+
+def section_index(codes):
+    """
+    Point range of every section, if each section's points are contiguous.
+
+    Returns:
+      dict mapping the section code (as str) to ``[start, stop)``, or None
+      when some section is split into several runs
+    """
+    codes = np.asarray(codes)
+    if len(codes) == 0:
+        return {}
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    run_codes = codes[starts]
+    if len(np.unique(run_codes)) != len(run_codes):
+        return None
+    stops = np.r_[starts[1:], len(codes)]
+    return {
+        str(int(c)): [int(lo), int(hi)]
+        for c, lo, hi in zip(run_codes, starts, stops)
+    }
+
+
+def section_order(adata, slice_key: str, indices=None):
+    """
+    Point order in which every section of ``slice_key`` is contiguous.
+
+    Points are stably sorted by section, so the order within a section is
+    kept. Returns ``indices`` (None meaning all obs rows) reordered, or
+    unchanged when the sections are already contiguous.
+    """
+    col = adata.obs[slice_key]
+    if indices is not None:
+        col = col.iloc[indices]
+    codes, cats = _annotation_codes(col)
+    if section_index(codes) is not None:
+        return indices
+    if len(cats) <= np.iinfo(np.int16).max:
+        codes = np.asarray(codes).astype(np.int16)  # radix sort
+    order = np.argsort(codes, kind="stable")
+    return order if indices is None else np.asarray(indices)[order]
+
+
 def export_annotations_blob(
     adata,
     color_key,
     slice_key: str | None = None,
     annotations: list[str] | None = None,
+    indices=None,
+    binary_dictionaries: bool = False,
 ):
     """
+    With ``binary_dictionaries``, annotations of at least
+    ``BINARY_DICTIONARY_MIN_CATEGORIES`` categories get their dictionary as
+    one buffer (see ``_encode_dictionary``) instead of JSON items.
+
     Returns:
-      config: dict
-      bins: dict[str, bytes]
+      config: dict (with "SectionIndex", the ``section_index`` of
+        ``slice_key``, when its sections are contiguous)
+      bins: dict[str, memoryview]
     """
 
     start_total = _now()
@@ -169,6 +724,7 @@ def export_annotations_blob(
     anno_maps = {}
     anno_bins = {}
     anno_dtypes = {}
+    sections = None
 
     for anno in all_annos:
         start = _now()
@@ -176,51 +732,61 @@ def export_annotations_blob(
             raise KeyError(f"Annotation '{anno}' not found in adata.obs")
 
         col = adata.obs[anno]
+        if indices is not None:
+            col = col.iloc[indices]
 
-        # Fast path: if already categorical, use .cat.codes (no factorization cost)
-        try:
-            if pd.api.types.is_categorical_dtype(col.dtype):
-                # categorical: reuse codes and categories directly (no sorting/copy if possible)
-                cats = np.asarray(col.cat.categories)
-                codes = col.cat.codes.to_numpy()
-            else:
-                # use pandas.factorize which is typically faster than np.unique(return_inverse=True)
-                # factorize returns (labels, uniques)
-                labels, uniques = pd.factorize(col.values, sort=False)
-                codes = labels
-                cats = uniques
-        except Exception:
-            # fallback to numpy unique if pandas path fails for some reason
-            values = np.asarray(col)
-            cats, codes = np.unique(values, return_inverse=True)
+        with span(f"annotations:{anno}", "factorize"):
+            codes, cats = _annotation_codes(col)
 
         # choose minimal integer dtype
         n_cats = len(cats)
-        if n_cats < 256:
-            codes = codes.astype(np.uint8, copy=False)
-            dtype = "uint8"
-        elif n_cats < 65536:
-            codes = codes.astype(np.uint16, copy=False)
-            dtype = "uint16"
-        else:
-            codes = codes.astype(np.uint32, copy=False)
-            dtype = "uint32"
+        with span(f"annotations:{anno}", "cast", categories=n_cats):
+            if n_cats < 256:
+                codes = codes.astype(np.uint8, copy=False)
+                dtype = "uint8"
+            elif n_cats < 65536:
+                codes = codes.astype(np.uint16, copy=False)
+                dtype = "uint16"
+            else:
+                codes = codes.astype(np.uint32, copy=False)
+                dtype = "uint32"
 
-        # serialize to bytes (this will copy to a bytes object)
-        bin_bytes = codes.tobytes(order="C")
+        # byte view of the codes (no copy)
+        with span(f"annotations:{anno}", "serialize") as sp:
+            bin_bytes = _as_buffer(codes)
+            sp.set(nbytes=len(bin_bytes))
         anno_bins[anno] = bin_bytes
         anno_dtypes[anno] = dtype
-
-        # build items (small; categories usually few)
-        items = [
-            {
-                "Name": str(name),
-                "Code": int(i),
-                "Color": name_to_rgb(str(name)),
-            }
-            for i, name in enumerate(cats)
-        ]
-        anno_maps[anno] = {"Items": items}
+        if anno == slice_key:
+            sections = section_index(codes)
+
+        with span(f"annotations:{anno}", "stats", categories=n_cats):
+            counts = category_counts(codes, n_cats)
+
+        if binary_dictionaries and n_cats >= BINARY_DICTIONARY_MIN_CATEGORIES:
+            # many categories: one buffer instead of a JSON item per category
+            with span(
+                f"annotations:{anno}:colors", "encode", categories=n_cats
+            ) as sp:
+                dict_key = f"{anno}{DICTIONARY_SUFFIX}"
+                anno_bins[dict_key] = _encode_dictionary(cats, counts)
+                sp.set(nbytes=len(anno_bins[dict_key]))
+            anno_maps[anno] = {"Dictionary": dict_key, "Categories": n_cats}
+        else:
+            # build items (small; categories usually few)
+            with span(
+                f"annotations:{anno}:colors", "encode", categories=n_cats
+            ):
+                items = [
+                    {
+                        "Name": str(name),
+                        "Code": int(i),
+                        "Color": name_to_rgb(str(name)),
+                        "Count": int(count),
+                    }
+                    for i, (name, count) in enumerate(zip(cats, counts))
+                ]
+            anno_maps[anno] = {"Items": items}
 
         duration = _now() - start
         logger.info(
@@ -239,6 +805,8 @@ def export_annotations_blob(
         "AnnoMaps": anno_maps,
         "AnnoDtypes": anno_dtypes,
     }
+    if slice_key is not None and sections is not None:
+        config["SectionIndex"] = {"Key": slice_key, "Ranges": sections}
 
     total_duration = _now() - start_total
     total_bytes = sum(len(b) for b in anno_bins.values())
@@ -251,18 +819,39 @@ def export_annotations_blob(
     return config, anno_bins
 
 
+def _add_category_means(traits, sums) -> None:
+    """Add the "CategoryMeans" of ``sums`` (a ``CategorySums``) to ``traits``."""
+    if sums is None:
+        return
+    with span("category_means", "stats"):
+        for key, means in sums.means().items():
+            traits[key]["CategoryMeans"] = means
+
+
 def export_continuous_obs_blob(
     adata,
     keys: list[str],
+    indices=None,
+    precision=None,
+    tolerance: float = DEFAULT_PRECISION_TOLERANCE,
+    category_groups=None,
 ):
     """
+    Export continuous obs columns, as float32 unless ``precision`` (one
+    encoding for all keys, or a dict by key) says otherwise; see
+    ``_encode_values``.
+
+    With ``category_groups`` (see ``CategorySums``) every trait config gets
+    "CategoryMeans", the mean of the trait per category of each annotation.
+
     Returns:
       traits: dict
-      bins: dict[str, bytes]
+      bins: dict[str, memoryview]
     """
     start_total = _now()
     traits = {}
     bins = {}
+    sums = None if category_groups is None else CategorySums(category_groups)
 
     logger.info(
         "export_continuous_obs_blob: starting export for keys={} n_obs={}",
@@ -277,31 +866,45 @@ def export_continuous_obs_blob(
         if key not in adata.obs:
             raise KeyError(f"Continuous obs '{key}' not found in adata.obs")
 
-        vec = adata.obs[key].to_numpy()
+        vec = _take_rows(adata.obs[key].to_numpy(), indices)
 
         if not np.issubdtype(vec.dtype, np.number):
             raise TypeError(f"Obs '{key}' is not numeric")
 
-        vec = vec.astype(np.float32)
-        bins[key] = vec.tobytes()
-
+        with span(f"continuous:{key}", "cast") as sp:
+            vec, meta, decoded = _encode_values(
+                vec, _trait_precision(precision, [key], "float32"), tolerance
+            )
+            sp.set(dtype=meta["DType"])
+        with span(f"continuous:{key}", "serialize") as sp:
+            bins[key] = _as_buffer(vec)
+            sp.set(nbytes=len(bins[key]))
+
+        vmin, vmax = float(np.nanmin(decoded)), float(np.nanmax(decoded))
+        with span(f"continuous:{key}", "stats"):
+            summary = value_summary(decoded, value_range=(vmin, vmax))
+            if sums is not None:
+                sums.add(key, None, decoded)
         traits[key] = {
             "Source": "obs",
-            "DType": "float32",
-            "Min": float(np.nanmin(vec)),
-            "Max": float(np.nanmax(vec)),
+            **meta,
+            "Min": vmin,
+            "Max": vmax,
+            **summary,
         }
         duration = _now() - start
         logger.info(
             "export_continuous_obs_blob: key={} dtype={} bytes={} min={} max={} took {:.3f}",
             key,
-            "float32",
+            meta["DType"],
             len(bins[key]),
             traits[key]["Min"],
             traits[key]["Max"],
             duration,
         )
 
+    _add_category_means(traits, sums)
+
     total_duration = _now() - start_total
     total_bytes = sum(len(b) for b in bins.values())
     logger.info(
@@ -314,22 +917,393 @@ def export_continuous_obs_blob(
     return traits, bins
 
 
+def _resolve_gene_indices(var_names, genes):
+    """Look up the positions of ``genes`` in ``var_names`` in one pass."""
+    var_names = pd.Index(var_names)
+    if var_names.is_unique:
+        idx = var_names.get_indexer(genes)
+    else:
+        # non-unique var_names: resolve to the first occurrence
+        first = ~var_names.duplicated()
+        lookup = pd.Series(np.flatnonzero(first), index=var_names[first])
+        idx = lookup.reindex(genes).fillna(-1).to_numpy()
+    missing = [g for g, i in zip(genes, idx) if i < 0]
+    if missing:
+        raise KeyError(f"Gene '{missing[0]}' not found in adata.var_names")
+    return np.asarray(idx, dtype=np.int64)
+
+
+def _sparse_format(X):
+    fmt = getattr(X, "format", None)
+    if fmt is None and hasattr(X, "getformat"):
+        fmt = X.getformat()
+    return fmt
+
+
+def _iter_csc_columns(X, idx):
+    for j in idx:
+        lo, hi = X.indptr[j], X.indptr[j + 1]
+        yield X.indices[lo:hi], X.data[lo:hi]
+
+
+def _iter_gene_columns(X, idx):
+    """
+    Yield the columns ``idx`` of ``X`` in order as ``(rows, values)``.
+
+    For sparse matrices ``rows`` holds the sorted row indices of the stored
+    values; for dense matrices ``rows`` is None and ``values`` is the full
+    column.
+
+    - CSC: columns are contiguous runs, read straight from ``indptr``.
+    - CSR (and other sparse formats): every column slice would scan the
+      whole matrix, so all requested columns are selected in a single pass
+      and converted to CSC once.
+    - dense: columns are plain (strided) views.
+    """
+    if hasattr(X, "toarray"):
+        fmt = _sparse_format(X)
+        if fmt == "csc" and X.has_canonical_format:
+            yield from _iter_csc_columns(X, idx)
+            return
+        if fmt not in ("csr", "csc"):
+            X = X.tocsr()
+        sub = X[:, idx].tocsc()
+        sub.sum_duplicates()
+        yield from _iter_csc_columns(sub, range(sub.shape[1]))
+        return
+
+    X = np.asarray(X)
+    for j in idx:
+        yield None, X[:, j]
+
+
+def _is_sparse(X) -> bool:
+    return hasattr(X, "toarray") or getattr(X, "format", None) in (
+        "csr",
+        "csc",
+    )
+
+
+def _iter_gene_columns_chunked(X, idx, chunk_size):
+    """
+    Like ``_iter_gene_columns`` for matrices that are read in row chunks,
+    such as the X of AnnData opened with ``backed="r"``.
+
+    Only ``chunk_size`` rows of ``X`` (restricted to the requested columns
+    where the storage allows) are held at once; the requested columns are
+    assembled as the chunks stream by.
+
+    - CSC: the requested columns are read directly; their size is bounded
+      by the output.
+    - CSR (and other sparse formats): every chunk of rows is read, sliced to
+      the requested columns and appended to per-column row/value runs.
+    - dense: each chunk reads only the requested columns.
+    """
+    n_obs = X.shape[0]
+    cols, inverse = np.unique(idx, return_inverse=True)
+
+    if _is_sparse(X) and _sparse_format(X) == "csc":
+        sub = X[:, cols].tocsc()
+        sub.sum_duplicates()
+        yield from _iter_csc_columns(sub, inverse)
+        return
+
+    if _is_sparse(X):
+        rows = [[] for _ in cols]
+        values = [[] for _ in cols]
+        for lo in range(0, n_obs, chunk_size):
+            block = X[lo : lo + chunk_size]
+            if _sparse_format(block) not in ("csr", "csc"):
+                block = block.tocsr()
+            sub = block[:, cols].tocsc()
+            sub.sum_duplicates()
+            for k, (r, v) in enumerate(
+                _iter_csc_columns(sub, range(len(cols)))
+            ):
+                rows[k].append(r.astype(np.int64) + lo)
+                values[k].append(v)
+        for k in inverse:
+            yield np.concatenate(rows[k]), np.concatenate(values[k])
+        return
+
+    out = np.empty((n_obs, len(cols)), dtype=X.dtype)
+    for lo in range(0, n_obs, chunk_size):
+        out[lo : lo + chunk_size] = X[lo : lo + chunk_size, cols]
+    for k in inverse:
+        yield None, out[:, k]
+
+
+def _select_column_rows(rows, values, indices, row_pos):
+    """
+    Apply the exported row selection/order to one column.
+
+    ``row_pos`` maps obs rows to their exported position (-1 if dropped) and
+    is only needed for sparse columns.
+    """
+    if rows is None:
+        return None, _take_rows(values, indices)
+    if indices is None:
+        return rows, values
+    new_rows = row_pos[rows]
+    keep = new_rows >= 0
+    new_rows = new_rows[keep]
+    order = np.argsort(new_rows, kind="stable")
+    return new_rows[order], values[keep][order]
+
+
+def _trait_precision(precision, keys, default: str) -> str:
+    """Precision of the trait known as any of ``keys``."""
+    if precision is None:
+        return default
+    if isinstance(precision, str):
+        return precision
+    for key in keys:
+        if key in precision:
+            return precision[key]
+    return default
+
+
+def _quantize_values(values, precision: str):
+    """
+    Quantize values linearly (or their log1p) to the uint8/uint16 grid
+    spanning their range; the top code marks NaN.
+
+    Returns:
+      codes: np.ndarray
+      meta: dict (DType, Quantization: Scale, Offset, Log); the frontend
+        decodes ``Offset + code * Scale``, then ``expm1`` when Log
+      decoded: np.ndarray of the values the frontend will see
+    """
+    log = precision.startswith("log-")
+    dtype = np.dtype(precision[len("log-") :] if log else precision)
+    top = np.iinfo(dtype).max
+    x = np.asarray(values, dtype=np.float64)
+    nan = np.isnan(x)
+    if log:
+        if np.any(x[~nan] < 0):
+            raise ValueError(
+                f"precision '{precision}' needs non-negative values"
+            )
+        x = np.log1p(x)
+    valid = x[~nan]
+    lo = float(valid.min()) if len(valid) else 0.0
+    hi = float(valid.max()) if len(valid) else 0.0
+    scale = (hi - lo) / (top - 1) if hi > lo else 1.0
+    q = np.rint((x - lo) / scale)
+    q[nan] = top
+    codes = q.astype(dtype.newbyteorder("<"))
+
+    decoded = lo + codes * scale
+    if log:
+        decoded = np.expm1(decoded)
+    decoded[nan] = np.nan
+    meta = {
+        "DType": dtype.name,
+        "Quantization": {"Scale": scale, "Offset": lo, "Log": log},
+    }
+    return codes, meta, decoded
+
+
+def _encode_values(
+    values, precision: str, tolerance: float = DEFAULT_PRECISION_TOLERANCE
+):
+    """
+    Encode continuous values with ``precision``, one of ``PRECISIONS`` or
+    "auto": the first of ``_AUTO_PRECISIONS`` whose largest error is within
+    ``tolerance`` times the value range. float16 falls back to float32 when
+    finite values exceed the float16 range instead of turning them into inf.
+
+    Returns:
+      encoded: np.ndarray
+      meta: dict (DType, and Quantization for the uint encodings)
+      decoded: np.ndarray of the values the frontend will see
+    """
+    if precision == "auto":
+        x = np.asarray(values, dtype=np.float64)
+        valid = x[~np.isnan(x)]
+        limit = tolerance * (valid.max() - valid.min()) if len(valid) else 0
+        for candidate in _AUTO_PRECISIONS[:-1]:
+            try:
+                encoded, meta, decoded = _encode_values(x, candidate)
+            except ValueError:
+                continue
+            with np.errstate(invalid="ignore", over="ignore"):
+                ok = np.isnan(x) | (np.abs(decoded - x) <= limit)
+            if ok.all():
+                return encoded, meta, decoded
+        precision = _AUTO_PRECISIONS[-1]
+
+    if precision == "float16":
+        x = np.asarray(values)
+        finite = x[np.isfinite(x)]
+        peak = float(np.abs(finite).max()) if len(finite) else 0.0
+        if peak > float(np.finfo(np.float16).max):
+            logger.warning(
+                "float16 overflows for values up to {}; sending float32",
+                peak,
+            )
+            precision = "float32"
+    if precision in ("float32", "float16"):
+        encoded = np.asarray(values).astype(np.dtype(precision))
+        return encoded, {"DType": precision}, encoded
+    if precision in PRECISIONS:
+        return _quantize_values(values, precision)
+    raise ValueError(
+        f"Invalid precision: {precision}. Valid precisions are: auto, "
+        f"{', '.join(PRECISIONS)}"
+    )
+
+
+def _encode_gene_column(
+    rows,
+    values,
+    n_obs,
+    encoding: str = "dense",
+    precision: str = "float16",
+    tolerance: float = DEFAULT_PRECISION_TOLERANCE,
+):
+    """
+    Encode one gene column with ``precision`` (see ``_encode_values``),
+    densely or sparsely.
+
+    The sparse layout is the delta-encoded row indices (uint16 when every
+    gap fits, uint32 otherwise) followed by the encoded values of the
+    stored entries; the other rows are exactly zero. With
+    ``encoding="auto"`` the smaller of the two layouts is used.
+
+    Returns:
+      data: memoryview
+      meta: dict (DType, Encoding, Quantization when quantized, and
+        NNZ/IndexDType/Length when sparse)
+      minmax: tuple[float, float]
+      decoded: tuple of the rows (None for all rows) and the values the
+        frontend will see there; the other rows decode to zero
+    """
+
+    def encode_dense(column):
+        vec, meta, decoded = _encode_values(column, precision, tolerance)
+        meta = {**meta, "Encoding": "dense"}
+        return (
+            _as_buffer(vec),
+            meta,
+            (float(np.nanmin(decoded)), float(np.nanmax(decoded))),
+            (None, decoded),
+        )
+
+    if rows is None and encoding == "dense":
+        return encode_dense(values)
+    if rows is None:
+        values = np.asarray(values)
+        rows = np.flatnonzero(values)
+        values = values[rows]
+
+    encoded, value_meta, decoded = _encode_values(values, precision, tolerance)
+    nnz = len(rows)
+
+    if nnz:
+        lo, hi = float(np.nanmin(decoded)), float(np.nanmax(decoded))
+        if nnz < n_obs:
+            lo, hi = min(lo, 0.0), max(hi, 0.0)
+    else:
+        lo = hi = 0.0
+
+    deltas = np.diff(rows, prepend=0)
+    index_dtype = (
+        np.uint16 if nnz == 0 or int(deltas.max()) < 65536 else np.uint32
+    )
+    itemsize = encoded.dtype.itemsize
+    sparse_bytes = nnz * (np.dtype(index_dtype).itemsize + itemsize)
+
+    if encoding == "sparse" or (
+        encoding == "auto" and sparse_bytes < n_obs * itemsize
+    ):
+        index_bytes = nnz * np.dtype(index_dtype).itemsize
+        out = np.empty(index_bytes + nnz * itemsize, dtype=np.uint8)
+        out[:index_bytes] = deltas.astype(index_dtype).view(np.uint8)
+        out[index_bytes:] = encoded.view(np.uint8)
+        data = _as_buffer(out)
+        meta = {
+            **value_meta,
+            "Encoding": "sparse",
+            "NNZ": int(nnz),
+            "IndexDType": np.dtype(index_dtype).name,
+            "Length": int(n_obs),
+        }
+        return data, meta, (lo, hi), (rows, decoded)
+
+    if "Quantization" not in value_meta:
+        # zeros encode as zeros: scatter the encoded stored values
+        column = np.zeros(n_obs, dtype=encoded.dtype)
+        column[rows] = encoded
+        meta = {**value_meta, "Encoding": "dense"}
+        return _as_buffer(column), meta, (lo, hi), (rows, decoded)
+
+    # quantization must see the zeros as well
+    column = np.zeros(n_obs, dtype=np.asarray(values).dtype)
+    column[rows] = values
+    data, meta, minmax, (_, decoded) = encode_dense(column)
+    # keep the stats on the stored rows unless the zeros decode otherwise
+    unstored = np.ones(n_obs, dtype=bool)
+    unstored[rows] = False
+    if not unstored.any() or decoded[np.argmax(unstored)] == 0:
+        return data, meta, minmax, (rows, decoded[rows])
+    return data, meta, minmax, (None, decoded)
+
+
 def export_continuous_gene_blob(
     adata,
     genes: list[str],
     layer: str | None = None,
     prefix: str = "Gene",
+    indices=None,
+    encoding: str = "dense",
+    chunk_size: int | None = None,
+    precision=None,
+    tolerance: float = DEFAULT_PRECISION_TOLERANCE,
+    category_groups=None,
 ):
     """
+    Export gene expression vectors, as float16 unless ``precision`` (one
+    encoding for all genes, or a dict by gene name) says otherwise; see
+    ``_encode_values``.
+
+    ``encoding`` selects the wire layout: "dense" (one value per cell),
+    "sparse" (delta-encoded nonzero indices plus values, see
+    ``_encode_gene_column``) or "auto" (whichever is smaller per gene).
+
+    With ``chunk_size`` (the default for backed AnnData), the expression
+    matrix is read in chunks of that many rows, so memory is bounded by the
+    chunk and the exported genes rather than by the full matrix.
+
+    With ``category_groups`` (see ``CategorySums``) every trait config gets
+    "CategoryMeans", the mean of the gene per category of each annotation.
+
     Returns:
       traits: dict
-      bins: dict[str, bytes]
+      bins: dict[str, memoryview]
     """
+    if encoding not in ("auto", "dense", "sparse"):
+        raise ValueError(
+            f"Invalid encoding: {encoding}. Valid encodings are: auto, dense, sparse"
+        )
+
     start_total = _now()
     traits = {}
     bins = {}
 
+    sums = None if category_groups is None else CategorySums(category_groups)
+
     X = adata.layers[layer] if layer else adata.X
+    n_obs = X.shape[0] if indices is None else len(indices)
+
+    chunk_size = _resolve_chunk_size(adata, chunk_size)
+    if chunk_size is None and _is_backed(X):
+        chunk_size = DEFAULT_CHUNK_SIZE
+
+    row_pos = None
+    if indices is not None and _is_sparse(X):
+        row_pos = np.full(X.shape[0], -1, dtype=np.int64)
+        row_pos[indices] = np.arange(len(indices))
 
     logger.info(
         "export_continuous_gene_blob: starting export for {} genes layer={}",
@@ -337,42 +1311,64 @@ def export_continuous_gene_blob(
         layer,
     )
 
-    for gene in genes:
-        start = _now()
-        if gene not in adata.var_names:
-            raise KeyError(f"Gene '{gene}' not found in adata.var_names")
+    gene_idx = _resolve_gene_indices(adata.var_names, genes)
 
-        idx = adata.var_names.get_loc(gene)
-        vec = X[:, idx]
-
-        if hasattr(vec, "toarray"):
-            vec = vec.toarray().ravel()
-        else:
-            vec = np.asarray(vec).ravel()
-
-        vec = vec.astype(np.float16)
+    if chunk_size is None:
+        columns = _iter_gene_columns(X, gene_idx)
+    else:
+        columns = _iter_gene_columns_chunked(X, gene_idx, chunk_size)
 
+    start = _now()
+    columns = iter(columns)
+    for gene in genes:
+        # reading a column may include the batched read of all of them
+        with span(f"genes:{gene}", "extract"):
+            rows, values = next(columns)
+            rows, values = _select_column_rows(rows, values, indices, row_pos)
         key = f"{prefix}:{gene}"
-
-        bins[key] = vec.tobytes()
+        with span(f"genes:{gene}", "encode") as sp:
+            data, meta, (vmin, vmax), (rows, decoded) = _encode_gene_column(
+                rows,
+                values,
+                n_obs,
+                encoding=encoding,
+                precision=_trait_precision(precision, [gene, key], "float16"),
+                tolerance=tolerance,
+            )
+            sp.set(nbytes=len(data), encoding=meta["Encoding"])
+        # stats of the values the frontend will see, as for obs
+        with span(f"genes:{gene}", "stats"):
+            n_zeros = 0 if rows is None else n_obs - len(rows)
+            summary = value_summary(
+                decoded, n_zeros=n_zeros, value_range=(vmin, vmax)
+            )
+            if sums is not None:
+                sums.add(key, rows, decoded)
+
+        bins[key] = data
 
         traits[key] = {
             "Source": "gene",
-            "DType": "float16",
-            "Min": float(np.nanmin(vec)),
-            "Max": float(np.nanmax(vec)),
+            **meta,
+            "Min": vmin,
+            "Max": vmax,
+            **summary,
         }
 
         duration = _now() - start
         logger.info(
-            "export_continuous_gene_blob: gene={} key={} bytes={} min={} max={} took {:.3f}",
+            "export_continuous_gene_blob: gene={} key={} encoding={} bytes={} min={} max={} took {:.3f}",
             gene,
             key,
+            meta["Encoding"],
             len(bins[key]),
             traits[key]["Min"],
             traits[key]["Max"],
             duration,
         )
+        start = _now()
+
+    _add_category_means(traits, sums)
 
     total_duration = _now() - start_total
     total_bytes = sum(len(b) for b in bins.values())
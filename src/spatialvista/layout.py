@@ -0,0 +1,194 @@
+# spatialvista/layout.py
+"""
+Treemap and histogram layouts of the point cloud, computed in the kernel.
+
+The frontend's "2d-treemap" layout packs the points of every category of
+an annotation into a rectangle sized by its count; "2d-histogram" draws one
+histogram of a continuous trait per category. Both are computed here from
+the exported annotation codes and trait values, with one grouped sort
+instead of per-point loops on the UI thread, and sent as x, y positions on
+a uint16 grid (see ``export_layout``). The placement matches
+``generateTreemapPositions`` / ``generateHistogramPositions`` in
+``frontend/src/utils/layout.ts``, which remain the fallback.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .exporter import _as_buffer, _position_quantization, _quantize_positions
+from .stats import trait_values
+
+LAYOUTS = ("treemap", "histogram")
+
+# Value bins per category of the histogram layout
+HISTOGRAM_BINS = 30
+
+# Default byte budget for layouts kept to answer repeated requests
+DEFAULT_LAYOUT_CACHE_BYTES = 128 * 1024 * 1024
+
+
+def _group_ranks(keys, n_keys: int):
+    """
+    Count of every key and the rank of each point within its key, in
+    point order.
+    """
+    counts = np.bincount(keys, minlength=n_keys)
+    if n_keys <= np.iinfo(np.uint16).max:
+        keys = keys.astype(np.uint16)  # radix sort
+    order = np.argsort(keys, kind="stable")
+    starts = np.cumsum(counts) - counts
+    ranks = np.empty(len(keys), dtype=np.int64)
+    ranks[order] = np.arange(len(keys)) - np.repeat(starts, counts)
+    return counts, ranks
+
+
+def _first_seen(codes) -> np.ndarray:
+    """Category of every point, numbered in order of first appearance."""
+    return pd.factorize(codes)[0]
+
+
+def _treemap_rects(counts, width: float, height: float):
+    """Slice-and-dice rectangles (x, y, w, h) for categories of ``counts``."""
+    total = counts.sum()
+    rects = np.empty((len(counts), 4))
+    x = y = 0.0
+    rest_w, rest_h = width, height
+    for k, count in enumerate(counts):
+        if k == len(counts) - 1:
+            rects[k] = x, y, rest_w, rest_h
+            break
+        area = count / total * width * height
+        if rest_w > rest_h:
+            w = area / rest_h
+            rects[k] = x, y, min(w, rest_w), rest_h
+            x += w
+            rest_w -= w
+        else:
+            h = area / rest_w
+            rects[k] = x, y, rest_w, min(h, rest_h)
+            y += h
+            rest_h -= h
+    return rects
+
+
+def treemap_layout(codes, bounds) -> np.ndarray:
+    """
+    Treemap positions: the points of each category fill a rectangle with
+    area proportional to its count, largest category first.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Annotation code of every point.
+    bounds : tuple
+        ``((min_x, min_y), (max_x, max_y))`` of the point cloud, which the
+        treemap covers.
+
+    Returns
+    -------
+    np.ndarray
+        float64 (n, 2) x, y positions.
+    """
+    (min_x, min_y), (max_x, max_y) = bounds
+    category = _first_seen(codes)
+    counts, ranks = _group_ranks(category, category.max(initial=-1) + 1)
+    # by count, ties in order of first appearance
+    order = np.argsort(-counts, kind="stable")
+    rects = np.empty((len(counts), 4))
+    rects[order] = _treemap_rects(counts[order], max_x - min_x, max_y - min_y)
+
+    x, y, w, h = rects[category].T
+    side = np.sqrt(counts)[category]
+    col = np.mod(ranks, side)
+    row = np.floor(ranks / side)
+    return np.column_stack(
+        (min_x + x + col / side * w, min_y + y + row / side * h)
+    )
+
+
+def histogram_layout(
+    codes, values, value_range, bounds, n_bins: int = HISTOGRAM_BINS
+) -> np.ndarray:
+    """
+    Histogram positions: one row per category (in order of first
+    appearance), ``n_bins`` bins of ``value_range`` across, with each bin
+    a block of its points whose height is the bin count relative to the
+    fullest bin of the category.
+
+    Points with a NaN value are placed at the origin.
+
+    Returns
+    -------
+    np.ndarray
+        float64 (n, 2) x, y positions.
+    """
+    (min_x, min_y), (max_x, max_y) = bounds
+    lo, hi = value_range
+    values = np.asarray(values, dtype=np.float64)
+    category = _first_seen(codes)
+    n_categories = category.max(initial=-1) + 1
+
+    valid = ~np.isnan(values)
+    bin_width = (hi - lo) / n_bins
+    if bin_width > 0:
+        bins = np.floor((values[valid] - lo) / bin_width)
+        bins = np.clip(bins, 0, n_bins - 1).astype(np.int64)
+    else:
+        bins = np.zeros(int(valid.sum()), dtype=np.int64)
+    keys = category[valid] * n_bins + bins
+    counts, ranks = _group_ranks(keys, n_categories * n_bins)
+    max_counts = np.maximum(counts.reshape(-1, n_bins).max(axis=1), 1)
+
+    bin_pixels = (max_x - min_x) / n_bins
+    row_height = (max_y - min_y) / max(n_categories, 1)
+    count = counts[keys]
+    bin_height = count / max_counts[category[valid]] * row_height * 0.8
+    per_row = np.ceil(np.sqrt(count))
+    col = np.mod(ranks, per_row)
+    row = np.floor(ranks / per_row)
+
+    xy = np.zeros((len(values), 2))
+    xy[valid, 0] = min_x + bins * bin_pixels + col / per_row * bin_pixels
+    xy[valid, 1] = (
+        min_y + category[valid] * row_height + row / per_row * bin_height
+    )
+    return xy
+
+
+def decode_trait(config: dict, data) -> np.ndarray:
+    """Dense values of an exported continuous trait (see ``trait_values``)."""
+    rows, values = trait_values(config, data)
+    if rows is None:
+        return values
+    dense = np.zeros(config["Length"], dtype=values.dtype)
+    dense[rows] = values
+    return dense
+
+
+def export_layout(xy):
+    """
+    Encode layout positions as bbox-relative uint16 x, y grid coordinates
+    (row-major, shape (n, 2)); the frontend recovers them as
+    ``Offset + q * Scale`` per axis.
+
+    Returns:
+      config: dict (DType, Scale, Offset, PointCount)
+      data: memoryview
+    """
+    if len(xy) == 0:
+        return {
+            "DType": "uint16",
+            "Scale": [1.0, 1.0],
+            "Offset": [0.0, 0.0],
+            "PointCount": 0,
+        }, _as_buffer(np.empty(0, dtype=np.uint16))
+    dtype, scale, offset = _position_quantization(
+        xy.min(axis=0), xy.max(axis=0)
+    )
+    config = {
+        "DType": dtype,
+        "Scale": scale.tolist(),
+        "Offset": offset.tolist(),
+        "PointCount": len(xy),
+    }
+    return config, _quantize_positions(xy, dtype, scale, offset)
@@ -0,0 +1,224 @@
+# spatialvista/lod.py
+"""
+Coarse-to-fine (octree) point ordering for progressive rendering.
+
+Points are reordered so that every prefix of the exported arrays is a
+spatially uniform subsample of the full cloud: level 0 keeps one point per
+cell of a coarse grid, each following level halves the cell size and adds
+one point for every newly occupied cell, and the last level holds whatever
+is left. The frontend can therefore draw the first level immediately and
+refine as further levels arrive.
+"""
+
+import io
+import time
+
+import numpy as np
+
+from ._logger import logger
+from .exporter import (
+    _as_buffer,
+    _bounding_box,
+    _laz_header,
+    _position_quantization,
+    _prepare_coords,
+    _quantize_positions,
+    _write_las,
+)
+from .metrics import span
+
+# Grid resolution is capped so that 3D cell keys fit in int64.
+_MAX_GRID_BITS = 20
+
+
+def _now():
+    return time.perf_counter()
+
+
+def lod_order(
+    coords,
+    base_points: int = 65536,
+    max_levels: int = 8,
+):
+    """
+    Compute a coarse-to-fine ordering of ``coords``.
+
+    Parameters
+    ----------
+    coords : np.ndarray
+        Array of shape (n, 3) with point coordinates.
+    base_points : int, default 65536
+        Approximate number of points in the coarsest level. This bounds the
+        size of the first payload regardless of the total point count.
+    max_levels : int, default 8
+        Maximum number of levels, including the final level holding all
+        remaining points.
+
+    Returns
+    -------
+    order : np.ndarray
+        Permutation of ``range(n)``; ``coords[order]`` is in LOD order.
+    level_offsets : list[int]
+        Cumulative point counts, ``level_offsets[i]`` being the end of
+        level ``i`` in ``order``. The last entry equals ``n``.
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    n = coords.shape[0]
+    if n <= base_points or max_levels <= 1:
+        return np.arange(n, dtype=np.int64), [n]
+
+    mins = coords.min(axis=0)
+    span = coords.max(axis=0) - mins
+    # flat axes (e.g. 2D data) do not contribute to the grid
+    active = span > 0
+    n_dims = max(int(active.sum()), 1)
+    norm = np.zeros_like(coords)
+    norm[:, active] = (coords[:, active] - mins[active]) / span[active]
+
+    # start with ~base_points cells
+    bits = max(int(np.floor(np.log2(base_points) / n_dims)), 0)
+
+    remaining = np.arange(n, dtype=np.int64)
+    chunks = []
+    level_offsets = []
+    total = 0
+
+    for _ in range(max_levels - 1):
+        if remaining.size == 0 or bits > _MAX_GRID_BITS:
+            break
+
+        res = 1 << bits
+        cells = np.minimum((norm[remaining] * res).astype(np.int64), res - 1)
+        keys = cells[:, 0] + res * (cells[:, 1] + res * cells[:, 2])
+        _, first = np.unique(keys, return_index=True)
+        first.sort()
+
+        picked = remaining[first]
+        chunks.append(picked)
+        total += picked.size
+        level_offsets.append(total)
+
+        mask = np.ones(remaining.size, dtype=bool)
+        mask[first] = False
+        remaining = remaining[mask]
+        bits += 1
+
+    if remaining.size:
+        chunks.append(remaining)
+        total += remaining.size
+        level_offsets.append(total)
+
+    return np.concatenate(chunks), level_offsets
+
+
+def export_lod_blobs(
+    adata,
+    position_key,
+    mode: str = "3D",
+    indices=None,
+    base_points: int = 65536,
+    max_levels: int = 8,
+    transport: str = "laz",
+    tolerance: float | None = None,
+    compress: bool = False,
+):
+    """
+    Export the point cloud as a list of blobs, one per LOD level.
+
+    With ``transport="laz"`` all levels share one LAS header (scale and
+    offset fitted to the full cloud), so decoded coordinates are consistent
+    across levels. With ``transport="raw"`` every level is a little-endian
+    float32 (n, 3) buffer. With ``transport="quantized"`` every level holds
+    uint16/uint32 grid coordinates on one grid fitted to the full cloud; its
+    ``DType``, ``Scale`` and ``Offset`` are part of the config.
+
+    Parameters
+    ----------
+    adata : AnnData
+        Annotated data object.
+    position_key : str
+        Key in adata.obsm containing spatial coordinates.
+    mode : str, default "3D"
+        Visualization mode: "3D" or "2D".
+    indices : array-like of int, optional
+        Row indices into adata.obs to export. None exports all rows.
+    base_points : int, default 65536
+        Approximate number of points in the coarsest level.
+    max_levels : int, default 8
+        Maximum number of levels.
+    transport : str, default "laz"
+        Level encoding: "laz", "raw" or "quantized".
+    tolerance : float, optional
+        Largest acceptable absolute position error for
+        ``transport="quantized"``; see ``export_positions_quantized``.
+    compress : bool, default False
+        Compress ``transport="laz"`` levels to LAZ; see ``write_laz``.
+
+    Returns:
+      config: dict
+      levels: list[bytes | memoryview]
+      order: np.ndarray (obs row index of every exported point, LOD order)
+    """
+    start_total = _now()
+    coords = _prepare_coords(adata, position_key, mode=mode, indices=indices)
+    header = _laz_header(coords, mode=mode) if transport == "laz" else None
+    if transport == "quantized":
+        dtype, scale, offset = _position_quantization(
+            coords.min(axis=0), coords.max(axis=0), tolerance
+        )
+
+    with span("lod:order", "encode", points=int(coords.shape[0])):
+        order, level_offsets = lod_order(
+            coords, base_points=base_points, max_levels=max_levels
+        )
+    coords = coords[order]
+    if indices is not None:
+        order = np.asarray(indices)[order]
+
+    levels = []
+    start = 0
+    for level, stop in enumerate(level_offsets):
+        t0 = _now()
+        with span(f"lod:level{level}", "encode", transport=transport) as sp:
+            if transport == "raw":
+                levels.append(_as_buffer(coords[start:stop].astype("<f4")))
+            elif transport == "quantized":
+                levels.append(
+                    _quantize_positions(
+                        coords[start:stop], dtype, scale, offset
+                    )
+                )
+            else:
+                buffer = io.BytesIO()
+                _write_las(
+                    coords[start:stop], header, buffer, compress=compress
+                )
+                levels.append(buffer.getvalue())
+            sp.set(nbytes=len(levels[-1]))
+        logger.info(
+            "export_lod_blobs: level={} points={} bytes={} took {:.3f}",
+            level,
+            stop - start,
+            len(levels[-1]),
+            _now() - t0,
+        )
+        start = stop
+
+    config = {
+        "Levels": len(levels),
+        "LevelOffsets": [int(x) for x in level_offsets],
+        "PointCount": int(coords.shape[0]),
+        "Transport": transport,
+        "BoundingBox": _bounding_box(coords),
+    }
+    if transport == "quantized":
+        config.update(DType=dtype, Scale=scale.tolist(), Offset=offset.tolist())
+
+    logger.info(
+        "export_lod_blobs: finished levels={} total_bytes={} total_time={:.3f}",
+        len(levels),
+        sum(len(b) for b in levels),
+        _now() - start_total,
+    )
+
+    return config, levels, order
@@ -0,0 +1,163 @@
+# spatialvista/metrics.py
+"""
+Span-based metrics for export and transfer stages.
+
+Code wraps a stage in ``with span(name, stage) as s:`` and may attach the
+number of bytes it produced with ``s.set(nbytes=...)``. Spans go to the
+collector activated with ``collecting(collector)`` (``vis()`` activates the
+widget's collector), or are dropped when no enabled collector is active.
+A disabled span costs one context-variable lookup and returns a shared
+no-op object.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class _NullSpan:
+    """Shared no-op span handed out when metrics are disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("_collector", "_t0", "_token", "attrs", "name", "stage")
+
+    def __init__(self, collector, name, stage, attrs):
+        self._collector = collector
+        self.name = name
+        self.stage = stage
+        self.attrs = attrs
+
+    def __enter__(self):
+        self._token = _parent.set(self.name)
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._t0
+        _parent.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self._collector._add(
+            self.name, self.stage, self._t0, duration, _parent.get(), self.attrs
+        )
+        return False
+
+    def set(self, **attrs):
+        """Attach attributes, e.g. ``nbytes``, to the span."""
+        self.attrs.update(attrs)
+
+
+class MetricsCollector:
+    """
+    Collects timed spans of the export and transfer pipeline.
+
+    Parameters
+    ----------
+    enabled : bool, default True
+        Disabled collectors record nothing.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._spans = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def span(self, name: str, stage: str | None = None, **attrs):
+        """Context manager timing one stage."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, stage, attrs)
+
+    def _add(self, name, stage, t0, duration, parent, attrs):
+        record = {
+            "name": name,
+            "stage": stage,
+            "parent": parent,
+            "thread": threading.current_thread().name,
+            "start": t0 - self._origin,
+            "seconds": duration,
+            **attrs,
+        }
+        nbytes = attrs.get("nbytes")
+        if nbytes and duration > 0:
+            record["mb_per_s"] = nbytes / duration / 1e6
+        with self._lock:
+            self._spans.append(record)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+        self._origin = time.perf_counter()
+
+    def report(self) -> dict:
+        """
+        Recorded spans and per-stage totals.
+
+        Returns:
+          dict with "spans" (one dict per span, in completion order: name,
+          stage, parent, thread, start, seconds, nbytes, mb_per_s and any
+          other attributes) and "stages" (count, seconds and nbytes summed
+          per stage, with overall throughput).
+        """
+        with self._lock:
+            spans = [dict(s) for s in self._spans]
+        stages = {}
+        for s in spans:
+            if s["stage"] is None:
+                continue
+            agg = stages.setdefault(
+                s["stage"], {"count": 0, "seconds": 0.0, "nbytes": 0}
+            )
+            agg["count"] += 1
+            agg["seconds"] += s["seconds"]
+            agg["nbytes"] += s.get("nbytes") or 0
+        for agg in stages.values():
+            if agg["nbytes"] and agg["seconds"] > 0:
+                agg["mb_per_s"] = agg["nbytes"] / agg["seconds"] / 1e6
+        return {"spans": spans, "stages": stages}
+
+
+_DISABLED = MetricsCollector(enabled=False)
+_current = contextvars.ContextVar("spatialvista_metrics", default=_DISABLED)
+_parent = contextvars.ContextVar("spatialvista_metrics_parent", default=None)
+
+
+def metrics_enabled_by_default() -> bool:
+    """Metrics are off unless ``$SPATIALVISTA_METRICS`` is set."""
+    return os.environ.get("SPATIALVISTA_METRICS", "") not in ("", "0")
+
+
+@contextmanager
+def collecting(collector: MetricsCollector):
+    """Send spans opened in this context to ``collector``."""
+    token = _current.set(collector)
+    try:
+        yield collector
+    finally:
+        _current.reset(token)
+
+
+def span(name: str, stage: str | None = None, **attrs):
+    """Time a stage with the active collector."""
+    collector = _current.get()
+    if not collector.enabled:
+        return _NULL_SPAN
+    return _Span(collector, name, stage, attrs)
@@ -0,0 +1,266 @@
+# spatialvista/parallel.py
+"""
+Concurrent execution of the export stages of ``vis()``.
+
+Positions, annotations, continuous obs and genes are independent exports
+(given the point order), and most of their time is spent in NumPy, pandas
+and laspy code that releases the GIL, so ``vis()`` runs them on a thread
+pool. ``submit`` carries the active metrics collector into the worker.
+
+For per-column work that holds the GIL (factorizing string columns, color
+maps of many categories, gene encoding), ``export_*_in_processes`` split
+the columns across a process pool instead. Each worker receives only the
+columns it exports: obs columns, or the selected columns of the expression
+matrix. Processes are started with "spawn", since forking while the export
+and send threads run can deadlock, and pools are reused across calls so
+only the first pays the start-up cost.
+"""
+
+import contextvars
+import itertools
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from ._logger import logger
+from .exporter import (
+    DEFAULT_PRECISION_TOLERANCE,
+    _is_backed,
+    _resolve_gene_indices,
+    export_annotations_blob,
+    export_continuous_gene_blob,
+    export_continuous_obs_blob,
+    section_index,
+)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def default_export_workers() -> int:
+    """One thread per export stage, bounded by the number of CPUs."""
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def submit(executor, fn, *args, **kwargs):
+    """``executor.submit`` that keeps the active metrics collector."""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def process_pool(n_processes: int) -> ProcessPoolExecutor:
+    """Shared process pool with ``n_processes`` workers."""
+    with _pools_lock:
+        pool = _pools.get(n_processes)
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=n_processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _pools[n_processes] = pool
+        return pool
+
+
+def _split(keys, n_parts):
+    """Split ``keys`` into at most ``n_parts`` contiguous non-empty parts."""
+    keys = list(keys)
+    n_parts = max(1, min(n_parts, len(keys)))
+    bounds = np.linspace(0, len(keys), n_parts + 1).astype(int)
+    return [keys[lo:hi] for lo, hi in itertools.pairwise(bounds)]
+
+
+def _in_worker(fn, *args, **kwargs):
+    """
+    Run an exporter in a worker process. Its byte buffers (memoryviews,
+    which cannot be pickled) are returned as the arrays they view.
+    """
+    config, bins = fn(*args, **kwargs)
+    return config, {k: np.asarray(v) for k, v in bins.items()}
+
+
+def _result(fut):
+    config, bins = fut.result()
+    return config, {k: memoryview(v) for k, v in bins.items()}
+
+
+def _resolve_groups(category_groups):
+    """Category groups for the workers, which cannot call back here."""
+    return category_groups() if callable(category_groups) else category_groups
+
+
+def _obs_part(adata, keys):
+    n_obs = getattr(adata, "n_obs", len(adata.obs))
+    return SimpleNamespace(obs=adata.obs[list(keys)], n_obs=n_obs)
+
+
+def export_annotations_in_processes(
+    pool,
+    n_parts: int,
+    adata,
+    color_key,
+    slice_key=None,
+    annotations=None,
+    indices=None,
+    binary_dictionaries: bool = False,
+):
+    """``export_annotations_blob`` with the annotations split across ``pool``."""
+    keys = [color_key, slice_key, *(annotations or [])]
+    all_annos = list(dict.fromkeys(k for k in keys if k is not None))
+    for anno in all_annos:
+        if anno not in adata.obs:
+            raise KeyError(f"Annotation '{anno}' not found in adata.obs")
+
+    futures = [
+        pool.submit(
+            _in_worker,
+            export_annotations_blob,
+            _obs_part(adata, part),
+            part[0],
+            None,
+            part[1:],
+            indices=indices,
+            binary_dictionaries=binary_dictionaries,
+        )
+        for part in _split(all_annos, n_parts)
+    ]
+    anno_maps, anno_dtypes, parts = {}, {}, {}
+    for fut in futures:
+        config, bins = _result(fut)
+        anno_maps.update(config["AnnoMaps"])
+        anno_dtypes.update(config["AnnoDtypes"])
+        parts.update(bins)
+
+    config = {
+        "Id": str(uuid.uuid4()),
+        "AvailableAnnoTypes": all_annos,
+        "DefaultAnnoType": color_key,
+        "AnnoMaps": {k: anno_maps[k] for k in all_annos},
+        "AnnoDtypes": {k: anno_dtypes[k] for k in all_annos},
+    }
+    if slice_key is not None:
+        codes = np.frombuffer(parts[slice_key], dtype=anno_dtypes[slice_key])
+        sections = section_index(codes)
+        if sections is not None:
+            config["SectionIndex"] = {"Key": slice_key, "Ranges": sections}
+    # codes, then the binary dictionary of high-cardinality annotations
+    bin_keys = [
+        key
+        for anno in all_annos
+        for key in (anno, config["AnnoMaps"][anno].get("Dictionary"))
+        if key is not None
+    ]
+    return config, {k: parts[k] for k in bin_keys}
+
+
+def export_continuous_obs_in_processes(
+    pool,
+    n_parts: int,
+    adata,
+    keys: list[str],
+    indices=None,
+    precision=None,
+    tolerance: float = DEFAULT_PRECISION_TOLERANCE,
+    category_groups=None,
+):
+    """``export_continuous_obs_blob`` with the keys split across ``pool``."""
+    unique = list(dict.fromkeys(keys))
+    for key in unique:
+        if key not in adata.obs:
+            raise KeyError(f"Continuous obs '{key}' not found in adata.obs")
+    category_groups = _resolve_groups(category_groups)
+
+    futures = [
+        pool.submit(
+            _in_worker,
+            export_continuous_obs_blob,
+            _obs_part(adata, part),
+            part,
+            indices=indices,
+            precision=precision,
+            tolerance=tolerance,
+            category_groups=category_groups,
+        )
+        for part in _split(unique, n_parts)
+    ]
+    traits, bins = {}, {}
+    for fut in futures:
+        part_traits, part_bins = _result(fut)
+        traits.update(part_traits)
+        bins.update(part_bins)
+    return traits, bins
+
+
+def export_continuous_genes_in_processes(
+    pool,
+    n_parts: int,
+    adata,
+    genes: list[str],
+    layer: str | None = None,
+    indices=None,
+    encoding: str = "dense",
+    chunk_size: int | None = None,
+    precision=None,
+    tolerance: float = DEFAULT_PRECISION_TOLERANCE,
+    category_groups=None,
+):
+    """
+    ``export_continuous_gene_blob`` with the genes split across ``pool``.
+
+    The selected columns are extracted here and only they are sent to the
+    workers. Backed matrices are exported in this process instead, where
+    they are read in chunks.
+    """
+    X = adata.layers[layer] if layer else adata.X
+    if _is_backed(X):
+        logger.info(
+            "export_continuous_genes_in_processes: backed matrix, "
+            "exporting {} genes in-process",
+            len(genes),
+        )
+        return export_continuous_gene_blob(
+            adata,
+            genes,
+            layer=layer,
+            indices=indices,
+            encoding=encoding,
+            chunk_size=chunk_size,
+            precision=precision,
+            tolerance=tolerance,
+            category_groups=category_groups,
+        )
+
+    category_groups = _resolve_groups(category_groups)
+    unique = list(dict.fromkeys(genes))
+    gene_idx = dict(zip(unique, _resolve_gene_indices(adata.var_names, unique)))
+    futures = []
+    for part in _split(unique, n_parts):
+        sub = SimpleNamespace(
+            X=X[:, [gene_idx[g] for g in part]],
+            var_names=pd.Index(part),
+            layers={},
+            n_obs=X.shape[0],
+        )
+        futures.append(
+            pool.submit(
+                _in_worker,
+                export_continuous_gene_blob,
+                sub,
+                part,
+                indices=indices,
+                encoding=encoding,
+                precision=precision,
+                tolerance=tolerance,
+                category_groups=category_groups,
+            )
+        )
+    traits, bins = {}, {}
+    for fut in futures:
+        part_traits, part_bins = _result(fut)
+        traits.update(part_traits)
+        bins.update(part_bins)
+    return traits, bins
@@ -0,0 +1,311 @@
+# spatialvista/reader.py
+"""
+Read only the parts of an .h5ad or .zarr AnnData store that a
+visualization needs.
+
+``read_subset`` returns a lightweight AnnData stand-in holding the requested
+obsm arrays and obs columns in memory, the full var_names, and the
+expression matrix as an on-disk dataset that the exporters read in row
+chunks (or column runs, for CSC) like the X of a backed AnnData.
+
+Both stores are accessed through the subset of the h5py/zarr APIs they
+share (``group[key]``, ``.attrs``, slicing), following the AnnData on-disk
+format (``encoding-type`` attributes, anndata >= 0.8).
+"""
+
+import os
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from ._logger import logger
+
+
+def _now():
+    return time.perf_counter()
+
+
+def _is_zarr_path(path) -> bool:
+    path = os.fspath(path)
+    return os.path.isdir(path) or path.rstrip("/").endswith(".zarr")
+
+
+def _open_store(path):
+    """Open an .h5ad file with h5py or a .zarr directory with zarr."""
+    if _is_zarr_path(path):
+        try:
+            import zarr
+        except ImportError as e:
+            raise ImportError(
+                "Reading .zarr stores requires zarr: pip install zarr"
+            ) from e
+        return zarr.open_group(os.fspath(path), mode="r")
+
+    try:
+        import h5py
+    except ImportError as e:
+        raise ImportError(
+            "Reading .h5ad files requires h5py: pip install h5py"
+        ) from e
+    return h5py.File(path, "r")
+
+
+def _attr(node, name, default=None):
+    value = node.attrs.get(name, default)
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+    return value
+
+
+def _encoding(node) -> str | None:
+    return _attr(node, "encoding-type")
+
+
+def _read_array(node):
+    """Read a dataset in full, decoding byte strings."""
+    values = node[...]
+    if values.dtype.kind == "T":
+        # variable-length strings of zarr 3 as numpy StringDType
+        values = values.astype(object)
+    elif values.dtype.kind == "S" or (
+        values.dtype.kind == "O"
+        and values.size
+        and isinstance(values.flat[0], bytes)
+    ):
+        values = np.array(
+            [v.decode("utf-8") for v in values.ravel()], dtype=object
+        ).reshape(values.shape)
+    return values
+
+
+def _read_column(node, name=None):
+    """Read one obs/var column (any AnnData element encoding) as a Series."""
+    encoding = _encoding(node)
+    if encoding == "categorical":
+        codes = node["codes"][...]
+        categories = _read_array(node["categories"])
+        values = pd.Categorical.from_codes(
+            codes,
+            categories=categories,
+            ordered=bool(_attr(node, "ordered", False)),
+        )
+    elif encoding in ("nullable-integer", "nullable-boolean"):
+        data = node["values"][...]
+        mask = node["mask"][...].astype(bool)
+        if encoding == "nullable-integer":
+            values = pd.arrays.IntegerArray(data, mask)
+        else:
+            values = pd.arrays.BooleanArray(data.astype(bool), mask)
+    elif encoding == "nullable-string-array":
+        values = _read_array(node["values"]).astype(object)
+        values[node["mask"][...].astype(bool)] = None
+        values = pd.array(values, dtype="string")
+    elif encoding in (None, "array", "string-array") and not hasattr(
+        node, "keys"
+    ):
+        values = _read_array(node)
+    else:
+        raise ValueError(
+            f"Unsupported encoding {encoding!r} for column {name!r}; "
+            "load the file with anndata and use vis() instead"
+        )
+    return pd.Series(values, name=name)
+
+
+def _read_index(group):
+    """Read the index of a dataframe group (obs or var)."""
+    return pd.Index(_read_array(group[_attr(group, "_index")]))
+
+
+class _SparseDataset:
+    """
+    On-disk CSR/CSC matrix in AnnData layout (``data``, ``indices`` and
+    ``indptr`` datasets plus ``shape`` attribute).
+
+    Supports the two access patterns the chunked exporters use: row slices
+    ``X[lo:hi]`` of CSR matrices and column selections ``X[:, cols]`` of
+    CSC matrices. Both read only the stored values they return.
+    """
+
+    def __init__(self, group):
+        self.group = group
+        self.format = _encoding(group).split("_")[0]
+        self.shape = tuple(int(x) for x in _attr(group, "shape"))
+        self.dtype = group["data"].dtype
+
+    def to_memory(self):
+        import scipy.sparse as sp
+
+        cls = sp.csr_matrix if self.format == "csr" else sp.csc_matrix
+        return cls(
+            (
+                self.group["data"][...],
+                self.group["indices"][...],
+                self.group["indptr"][...],
+            ),
+            shape=self.shape,
+        )
+
+    def __getitem__(self, key):
+        import scipy.sparse as sp
+
+        if self.format == "csr" and isinstance(key, slice):
+            lo, hi, step = key.indices(self.shape[0])
+            if step != 1:
+                raise IndexError("Only contiguous row slices are supported")
+            hi = max(hi, lo)
+            indptr = self.group["indptr"][lo : hi + 1]
+            start, stop = int(indptr[0]), int(indptr[-1])
+            return sp.csr_matrix(
+                (
+                    self.group["data"][start:stop],
+                    self.group["indices"][start:stop],
+                    indptr - start,
+                ),
+                shape=(hi - lo, self.shape[1]),
+            )
+
+        if (
+            self.format == "csc"
+            and isinstance(key, tuple)
+            and len(key) == 2
+            and key[0] == slice(None)
+        ):
+            cols = np.asarray(key[1], dtype=np.int64)
+            indptr = self.group["indptr"][...]
+            data, indices, sub_indptr = [], [], [0]
+            for j in cols:
+                start, stop = int(indptr[j]), int(indptr[j + 1])
+                data.append(self.group["data"][start:stop])
+                indices.append(self.group["indices"][start:stop])
+                sub_indptr.append(sub_indptr[-1] + stop - start)
+            return sp.csc_matrix(
+                (
+                    np.concatenate(data) if data else np.empty(0, self.dtype),
+                    np.concatenate(indices)
+                    if indices
+                    else np.empty(0, np.int32),
+                    np.asarray(sub_indptr, dtype=np.int64),
+                ),
+                shape=(self.shape[0], len(cols)),
+            )
+
+        raise IndexError(
+            f"Unsupported index {key!r} for an on-disk {self.format} matrix"
+        )
+
+
+class _DenseDataset:
+    """On-disk dense matrix; ``X[rows, cols]`` reads only that block."""
+
+    def __init__(self, array):
+        self.group = array
+        self.shape = tuple(array.shape)
+        self.dtype = array.dtype
+
+    def to_memory(self):
+        return self.group[...]
+
+    def __getitem__(self, key):
+        # zarr needs orthogonal indexing for integer arrays; h5py does it
+        # natively for increasing indices
+        oindex = getattr(self.group, "oindex", None)
+        if oindex is not None and isinstance(key, tuple):
+            return oindex[key]
+        return self.group[key]
+
+
+def _read_matrix(node):
+    if node is None:
+        return None
+    encoding = _encoding(node)
+    if encoding in ("csr_matrix", "csc_matrix"):
+        return _SparseDataset(node)
+    if hasattr(node, "keys"):
+        raise ValueError(f"Unsupported matrix encoding {encoding!r}")
+    return _DenseDataset(node)
+
+
+def read_subset(
+    path,
+    obsm: list[str],
+    obs: list[str] | None = None,
+    layer: str | None = None,
+):
+    """
+    Read selected parts of an .h5ad file or .zarr store.
+
+    Parameters
+    ----------
+    path : str or Path
+        Path to an .h5ad file or a .zarr directory.
+    obsm : list[str]
+        Keys of ``obsm`` to load into memory.
+    obs : list[str], optional
+        Columns of ``obs`` to load into memory.
+    layer : str, optional
+        Layer to expose as expression matrix instead of ``X``.
+
+    Returns
+    -------
+    SimpleNamespace
+        AnnData stand-in with ``obs``, ``obsm``, ``var_names``, ``X``,
+        ``layers``, ``n_obs`` and ``isbacked=True``. ``X`` (or the layer)
+        stays on disk and keeps the store open.
+    """
+    start = _now()
+    store = _open_store(path)
+
+    obsm_data = {}
+    for key in obsm:
+        if key not in store["obsm"]:
+            raise KeyError(f"Key '{key}' not found in adata.obsm")
+        node = store["obsm"][key]
+        if hasattr(node, "keys"):
+            raise ValueError(
+                f"obsm['{key}'] is not an array (encoding {_encoding(node)!r})"
+            )
+        obsm_data[key] = node[...]
+
+    obs_group = store["obs"]
+    # zarr 3 arrays have no len()
+    n_obs = obs_group[_attr(obs_group, "_index")].shape[0]
+    columns = {}
+    for key in dict.fromkeys(obs or []):
+        if key not in obs_group:
+            raise KeyError(f"Key '{key}' not found in adata.obs")
+        columns[key] = _read_column(obs_group[key], name=key).array
+    obs_df = pd.DataFrame(columns, index=pd.RangeIndex(n_obs))
+
+    var_names = _read_index(store["var"])
+
+    X = _read_matrix(store["X"]) if "X" in store else None
+    layers = {}
+    if layer is not None:
+        if "layers" not in store or layer not in store["layers"]:
+            raise KeyError(f"Layer '{layer}' not found in adata.layers")
+        layers[layer] = _read_matrix(store["layers"][layer])
+
+    logger.info(
+        "read_subset: read obsm={} obs={} n_obs={} n_vars={} from {} "
+        "in {:.3f}s",
+        list(obsm_data),
+        list(columns),
+        n_obs,
+        len(var_names),
+        path,
+        _now() - start,
+    )
+
+    return SimpleNamespace(
+        obs=obs_df,
+        obsm=obsm_data,
+        var_names=var_names,
+        X=X,
+        layers=layers,
+        n_obs=n_obs,
+        isbacked=True,
+        store=store,
+    )
@@ -0,0 +1,109 @@
+# spatialvista/sampling.py
+"""
+Seeded downsampling of cells to a point budget.
+
+``vis(max_points=...)`` draws the exported subset here once and passes it
+to every exporter as ``indices``, so positions, annotations, continuous
+values and genes all describe the same cells; ``widget.obs_indices`` maps
+the points back to obs rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ._logger import logger
+
+# Cells kept from every category of ``stratify_by`` (or all of a smaller one)
+DEFAULT_MIN_PER_CATEGORY = 100
+
+
+def _category_quotas(counts, budget: int, min_per_category: int):
+    """
+    Split ``budget`` points across categories of the given sizes.
+
+    Every category first receives ``min_per_category`` points (or all of
+    its cells), the rest of the budget is shared in proportion to the cells
+    left in each category, rounded by largest remainder.
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    floor_size = min(min_per_category, budget // len(counts))
+    if floor_size < min_per_category:
+        logger.warning(
+            "sample_points: {} categories do not fit {} points each in "
+            "max_points={}; keeping {} per category",
+            len(counts),
+            min_per_category,
+            budget,
+            floor_size,
+        )
+    quotas = np.minimum(counts, floor_size)
+    rest = counts - quotas
+    extra = budget - int(quotas.sum())
+    if extra <= 0 or not rest.any():
+        return quotas
+
+    share = rest * (extra / rest.sum())
+    extra_quotas = np.floor(share).astype(np.int64)
+    left = extra - int(extra_quotas.sum())
+    if left > 0:
+        order = np.argsort(extra_quotas - share, kind="stable")
+        extra_quotas[order[:left]] += 1
+    return quotas + np.minimum(extra_quotas, rest)
+
+
+def sample_points(
+    adata,
+    max_points: int,
+    stratify_by: str | None = None,
+    min_per_category: int = DEFAULT_MIN_PER_CATEGORY,
+    seed: int = 0,
+):
+    """
+    Pick at most ``max_points`` obs rows, deterministically for a seed.
+
+    Without ``stratify_by`` the rows are a uniform random subset. With it,
+    every category of ``adata.obs[stratify_by]`` (missing values count as
+    one category) keeps at least ``min_per_category`` cells, or all of
+    them when it is smaller, and the remaining budget is shared in
+    proportion to category size. Rare categories are therefore
+    over-represented rather than lost.
+
+    Returns:
+      indices: np.ndarray of sorted obs row indices, or None when
+      ``adata`` already fits the budget
+    """
+    n_obs = getattr(adata, "n_obs", None)
+    if n_obs is None:
+        n_obs = len(adata.obs)
+    if max_points >= n_obs:
+        return None
+
+    rng = np.random.default_rng(seed)
+    if stratify_by is None:
+        return np.sort(rng.choice(n_obs, size=max_points, replace=False))
+
+    codes, uniques = pd.factorize(adata.obs[stratify_by], use_na_sentinel=False)
+    counts = np.bincount(codes, minlength=len(uniques))
+    quotas = _category_quotas(counts, max_points, min_per_category)
+
+    # shuffle, then group by category (stable, so each group stays
+    # shuffled) and keep the first quota of every group; 16-bit codes
+    # get NumPy's radix sort
+    if len(uniques) <= np.iinfo(np.uint16).max:
+        codes = codes.astype(np.uint16)
+    perm = rng.permutation(n_obs)
+    grouped = perm[np.argsort(codes[perm], kind="stable")]
+    starts = np.cumsum(counts) - counts
+    rank = np.arange(n_obs) - np.repeat(starts, counts)
+    indices = np.sort(grouped[rank < np.repeat(quotas, counts)])
+
+    logger.info(
+        "sample_points: kept {} of {} cells across {} categories of '{}' "
+        "(smallest quota {})",
+        len(indices),
+        n_obs,
+        len(uniques),
+        stratify_by,
+        int(quotas.min()),
+    )
+    return indices
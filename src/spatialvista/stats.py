@@ -0,0 +1,294 @@
+# spatialvista/stats.py
+"""
+Summary statistics shipped with the exported traits.
+
+Continuous traits carry quantiles and a fixed-bin histogram of their values
+(``value_summary``), annotation categories their point counts
+(``category_counts``) and every continuous trait its mean per category of
+each shown annotation (``CategorySums``, fed by the exporters while the
+values are in hand). All of them are computed with whole-array NumPy
+passes, so the frontend can offer robust color ranges and summaries
+without scanning the buffers itself.
+"""
+
+import numpy as np
+
+# Quantile levels of every continuous trait
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+# Histogram bins over [Min, Max] of every continuous trait
+SUMMARY_BINS = 32
+
+# Trait values buffered by CategorySums before a grouped reduction
+CATEGORY_SUMS_BLOCK = 1 << 22
+
+
+def _json_floats(values) -> list:
+    """Floats for the JSON config, None where undefined (NaN)."""
+    return [None if np.isnan(v) else float(v) for v in values]
+
+
+def _sorted_with_zeros(values, n_zeros: int, positions):
+    """
+    Elements at ``positions`` of the sorted ``values`` plus ``n_zeros``
+    implicit zeros, without materializing the zeros.
+    """
+    values = np.sort(values)
+    positions = np.asarray(positions)
+    if len(values) == 0:
+        return np.zeros(len(positions))
+    n_neg = int(np.searchsorted(values, 0.0, side="left"))
+    n_nonpos = int(np.searchsorted(values, 0.0, side="right"))
+    # negatives, then stored and implicit zeros, then positives
+    zeros_end = n_nonpos + n_zeros
+    real = np.where(positions < n_neg, positions, positions - n_zeros)
+    out = values[np.clip(real, 0, len(values) - 1)]
+    return np.where((positions >= n_neg) & (positions < zeros_end), 0.0, out)
+
+
+def value_summary(values, n_zeros: int = 0, value_range=None) -> dict:
+    """
+    Quantiles and histogram of a continuous trait.
+
+    ``values`` are the stored values; ``n_zeros`` more zeros are implied
+    (the unstored entries of a sparse column). NaNs and infinities (e.g.
+    float16 overflow) are left out. The
+    histogram has ``SUMMARY_BINS`` equal bins over ``value_range``
+    (default: the value range), the range of the color scale.
+
+    Returns:
+      dict with "Count" (finite values), "Mean", "Quantiles" ({"Levels",
+      "Values"}) and "Histogram" ({"Bins", "Counts"})
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    n = len(values) + n_zeros
+    if n == 0:
+        return {
+            "Count": 0,
+            "Mean": None,
+            "Quantiles": {"Levels": list(QUANTILES), "Values": []},
+            "Histogram": {"Bins": SUMMARY_BINS, "Counts": []},
+        }
+
+    # linear interpolation between closest ranks, as np.quantile
+    pos = np.asarray(QUANTILES) * (n - 1)
+    lo_pos = np.floor(pos).astype(np.int64)
+    hi_pos = np.minimum(lo_pos + 1, n - 1)
+    if n_zeros:
+        lo_val = _sorted_with_zeros(values, n_zeros, lo_pos)
+        hi_val = _sorted_with_zeros(values, n_zeros, hi_pos)
+    else:
+        # partial sort: only the ranks needed are put in place
+        ordered = np.partition(values, np.unique(np.r_[lo_pos, hi_pos]))
+        lo_val, hi_val = ordered[lo_pos], ordered[hi_pos]
+    quantiles = lo_val + (hi_val - lo_val) * (pos - lo_pos)
+
+    vmin = min(values.min(initial=np.inf), 0.0 if n_zeros else np.inf)
+    vmax = max(values.max(initial=-np.inf), 0.0 if n_zeros else -np.inf)
+    if value_range is not None and np.all(np.isfinite(value_range)):
+        vmin, vmax = value_range
+    width = (vmax - vmin) / SUMMARY_BINS
+    if width > 0:
+        bins = np.floor((values - vmin) / width)
+        bins = np.clip(bins, 0, SUMMARY_BINS - 1).astype(np.int64)
+        zero_bin = int(np.clip(np.floor(-vmin / width), 0, SUMMARY_BINS - 1))
+    else:
+        bins = np.zeros(len(values), dtype=np.int64)
+        zero_bin = 0
+    counts = np.bincount(bins, minlength=SUMMARY_BINS)
+    counts[zero_bin] += n_zeros
+
+    return {
+        "Count": int(n),
+        "Mean": float(values.sum() / n),
+        "Quantiles": {
+            "Levels": list(QUANTILES),
+            "Values": _json_floats(quantiles),
+        },
+        "Histogram": {"Bins": SUMMARY_BINS, "Counts": counts.tolist()},
+    }
+
+
+def category_counts(codes, n_categories: int) -> np.ndarray:
+    """
+    Points per category; codes outside ``[0, n_categories)`` are missing
+    values.
+    """
+    codes = np.asarray(codes)
+    codes = codes[(codes >= 0) & (codes < n_categories)]
+    return np.bincount(codes, minlength=n_categories)
+
+
+def trait_values(config: dict, data):
+    """
+    Values of an exported continuous trait (see
+    ``export_continuous_obs_blob`` and ``_encode_gene_column``), with
+    quantized values mapped back to floats.
+
+    Returns:
+      rows: np.ndarray of the stored rows for sparse traits, else None
+      values: np.ndarray
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    rows = None
+    if config.get("Encoding") == "sparse":
+        index_dtype = np.dtype(config["IndexDType"])
+        index_bytes = config["NNZ"] * index_dtype.itemsize
+        rows = np.cumsum(buf[:index_bytes].view(index_dtype), dtype=np.int64)
+        buf = buf[index_bytes:]
+    values = buf.view(config["DType"])
+
+    quant = config.get("Quantization")
+    if quant is not None:
+        # see exporter._quantize_values; the top code marks NaN
+        nan = values == np.iinfo(values.dtype).max
+        values = quant["Offset"] + values * quant["Scale"]
+        if quant["Log"]:
+            values = np.expm1(values)
+        values[nan] = np.nan
+    return rows, values
+
+
+def n_categories(anno_map: dict) -> int:
+    """Category count of an ``AnnoMaps`` entry (JSON items or binary)."""
+    if "Dictionary" in anno_map:
+        return anno_map["Categories"]
+    return len(anno_map["Items"])
+
+
+def annotation_groups(config: dict, bins) -> dict:
+    """
+    Codes and category count of every annotation of an
+    ``export_annotations_blob`` result.
+
+    Returns:
+      dict mapping the annotation to ``(codes, n_categories)``
+    """
+    groups = {}
+    for anno, dtype in config.get("AnnoDtypes", {}).items():
+        if anno not in bins:
+            continue
+        codes = np.frombuffer(bins[anno], dtype=dtype)
+        groups[anno] = (codes, n_categories(config["AnnoMaps"][anno]))
+    return groups
+
+
+class CategorySums:
+    """
+    Mean of every trait per category of every annotation, accumulated from
+    the values an exporter has in hand.
+
+    ``add`` buffers the values of one trait; once ``block`` values are
+    buffered (and in ``means``) all buffered traits are reduced with one
+    ``bincount`` per annotation, value ``i`` of trait ``t`` counting towards
+    bin ``t * (n_categories + 1) + code``. For sparse traits only the
+    stored values are visited and the other points of a category count as
+    zeros. NaNs are left out; categories without values get None.
+
+    Parameters
+    ----------
+    groups : dict or callable
+        Annotation -> ``(codes, n_categories)`` as returned by
+        ``annotation_groups``, or a callable returning it. A callable is
+        only called at the first reduction, so the annotation export can
+        run concurrently with the traits being added.
+    block : int
+        Values buffered before a reduction.
+    """
+
+    def __init__(self, groups, block: int = CATEGORY_SUMS_BLOCK):
+        self._groups = groups
+        self._bins = None
+        self._block = block
+        self._pending = []
+        self._buffered = 0
+        self._means = {}
+
+    def _resolve(self) -> dict:
+        """
+        Per annotation: codes with missing values moved to the extra bin
+        ``n_categories``, the category count and the points per category.
+        """
+        if self._bins is None:
+            groups = self._groups() if callable(self._groups) else self._groups
+            self._bins = {}
+            for anno, (codes, n) in groups.items():
+                codes = np.asarray(codes)
+                binned = np.where((codes >= 0) & (codes < n), codes, n)
+                # compact codes keep the gathers of sparse traits in cache
+                binned = binned.astype(np.min_scalar_type(n))
+                totals = np.bincount(binned, minlength=n + 1)[:n]
+                self._bins[anno] = (binned, n, totals)
+        return self._bins
+
+    def add(self, key: str, rows, values) -> None:
+        """
+        Add the values of trait ``key``: one per point when ``rows`` is
+        None, else the stored values at ``rows``.
+        """
+        self._pending.append((key, rows, values))
+        self._buffered += len(values)
+        if self._buffered >= self._block:
+            self._reduce()
+
+    def _reduce(self) -> None:
+        pending, self._pending, self._buffered = self._pending, [], 0
+        if not pending:
+            return
+        bins = self._resolve()
+        if not bins:
+            return
+
+        # once per trait for all annotations: the points with a value and
+        # the points with NaN
+        points, values, nan_points = [], [], []
+        for _, rows, trait_values in pending:
+            trait_values = np.asarray(trait_values, dtype=np.float64)
+            nan = np.isnan(trait_values)
+            if nan.any():
+                valid, missing = np.flatnonzero(~nan), np.flatnonzero(nan)
+                if rows is not None:
+                    valid, missing = rows[valid], rows[missing]
+                points.append(valid)
+                nan_points.append(missing)
+                trait_values = trait_values[~nan]
+            else:
+                points.append(rows)
+                nan_points.append(None)
+            values.append(trait_values)
+        weights = np.concatenate(values)
+        bounds = np.cumsum([0, *(len(v) for v in values)])
+
+        n_traits = len(pending)
+        index = np.empty(len(weights), dtype=np.intp)
+        for anno, (binned, n, totals) in bins.items():
+            stride = n + 1
+            size = n_traits * stride
+            for t, rows in enumerate(points):
+                out = index[bounds[t] : bounds[t + 1]]
+                group = binned if rows is None else binned[rows]
+                np.add(group, np.intp(t * stride), out=out)
+            sums = np.bincount(index, weights=weights, minlength=size)
+            sums = sums.reshape(n_traits, stride)[:, :n]
+            counts = np.broadcast_to(totals, (n_traits, n))
+            if any(p is not None for p in nan_points):
+                nan_index = np.concatenate(
+                    [
+                        binned[p].astype(np.intp) + t * stride
+                        for t, p in enumerate(nan_points)
+                        if p is not None
+                    ]
+                )
+                counts = counts - np.bincount(
+                    nan_index, minlength=size
+                ).reshape(n_traits, stride)[:, :n]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = np.where(counts > 0, sums / counts, np.nan)
+            for (key, _, _), row in zip(pending, means):
+                self._means.setdefault(key, {})[anno] = _json_floats(row)
+
+    def means(self) -> dict:
+        """Trait -> annotation -> mean per category code."""
+        self._reduce()
+        return self._means
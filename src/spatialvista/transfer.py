@@ -0,0 +1,241 @@
+# spatialvista/transfer.py
+"""
+Chunked, flow-controlled transfer of binary buffers over custom messages.
+
+``send_state`` pushes a bytes trait to the browser as one comm message,
+which can exceed websocket or proxy message limits (e.g. on JupyterHub) and
+gives no progress signal. With ``vis(transfer="chunked")`` the buffer traits
+are instead announced in the small ``transfer_manifest`` trait and streamed
+as a sequence of ``transfer_chunk`` messages:
+
+- the frontend sends ``{"type": "transfer_start"}`` once it is mounted
+  (messages sent before a view exists are lost) and again after a reload;
+- the kernel answers with chunks of at most ``chunk_bytes`` bytes,
+  ``{"type": "transfer_chunk", "id", "version", "target", "key", "seq",
+  "offset", "nbytes"}`` plus one buffer, keeping at most ``window`` chunks
+  unacknowledged;
+- the frontend copies each chunk into a preallocated buffer, replies with
+  ``{"type": "transfer_ack", "id", "version", "seq"}`` (which releases the
+  next chunk) and sets the assembled trait value locally once every buffer
+  of the trait has arrived.
+
+Buffers are identified by ``"<trait>"`` or ``"<trait>/<key>"`` for dict
+traits. Publishing a different object under an existing id bumps its
+version, so the frontend discards partial data of the old one.
+"""
+
+import threading
+import time
+from collections import deque
+
+from ._logger import logger
+
+# 4 MiB chunks with 4 in flight keep every message well below common
+# proxy limits (10-100 MiB) while keeping the websocket busy
+DEFAULT_TRANSFER_CHUNK_BYTES = 4 * 1024 * 1024
+DEFAULT_TRANSFER_WINDOW = 4
+
+
+class _Buffer:
+    __slots__ = (
+        "acked",
+        "data",
+        "id",
+        "key",
+        "t0",
+        "target",
+        "value",
+        "version",
+    )
+
+    def __init__(self, id, target, key, value, version):
+        self.id = id
+        self.target = target
+        self.key = key
+        # the published object, and a flat byte view of it for slicing
+        self.value = value
+        self.data = memoryview(value).cast("B")
+        self.version = version
+        self.acked = set()
+        self.t0 = None
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+
+class ChunkedTransfer:
+    """
+    Kernel side of the chunked transfer protocol.
+
+    Parameters
+    ----------
+    send : callable
+        ``send(content, buffers)`` of the widget.
+    chunk_bytes : int
+        Largest chunk payload in bytes.
+    window : int
+        Largest number of chunks sent but not yet acknowledged.
+    metrics : MetricsCollector, optional
+        Receives one "send" span per chunk.
+    """
+
+    def __init__(self, send, chunk_bytes, window, metrics=None):
+        self._send = send
+        self.chunk_bytes = int(chunk_bytes)
+        self.window = int(window)
+        self._metrics = metrics
+        self._lock = threading.Lock()
+        self._buffers = {}
+        self._targets = {}
+        # last version per id, kept after removal so a re-added buffer
+        # never matches stale frontend data
+        self._versions = {}
+        self._queue = deque()
+        self._in_flight = set()
+        self._started = False
+
+    def _n_chunks(self, buf) -> int:
+        return max(1, -(-buf.nbytes // self.chunk_bytes))
+
+    def publish(self, target: str, value) -> None:
+        """
+        Register the bytes (or dict of bytes) ``value`` of trait ``target``.
+
+        Chunks are queued right away when the frontend has already asked
+        for transfers, otherwise on ``start``.
+        """
+        if isinstance(value, dict):
+            items = [(f"{target}/{k}", k, v) for k, v in value.items()]
+        else:
+            items = [(target, None, value)]
+
+        with self._lock:
+            ids = []
+            for id, key, data in items:
+                ids.append(id)
+                old = self._buffers.get(id)
+                if old is not None and old.value is data:
+                    continue
+                version = self._versions.get(id, -1) + 1
+                self._versions[id] = version
+                buf = _Buffer(id, target, key, data, version)
+                self._buffers[id] = buf
+                if self._started:
+                    self._enqueue(buf)
+            # keys dropped from a dict trait are no longer sent
+            for id in self._targets.get(target, {}).get("Buffers", []):
+                if id not in ids:
+                    del self._buffers[id]
+            self._targets[target] = {
+                "Keyed": isinstance(value, dict),
+                "Buffers": ids,
+            }
+            self._pump()
+
+    def published(self, target: str):
+        """The value last published for ``target`` (None if never)."""
+        with self._lock:
+            spec = self._targets.get(target)
+            if spec is None:
+                return None
+            if not spec["Keyed"]:
+                return self._buffers[spec["Buffers"][0]].value
+            return {
+                self._buffers[id].key: self._buffers[id].value
+                for id in spec["Buffers"]
+            }
+
+    def manifest(self) -> dict:
+        """JSON-safe description of all published buffers."""
+        with self._lock:
+            return {
+                "ChunkBytes": self.chunk_bytes,
+                "Window": self.window,
+                "Buffers": {
+                    buf.id: {
+                        "Target": buf.target,
+                        "Key": buf.key,
+                        "Version": buf.version,
+                        "NBytes": buf.nbytes,
+                        "Chunks": self._n_chunks(buf),
+                    }
+                    for buf in self._buffers.values()
+                },
+                "Targets": {
+                    target: dict(spec) for target, spec in self._targets.items()
+                },
+            }
+
+    def progress(self) -> dict:
+        """Acknowledged and total bytes per buffer id."""
+        with self._lock:
+            return {
+                buf.id: {
+                    "acked_bytes": min(
+                        len(buf.acked) * self.chunk_bytes, buf.nbytes
+                    ),
+                    "nbytes": buf.nbytes,
+                    "done": len(buf.acked) == self._n_chunks(buf),
+                }
+                for buf in self._buffers.values()
+            }
+
+    def start(self) -> None:
+        """(Re)send every buffer to a frontend that has nothing yet."""
+        with self._lock:
+            self._started = True
+            self._queue.clear()
+            self._in_flight.clear()
+            for buf in self._buffers.values():
+                buf.acked.clear()
+                self._enqueue(buf)
+            self._pump()
+
+    def ack(self, id: str, version: int, seq: int) -> None:
+        with self._lock:
+            self._in_flight.discard((id, version, seq))
+            buf = self._buffers.get(id)
+            if buf is not None and buf.version == version:
+                buf.acked.add(seq)
+                if len(buf.acked) == self._n_chunks(buf):
+                    logger.info(
+                        "transfer: {} ({} bytes) delivered in {:.3f}s",
+                        id,
+                        buf.nbytes,
+                        time.perf_counter() - buf.t0,
+                    )
+            self._pump()
+
+    def _enqueue(self, buf) -> None:
+        for seq in range(self._n_chunks(buf)):
+            self._queue.append((buf, buf.version, seq))
+
+    def _pump(self) -> None:
+        # caller holds the lock
+        while self._queue and len(self._in_flight) < self.window:
+            buf, version, seq = self._queue.popleft()
+            if buf.version != version or self._buffers.get(buf.id) is not buf:
+                continue  # superseded by a newer publish
+            if seq == 0:
+                buf.t0 = time.perf_counter()
+            offset = seq * self.chunk_bytes
+            chunk = buf.data[offset : offset + self.chunk_bytes]
+            self._in_flight.add((buf.id, version, seq))
+            content = {
+                "type": "transfer_chunk",
+                "id": buf.id,
+                "version": version,
+                "target": buf.target,
+                "key": buf.key,
+                "seq": seq,
+                "offset": offset,
+                "nbytes": buf.nbytes,
+            }
+            if self._metrics is None:
+                self._send(content, buffers=[chunk])
+                continue
+            with self._metrics.span(
+                f"transfer:{buf.id}", "send", nbytes=chunk.nbytes, seq=seq
+            ):
+                self._send(content, buffers=[chunk])
@@ -1,5 +1,7 @@
 """Input validation utilities."""
 
+import numpy as np
+
 # from typing import Optional
 
 
@@ -12,6 +14,123 @@ def validate_mode(mode: str) -> None:
         )
 
 
+def validate_transport(transport: str) -> None:
+    """Validate point cloud transport."""
+    valid_transports = ["laz", "raw", "quantized"]
+    if transport not in valid_transports:
+        raise ValueError(
+            f"Invalid transport: {transport}. Valid transports are: {', '.join(valid_transports)}"
+        )
+
+
+def validate_tolerance(tolerance: float | None) -> None:
+    """Validate position quantization tolerance."""
+    if tolerance is not None and not tolerance > 0:
+        raise ValueError(
+            f"position_tolerance must be positive, got {tolerance}"
+        )
+
+
+def validate_precision(precision, tolerance: float) -> None:
+    """Validate continuous value precision (one or per trait) and tolerance."""
+    from .exporter import PRECISIONS
+
+    valid_precisions = ["auto", *PRECISIONS]
+    values = precision.values() if isinstance(precision, dict) else [precision]
+    for value in values:
+        if value is not None and value not in valid_precisions:
+            raise ValueError(
+                f"Invalid precision: {value}. Valid precisions are: {', '.join(valid_precisions)}"
+            )
+    if not tolerance > 0:
+        raise ValueError(
+            f"precision_tolerance must be positive, got {tolerance}"
+        )
+
+
+def validate_transfer(transfer: str, chunk_bytes: int, window: int) -> None:
+    """Validate buffer transfer mode and chunked transfer settings."""
+    valid_transfers = ["state", "chunked"]
+    if transfer not in valid_transfers:
+        raise ValueError(
+            f"Invalid transfer: {transfer}. Valid transfers are: {', '.join(valid_transfers)}"
+        )
+    if not isinstance(chunk_bytes, int) or chunk_bytes <= 0:
+        raise ValueError(
+            f"transfer_chunk_bytes must be a positive integer, got {chunk_bytes}"
+        )
+    if not isinstance(window, int) or window <= 0:
+        raise ValueError(
+            f"transfer_window must be a positive integer, got {window}"
+        )
+
+
+def validate_workers(workers: int | None, processes: int) -> None:
+    """Validate export thread and process counts."""
+    if workers is not None and (not isinstance(workers, int) or workers <= 0):
+        raise ValueError(
+            f"export_workers must be a positive integer, got {workers}"
+        )
+    if not isinstance(processes, int) or processes < 0:
+        raise ValueError(
+            f"export_processes must be a non-negative integer, got {processes}"
+        )
+
+
+def validate_sampling(
+    max_points: int | None, stratify_by: str | None, min_per_category: int
+) -> None:
+    """Validate downsampling settings."""
+    if max_points is not None and (
+        not isinstance(max_points, int) or max_points <= 0
+    ):
+        raise ValueError(
+            f"max_points must be a positive integer, got {max_points}"
+        )
+    if stratify_by is not None and max_points is None:
+        raise ValueError("stratify_by requires max_points")
+    if not isinstance(min_per_category, int) or min_per_category < 0:
+        raise ValueError(
+            f"min_per_category must be a non-negative integer, got {min_per_category}"
+        )
+
+
+def validate_point_order(point_order: str | None, lod: bool) -> None:
+    """Validate space-filling-curve ordering settings."""
+    valid_orders = ["morton", "hilbert"]
+    if point_order is None:
+        return
+    if point_order not in valid_orders:
+        raise ValueError(
+            f"Invalid point_order: {point_order}. Valid orders are: {', '.join(valid_orders)}"
+        )
+    if lod:
+        raise ValueError(
+            "point_order cannot be combined with lod=True, which defines "
+            "its own point order"
+        )
+
+
+def validate_aggregate(aggregate: str | None, voxel_size, max_points) -> None:
+    """Validate point aggregation settings."""
+    valid_aggregates = ["voxel"]
+    if aggregate is None:
+        return
+    if aggregate not in valid_aggregates:
+        raise ValueError(
+            f"Invalid aggregate: {aggregate}. Valid aggregates are: {', '.join(valid_aggregates)}"
+        )
+    if voxel_size is None:
+        raise ValueError(f"aggregate='{aggregate}' requires voxel_size")
+    sizes = np.atleast_1d(np.asarray(voxel_size, dtype=float))
+    if sizes.ndim != 1 or len(sizes) not in (1, 3) or not (sizes > 0).all():
+        raise ValueError(
+            f"voxel_size must be a positive number or one per axis, got {voxel_size}"
+        )
+    if max_points is not None:
+        raise ValueError("max_points cannot be combined with aggregate")
+
+
 def validate_adata_key(adata, key: str, key_type: str = "obs") -> None:
     """
     Validate that a key exists in AnnData object.
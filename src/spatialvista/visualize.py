@@ -1,15 +1,38 @@
 import time
+import uuid
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 from typing import Any, Optional
 
 from ._logger import logger
+from .aggregate import VOXEL_COUNT_KEY, VoxelAggregate
+from .cache import _nbytes, cached_call, export_caches, gene_export_source
 from .exporter import (
+    DEFAULT_PRECISION_TOLERANCE,
     export_annotations_blob,
     export_continuous_gene_blob,
     export_continuous_obs_blob,
+    export_positions_quantized,
+    export_positions_raw,
+    section_order,
     write_laz_to_bytes,
 )
-from .widget import SpatialVistaWidget
+from .lod import export_lod_blobs
+from .metrics import collecting, metrics_enabled_by_default, span
+from .ordering import curve_order
+from .parallel import (
+    default_export_workers,
+    export_annotations_in_processes,
+    export_continuous_genes_in_processes,
+    export_continuous_obs_in_processes,
+    process_pool,
+    submit,
+)
+from .reader import read_subset
+from .sampling import DEFAULT_MIN_PER_CATEGORY, sample_points
+from .stats import annotation_groups
+from .transfer import DEFAULT_TRANSFER_CHUNK_BYTES, DEFAULT_TRANSFER_WINDOW
+from .widget import DEFAULT_GENE_CACHE_BYTES, SpatialVistaWidget
 
 
 def _now() -> float:
@@ -43,9 +66,12 @@ def _async_set_trait_and_send(
     """
     try:
         t0 = time.perf_counter()
-        setattr(widget, trait_name, value)
+        nbytes = _nbytes(value)
+        with widget._metrics.span(trait_name, "trait_set", nbytes=nbytes):
+            setattr(widget, trait_name, value)
         # call send_state to trigger trait syncing to frontend
-        widget.send_state(trait_name)
+        with widget._metrics.span(trait_name, "send_state", nbytes=nbytes):
+            widget.send_state(trait_name)
         dur = time.perf_counter() - t0
         logger.info(
             "async_send: trait='{}' size={} took {:.3f}s (dispatched in background)",
@@ -59,6 +85,32 @@ def _async_set_trait_and_send(
         )
 
 
+def _async_send_buffers(
+    widget: SpatialVistaWidget, trait_name: str, value: Any
+) -> None:
+    """
+    Background worker for buffer traits: stream them in chunks when the
+    widget uses the chunked transfer, otherwise set and send the trait.
+    """
+    if widget._transfer is None:
+        _async_set_trait_and_send(widget, trait_name, value)
+        return
+    try:
+        t0 = time.perf_counter()
+        with widget._metrics.span(trait_name, "publish", nbytes=_nbytes(value)):
+            widget._publish_buffers(trait_name, value)
+        logger.info(
+            "async_send: published trait='{}' size={} for chunked transfer in {:.3f}s",
+            trait_name,
+            _size_of_value(value),
+            time.perf_counter() - t0,
+        )
+    except (OSError, RuntimeError, TypeError, ValueError) as e:
+        logger.exception(
+            "async_send: failed to publish trait='{}': {}", trait_name, e
+        )
+
+
 def vis(
     adata,
     position: str,
@@ -70,6 +122,33 @@ def vis(
     layer: Optional[str] = None,
     height: int = 600,
     mode: str = "3D",
+    *,
+    gene_encoding: str = "dense",
+    precision: str | dict[str, str] | None = None,
+    precision_tolerance: float = DEFAULT_PRECISION_TOLERANCE,
+    binary_dictionaries: bool = False,
+    transport: str = "laz",
+    position_tolerance: float | None = None,
+    compress_laz: bool = False,
+    lod: bool = False,
+    lod_base_points: int = 65536,
+    max_points: int | None = None,
+    stratify_by: str | None = None,
+    min_per_category: int = DEFAULT_MIN_PER_CATEGORY,
+    sample_seed: int = 0,
+    point_order: str | None = None,
+    aggregate: str | None = None,
+    voxel_size: float | tuple[float, float, float] | None = None,
+    chunk_size: int | None = None,
+    on_demand_genes: bool = False,
+    gene_cache_bytes: int = DEFAULT_GENE_CACHE_BYTES,
+    cache: bool = True,
+    metrics: bool | None = None,
+    transfer: str = "state",
+    transfer_chunk_bytes: int = DEFAULT_TRANSFER_CHUNK_BYTES,
+    transfer_window: int = DEFAULT_TRANSFER_WINDOW,
+    export_workers: int | None = None,
+    export_processes: int = 0,
     _async_workers: int = 2,
     _wait_for_all_sends: bool = False,
 ) -> SpatialVistaWidget:
@@ -89,7 +168,10 @@ def vis(
         Key in adata.obs for default categorical coloring.
     section : str, optional
         Annotation key for section slicing (only relevant when mode="3D" and switching to 2D slice view in UI).
-        Ignored when mode="2D".
+        Ignored when mode="2D". Points are ordered by section (stably, unless
+        ``lod=True``) so the UI selects a section by its point range; see
+        ``widget.obs_indices`` to map points back to obs rows. Bundles
+        built before the section offset table scan the annotation instead.
     annotations : list[str], optional
         List of additional categorical annotation keys to export.
     continuous : list[str], optional
@@ -102,6 +184,155 @@ def vis(
         Height of the widget in pixels.
     mode : str, default "3D"
         Visualization mode. "3D" for 3D point cloud, "2D" for 2D projection (z=0).
+    gene_encoding : str, default "dense"
+        Wire layout of gene buffers: "dense" (one float16 per cell),
+        "sparse" (delta-encoded nonzero indices plus float16 values) or
+        "auto" (whichever is smaller for each gene). "sparse" and "auto"
+        need a widget bundle built from the current frontend sources.
+    precision : str or dict, optional
+        Encoding of continuous values and genes, for all of them or as a
+        dict by obs column / gene name: "float32", "float16", "uint16" or
+        "uint8" (linear quantization over the value range, with the scale
+        and offset in the config), "log-uint16" or "log-uint8" (quantized
+        ``log1p``, for non-negative values such as counts), or "auto" (the
+        smallest encoding whose largest error is within
+        ``precision_tolerance``). Unlisted traits are sent as float32 (obs)
+        and float16 (genes). Values beyond the float16 range (65504) are
+        sent as float32 instead of overflowing to inf. "auto" typically
+        halves the payload of float32 columns. Quantized
+        encodings need a widget bundle built from the current frontend
+        sources.
+    precision_tolerance : float, default 1e-3
+        Largest error of ``precision="auto"``, as a fraction of the value
+        range of the trait.
+    binary_dictionaries : bool, default False
+        Send the category names, colors and counts of annotations with at
+        least 1024 categories as one binary buffer instead of a JSON item
+        per category. Needs a widget bundle built from the current frontend
+        sources.
+    transport : str, default "laz"
+        How positions are sent to the browser. "laz" compresses them with
+        LAZ (smallest payload). "raw" sends a plain little-endian float32
+        buffer plus a bounding box, skipping LAZ encode and decode; this is
+        usually faster for local kernels where bandwidth is cheap.
+        "quantized" sends uint16 (or uint32) grid coordinates relative to
+        the bounding box with a per-axis scale and offset: half or a quarter
+        of the float32 size and no codec on either side. "raw" and
+        "quantized" need a widget bundle built from the current frontend
+        sources.
+    position_tolerance : float, optional
+        Largest acceptable absolute position error, in the units of
+        ``adata.obsm[position]``, for ``transport="quantized"``. uint16 is
+        used when the bounding box fits 65535 steps of twice this size,
+        uint32 otherwise. None always uses uint16.
+    compress_laz : bool, default False
+        With ``transport="laz"``, compress positions to LAZ (roughly a third
+        of the LAS size) using all cores. Worth it when bandwidth to the
+        browser is the bottleneck; decoding in the browser gets slower.
+    lod : bool, default False
+        Export the point cloud as a coarse-to-fine level-of-detail hierarchy.
+        The coarsest level is drawn first and later levels refine it, so the
+        first paint does not depend on the number of cells. Points (and all
+        annotation and continuous buffers) are reordered accordingly; see
+        ``widget.obs_indices`` to map points back to obs rows. Needs a widget
+        bundle built from the current frontend sources; older bundles draw
+        no points.
+    lod_base_points : int, default 65536
+        Approximate number of points in the coarsest LOD level.
+    max_points : int, optional
+        Show a random subset of at most this many cells. The subset depends
+        only on the data and ``sample_seed``, every exported buffer
+        describes the same cells, and ``widget.obs_indices`` maps points
+        back to obs rows. All cells are shown by default.
+    stratify_by : str, optional
+        Key in ``adata.obs`` to sample within (e.g. the cell type), so that
+        every category keeps at least ``min_per_category`` cells and rare
+        ones are not lost; the rest of the budget is shared in proportion
+        to category size.
+    min_per_category : int, default 100
+        Cells kept from each ``stratify_by`` category (all of smaller ones).
+    sample_seed : int, default 0
+        Seed of the random subset.
+    point_order : {"morton", "hilbert"}, optional
+        Export points sorted along a space-filling curve through their
+        positions instead of in obs order, so that nearby cells are
+        adjacent in every buffer (smaller LAZ files, better locality in the
+        browser). Hilbert order keeps consecutive points closer, Morton
+        order is faster to compute. Within sections when ``section`` is
+        given; not combinable with ``lod=True``. ``widget.obs_indices``
+        maps points back to obs rows.
+    aggregate : {"voxel"}, optional
+        Draw an overview instead of every cell: with "voxel", cells are
+        binned into a grid of ``voxel_size`` and each occupied voxel is one
+        point at the centroid of its cells. Annotations show the majority
+        category of the voxel, continuous values and genes the mean, and
+        the continuous trait "Cells per voxel" the number of cells.
+        ``widget.cells(points)`` returns the cells behind points, e.g. to
+        call ``vis`` again on a region. Aggregated buffers are not cached
+        on disk.
+    voxel_size : float or tuple of float, optional
+        Voxel edge length in position units, for all axes or per axis.
+        Required with ``aggregate="voxel"``.
+    chunk_size : int, optional
+        Process positions and expression in chunks of this many rows, so
+        that peak memory is bounded by the chunk size rather than by n_obs.
+        Defaults to 65536 rows when ``adata`` is backed (opened with
+        ``backed="r"``), and to a single pass otherwise. Backed AnnData keeps
+        ``X`` on disk; ``obs`` and ``obsm`` are held in memory by anndata
+        itself. LOD ordering (``lod=True``) needs all coordinates at once.
+    on_demand_genes : bool, default False
+        Let the widget request any gene in ``adata.var_names`` (from ``layer``
+        if given) from the kernel when the user searches for it, instead of
+        only the genes exported up front. The widget keeps a reference to
+        ``adata`` for this. Needs a widget bundle built from the current
+        frontend sources.
+    gene_cache_bytes : int, default 256 MiB
+        Byte budget of the kernel-side LRU cache for genes fetched on demand.
+    cache : bool, default True
+        Reuse exported buffers when the source arrays and export options are
+        unchanged: from process memory when another widget exported them
+        (keyed by the identity of the source arrays and a sample of their
+        values, capped by ``$SPATIALVISTA_MEMORY_CACHE_MAX_BYTES``, default
+        1 GiB; call ``spv.invalidate_cache(adata)`` after modifying
+        ``adata`` in place), else from the on-disk cache (keyed by a content
+        hash, e.g. after a kernel restart). The disk cache
+        lives in ``$SPATIALVISTA_CACHE_DIR`` (default
+        ``~/.cache/spatialvista``), is capped by
+        ``$SPATIALVISTA_CACHE_MAX_BYTES`` (default 4 GiB) and can be disabled
+        globally by setting ``$SPATIALVISTA_NO_CACHE=1``
+        (``$SPATIALVISTA_NO_MEMORY_CACHE=1`` for the memory cache).
+    metrics : bool, optional
+        Record the duration and size of every export and transfer stage
+        (encode, factorize, cast, serialize, cache, trait set, send_state)
+        in ``widget.export_report``. Defaults to on when
+        ``$SPATIALVISTA_METRICS`` is set and off otherwise; when off, the
+        overhead is negligible.
+    transfer : str, default "state"
+        How position, annotation and continuous buffers reach the browser.
+        "state" syncs each buffer trait as one comm message. "chunked"
+        streams them as custom messages of at most ``transfer_chunk_bytes``
+        bytes, with at most ``transfer_window`` chunks awaiting the
+        browser's acknowledgement, and shows the loading progress. Use it
+        when large buffers hit websocket or proxy message limits (e.g. on
+        JupyterHub). ``widget.transfer_progress`` reports acknowledged
+        bytes per buffer. "chunked" needs a widget bundle built from the
+        current frontend sources; older bundles never acknowledge a chunk.
+    transfer_chunk_bytes : int, default 4 MiB
+        Largest chunk for ``transfer="chunked"``.
+    transfer_window : int, default 4
+        Largest number of unacknowledged chunks for ``transfer="chunked"``.
+    export_workers : int, optional
+        Number of threads running the export stages (positions,
+        annotations, continuous obs, genes) concurrently. Defaults to one
+        per stage, up to the number of CPUs; 1 exports them one after
+        another. With ``lod=True`` the LOD export runs first, since it
+        decides the point order of the others.
+    export_processes : int, default 0
+        Split the per-column work of the annotation, continuous obs and
+        gene exports across a pool of this many processes. Worth it for many
+        string annotations or genes on a many-core machine; the workers are
+        started once per session and receive only the columns they export.
+        0 keeps everything in the kernel process.
     _async_workers : int, default 2
         Number of background workers for async trait sends.
     _wait_for_all_sends : bool, default False
@@ -124,16 +355,39 @@ def vis(
     >>> widget = spv.vis(adata, position="spatial", color="region")
     """
 
-    from .validation import validate_adata_key, validate_height, validate_mode
+    from .validation import (
+        validate_adata_key,
+        validate_aggregate,
+        validate_height,
+        validate_mode,
+        validate_point_order,
+        validate_precision,
+        validate_sampling,
+        validate_tolerance,
+        validate_transfer,
+        validate_transport,
+        validate_workers,
+    )
 
     validate_mode(mode)
+    validate_transport(transport)
+    validate_tolerance(position_tolerance)
+    validate_transfer(transfer, transfer_chunk_bytes, transfer_window)
+    validate_workers(export_workers, export_processes)
+    validate_sampling(max_points, stratify_by, min_per_category)
+    validate_point_order(point_order, lod)
+    validate_aggregate(aggregate, voxel_size, max_points)
     validate_height(height)
+    validate_precision(precision, precision_tolerance)
     validate_adata_key(adata, position, "obsm")
     validate_adata_key(adata, color, "obs")
 
     if section is not None:
         validate_adata_key(adata, section, "obs")
 
+    if stratify_by is not None:
+        validate_adata_key(adata, stratify_by, "obs")
+
     if annotations:
         for anno in annotations:
             validate_adata_key(adata, anno, "obs")
@@ -159,175 +413,575 @@ def vis(
     )
 
     w = SpatialVistaWidget()
-
-    # create a small thread pool for background sends
-    executor = ThreadPoolExecutor(max_workers=_async_workers)
-    futures = []
-
-    # --- GlobalConfig (send height + mode to frontend early) ---
-    global_cfg = {
-        "GlobalConfig": {
-            "Height": int(height),
-            "Mode": mode,
-            # if mode is "2D", slice_key is not relevant; frontend can check Mode
-            "SliceKey": section if mode == "3D" else None,
+    if metrics is None:
+        metrics = metrics_enabled_by_default()
+    w._metrics.enabled = bool(metrics)
+    if transfer == "chunked":
+        w._enable_chunked_transfer(transfer_chunk_bytes, transfer_window)
+
+    with collecting(w._metrics), span("vis"):
+        if aggregate == "voxel":
+            # exporters read the voxels like AnnData; annotations are
+            # voted on even when integer-coded
+            adata = VoxelAggregate(
+                adata,
+                position,
+                voxel_size,
+                mode=mode,
+                categorical=[
+                    k for k in (color, section, *(annotations or [])) if k
+                ],
+                chunk_size=chunk_size,
+            )
+            w.voxels = adata
+            continuous = [*(continuous or []), VOXEL_COUNT_KEY]
+            chunk_size = None
+            cache = False
+
+        caches = export_caches(cache)
+        positions = adata.obsm[position]
+
+        # create a small thread pool for background sends
+        executor = ThreadPoolExecutor(max_workers=_async_workers)
+        futures = []
+
+        # --- GlobalConfig (send height + mode to frontend early) ---
+        global_cfg = {
+            "GlobalConfig": {
+                "Height": int(height),
+                "Mode": mode,
+                # if mode is "2D", slice_key is not relevant; frontend can check Mode
+                "SliceKey": section if mode == "3D" else None,
+                "OnDemandGenes": bool(on_demand_genes),
+                # treemap/histogram layouts are served by layout_request;
+                # bundles that predate it ignore the flag and lay them out
+                # in the browser
+                "KernelLayouts": True,
+            }
         }
-    }
-    futures.append(
-        executor.submit(
-            _async_set_trait_and_send, w, "global_config", global_cfg
+        futures.append(
+            executor.submit(
+                _async_set_trait_and_send, w, "global_config", global_cfg
+            )
+        )
+        logger.info(
+            "vis: dispatched async send for global_config: {}", global_cfg
         )
-    )
-    logger.info("vis: dispatched async send for global_config: {}", global_cfg)
-
-    # --- LAZ ---
-    t0 = _now()
-    laz_bytes = write_laz_to_bytes(adata, position, mode=mode)
-    t_laz = _now() - t0
-    logger.info(
-        "vis: write_laz_to_bytes produced {} bytes in {:.3f}s",
-        len(laz_bytes),
-        t_laz,
-    )
-
-    # dispatch LAZ send in background
-    futures.append(
-        executor.submit(_async_set_trait_and_send, w, "laz_bytes", laz_bytes)
-    )
-    logger.info(
-        "vis: dispatched async send for laz_bytes ({} bytes)", len(laz_bytes)
-    )
 
-    # --- categorical annotations ---
-    t0 = _now()
-    anno_config, anno_bins = export_annotations_blob(
-        adata,
-        color,
-        section,
-        annotations,
-    )
-    t_ann = _now() - t0
-    total_anno_bytes = (
-        sum(len(b) for b in anno_bins.values()) if anno_bins else 0
-    )
-    logger.info(
-        "vis: export_annotations_blob produced {} bins total_bytes={} in {:.3f}s",
-        len(anno_bins),
-        total_anno_bytes,
-        t_ann,
-    )
+        # --- export stages ---
+        # With lod the point order comes from the LOD export, so it runs
+        # first; the other stages are independent and run concurrently.
+        if export_processes:
+            procs = process_pool(export_processes)
+            export_annotations = partial(
+                export_annotations_in_processes, procs, export_processes
+            )
+            export_continuous_obs = partial(
+                export_continuous_obs_in_processes, procs, export_processes
+            )
+            export_genes = partial(
+                export_continuous_genes_in_processes, procs, export_processes
+            )
+        else:
+            export_annotations = export_annotations_blob
+            export_continuous_obs = export_continuous_obs_blob
+            export_genes = export_continuous_gene_blob
+
+        # the orders go through the cache too, so a repeated call gets the
+        # same indices array back and the stages keyed on it hit memory
+        indices = None
+        if max_points is not None:
+            with span("sample", "sample"):
+                indices = cached_call(
+                    caches,
+                    "sample",
+                    (
+                        len(adata.obs),
+                        adata.obs[stratify_by] if stratify_by else None,
+                        max_points,
+                        min_per_category,
+                        sample_seed,
+                    ),
+                    sample_points,
+                    adata,
+                    max_points,
+                    stratify_by=stratify_by,
+                    min_per_category=min_per_category,
+                    seed=sample_seed,
+                )
+
+        if point_order is not None:
+            with span("curve_order", "sort"):
+                indices = cached_call(
+                    caches,
+                    "curve_order",
+                    (positions, point_order, mode, indices),
+                    curve_order,
+                    adata,
+                    position,
+                    point_order,
+                    mode=mode,
+                    indices=indices,
+                )
+
+        # contiguous sections let the frontend select one by range
+        # (annotation_config["SectionIndex"]); LOD needs its own order
+        if section is not None and mode == "3D" and not lod:
+            with span("section_order", "sort"):
+                indices = cached_call(
+                    caches,
+                    "section_order",
+                    (adata.obs[section], indices),
+                    section_order,
+                    adata,
+                    section,
+                    indices,
+                )
+        w.obs_indices = indices
+
+        point_bytes = 0
+        if lod:
+            t0 = _now()
+            lod_config, lod_levels, indices = cached_call(
+                caches,
+                "lod",
+                (
+                    positions,
+                    mode,
+                    lod_base_points,
+                    transport,
+                    position_tolerance,
+                    compress_laz,
+                    indices,
+                ),
+                export_lod_blobs,
+                adata,
+                position,
+                mode=mode,
+                indices=indices,
+                base_points=lod_base_points,
+                transport=transport,
+                tolerance=position_tolerance,
+                compress=compress_laz,
+            )
+            point_bytes = sum(len(b) for b in lod_levels)
+            logger.info(
+                "vis: export_lod_blobs produced {} levels ({} bytes) in {:.3f}s",
+                len(lod_levels),
+                point_bytes,
+                _now() - t0,
+            )
 
-    # dispatch annotation config and bins asynchronously
-    futures.append(
-        executor.submit(
-            _async_set_trait_and_send, w, "annotation_config", anno_config
-        )
-    )
-    futures.append(
-        executor.submit(
-            _async_set_trait_and_send, w, "annotation_bins", anno_bins
+            # levels are streamed when the frontend asks for them
+            w._lod_levels = lod_levels
+            w.obs_indices = indices
+            futures.append(
+                executor.submit(
+                    _async_set_trait_and_send, w, "lod_config", lod_config
+                )
+            )
+            logger.info("vis: dispatched async send for lod_config")
+
+        def export_points():
+            if transport in ("raw", "quantized"):
+                t0 = _now()
+                if transport == "raw":
+                    export_positions = export_positions_raw
+                    key_parts = (positions, mode, indices)
+                    kwargs = {"chunk_size": chunk_size}
+                else:
+                    export_positions = export_positions_quantized
+                    key_parts = (positions, mode, position_tolerance, indices)
+                    kwargs = {
+                        "tolerance": position_tolerance,
+                        "chunk_size": chunk_size,
+                    }
+                position_config, position_bytes = cached_call(
+                    caches,
+                    f"positions_{transport}",
+                    key_parts,
+                    export_positions,
+                    adata,
+                    position,
+                    mode=mode,
+                    indices=indices,
+                    **kwargs,
+                )
+                point_bytes = len(position_bytes)
+                logger.info(
+                    "vis: {} produced {} bytes in {:.3f}s",
+                    export_positions.__name__,
+                    point_bytes,
+                    _now() - t0,
+                )
+
+                # config first so the frontend knows how to read the buffer
+                futures.append(
+                    executor.submit(
+                        _async_set_trait_and_send,
+                        w,
+                        "position_config",
+                        position_config,
+                    )
+                )
+                futures.append(
+                    executor.submit(
+                        _async_send_buffers,
+                        w,
+                        "position_bytes",
+                        position_bytes,
+                    )
+                )
+                logger.info(
+                    "vis: dispatched async send for position_bytes ({} bytes)",
+                    point_bytes,
+                )
+            else:
+                t0 = _now()
+                laz_bytes = cached_call(
+                    caches,
+                    "laz",
+                    (positions, mode, compress_laz, indices),
+                    write_laz_to_bytes,
+                    adata,
+                    position,
+                    mode=mode,
+                    indices=indices,
+                    chunk_size=chunk_size,
+                    compress=compress_laz,
+                )
+                point_bytes = len(laz_bytes)
+                t_laz = _now() - t0
+                logger.info(
+                    "vis: write_laz_to_bytes produced {} bytes in {:.3f}s",
+                    len(laz_bytes),
+                    t_laz,
+                )
+
+                # dispatch LAZ send in background
+                futures.append(
+                    executor.submit(
+                        _async_send_buffers, w, "laz_bytes", laz_bytes
+                    )
+                )
+                logger.info(
+                    "vis: dispatched async send for laz_bytes ({} bytes)",
+                    len(laz_bytes),
+                )
+
+            return point_bytes
+
+        anno_keys = [color, section, *(annotations or [])]
+        anno_key_parts = (
+            anno_keys,
+            [adata.obs[k] for k in anno_keys if k is not None],
+            indices,
+            binary_dictionaries,
         )
-    )
-    logger.info(
-        "vis: dispatched async send for annotation_config and annotation_bins ({} bytes)",
-        total_anno_bytes,
-    )
 
-    # --- continuous obs ---
-    cont_traits = {}
-    cont_bins = {}
-    cont_obs_bytes = 0
-    if continuous:
-        t0 = _now()
-        cont_traits, cont_bins = export_continuous_obs_blob(
-            adata,
-            continuous,
-        )
-        t_cont = _now() - t0
-        cont_obs_bytes = (
-            sum(len(b) for b in cont_bins.values()) if cont_bins else 0
-        )
-        logger.info(
-            "vis: export_continuous_obs_blob produced {} bins total_bytes={} in {:.3f}s",
-            len(cont_bins),
-            cont_obs_bytes,
-            t_cont,
-        )
+        def category_groups():
+            # codes of the annotation stage, for the category means of the
+            # continuous and gene stages
+            anno_config, anno_bins, _ = stages["annotations"].result()
+            return annotation_groups(anno_config, anno_bins)
+
+        def export_annotation_stage():
+            t0 = _now()
+            anno_config, anno_bins = cached_call(
+                caches,
+                "annotations",
+                anno_key_parts,
+                export_annotations,
+                adata,
+                color,
+                section,
+                annotations,
+                indices=indices,
+                binary_dictionaries=binary_dictionaries,
+            )
+            # keep the config id unique per widget even when reused from cache
+            anno_config = {**anno_config, "Id": str(uuid.uuid4())}
+            # fresh dict: cached exports are shared across widgets, and
+            # add_* and remove_trait update it in place
+            anno_bins = dict(anno_bins)
+            t_ann = _now() - t0
+            total_anno_bytes = (
+                sum(len(b) for b in anno_bins.values()) if anno_bins else 0
+            )
+            logger.info(
+                "vis: export_annotations_blob produced {} bins total_bytes={} in {:.3f}s",
+                len(anno_bins),
+                total_anno_bytes,
+                t_ann,
+            )
 
-        # dispatch continuous config and bins asynchronously
-        futures.append(
-            executor.submit(
-                _async_set_trait_and_send, w, "continuous_config", cont_traits
+            # dispatch annotation config and bins asynchronously
+            futures.append(
+                executor.submit(
+                    _async_set_trait_and_send,
+                    w,
+                    "annotation_config",
+                    anno_config,
+                )
             )
-        )
-        futures.append(
-            executor.submit(
-                _async_set_trait_and_send, w, "continuous_bins", cont_bins
+            futures.append(
+                executor.submit(
+                    _async_send_buffers, w, "annotation_bins", anno_bins
+                )
+            )
+            logger.info(
+                "vis: dispatched async send for annotation_config and annotation_bins ({} bytes)",
+                total_anno_bytes,
             )
-        )
-        logger.info(
-            "vis: dispatched async send for continuous_config and continuous_bins ({} bytes)",
-            cont_obs_bytes,
-        )
 
-    # --- continuous genes ---
-    gene_bytes = 0
-    if genes:
-        t0 = _now()
-        gene_traits, gene_bins = export_continuous_gene_blob(
-            adata, genes, layer=layer
-        )
-        t_genes = _now() - t0
-        cont_traits.update(gene_traits)
-        cont_bins.update(gene_bins)
-        gene_bytes = sum(len(b) for b in gene_bins.values()) if gene_bins else 0
-        logger.info(
-            "vis: export_continuous_gene_blob produced {} genes total_bytes={} in {:.3f}s",
-            len(genes),
-            gene_bytes,
-            t_genes,
-        )
+            return anno_config, anno_bins, total_anno_bytes
+
+        def export_continuous_stage():
+            t0 = _now()
+            cont_traits, cont_bins = cached_call(
+                caches,
+                "continuous_obs",
+                (
+                    continuous,
+                    [adata.obs[k] for k in continuous],
+                    indices,
+                    precision,
+                    precision_tolerance,
+                    anno_key_parts,
+                ),
+                export_continuous_obs,
+                adata,
+                continuous,
+                indices=indices,
+                precision=precision,
+                tolerance=precision_tolerance,
+                category_groups=category_groups,
+            )
+            t_cont = _now() - t0
+            cont_obs_bytes = (
+                sum(len(b) for b in cont_bins.values()) if cont_bins else 0
+            )
+            logger.info(
+                "vis: export_continuous_obs_blob produced {} bins total_bytes={} in {:.3f}s",
+                len(cont_bins),
+                cont_obs_bytes,
+                t_cont,
+            )
 
-        futures.append(
-            executor.submit(
-                _async_set_trait_and_send, w, "continuous_config", cont_traits
+            return cont_traits, cont_bins, cont_obs_bytes
+
+        def export_gene_stage():
+            t0 = _now()
+            key_parts, gene_source = gene_export_source(adata, genes, layer)
+            gene_traits, gene_bins = cached_call(
+                caches,
+                "genes",
+                (
+                    *key_parts,
+                    genes,
+                    layer,
+                    indices,
+                    gene_encoding,
+                    precision,
+                    precision_tolerance,
+                    anno_key_parts,
+                ),
+                export_genes,
+                gene_source,
+                genes,
+                layer=layer,
+                indices=indices,
+                encoding=gene_encoding,
+                chunk_size=chunk_size,
+                precision=precision,
+                tolerance=precision_tolerance,
+                category_groups=category_groups,
             )
-        )
-        futures.append(
-            executor.submit(
-                _async_set_trait_and_send, w, "continuous_bins", cont_bins
+            t_genes = _now() - t0
+            gene_bytes = (
+                sum(len(b) for b in gene_bins.values()) if gene_bins else 0
             )
+            logger.info(
+                "vis: export_continuous_gene_blob produced {} genes total_bytes={} in {:.3f}s",
+                len(genes),
+                gene_bytes,
+                t_genes,
+            )
+
+            return gene_traits, gene_bins, gene_bytes
+
+        with ThreadPoolExecutor(
+            max_workers=export_workers or default_export_workers(),
+            thread_name_prefix="spatialvista-export",
+        ) as export_pool:
+            stages = {}
+            if not lod:
+                stages["positions"] = submit(export_pool, export_points)
+            stages["annotations"] = submit(export_pool, export_annotation_stage)
+            if continuous:
+                stages["continuous"] = submit(
+                    export_pool, export_continuous_stage
+                )
+            if genes:
+                stages["genes"] = submit(export_pool, export_gene_stage)
+
+            w._attach_source(
+                adata,
+                position=position,
+                indices=indices,
+                layer=layer,
+                gene_encoding=gene_encoding,
+                chunk_size=chunk_size,
+                cache=cache,
+                precision=precision,
+                precision_tolerance=precision_tolerance,
+                binary_dictionaries=binary_dictionaries,
+            )
+            if on_demand_genes:
+                w._attach_gene_source(
+                    adata,
+                    layer=layer,
+                    indices=indices,
+                    encoding=gene_encoding,
+                    cache_bytes=gene_cache_bytes,
+                    chunk_size=chunk_size,
+                    precision=precision,
+                    precision_tolerance=precision_tolerance,
+                )
+
+            results = {name: fut.result() for name, fut in stages.items()}
+
+        point_bytes = results.get("positions", point_bytes)
+        _, _, total_anno_bytes = results["annotations"]
+        cont_traits, cont_bins, cont_obs_bytes = results.get(
+            "continuous", ({}, {}, 0)
         )
-        logger.info(
-            "vis: dispatched async send for updated continuous_config/continuous_bins ({} bytes)",
-            gene_bytes,
-        )
+        gene_traits, gene_bins, gene_bytes = results.get("genes", ({}, {}, 0))
+        # fresh dicts: add_* and remove_trait update them in place
+        cont_traits = {**cont_traits, **gene_traits}
+        cont_bins = {**cont_bins, **gene_bins}
+
+        # continuous obs and genes go out together, once
+        if cont_traits:
+            futures.append(
+                executor.submit(
+                    _async_set_trait_and_send,
+                    w,
+                    "continuous_config",
+                    cont_traits,
+                )
+            )
+            futures.append(
+                executor.submit(
+                    _async_send_buffers, w, "continuous_bins", cont_bins
+                )
+            )
+            logger.info(
+                "vis: dispatched async send for continuous_config and continuous_bins ({} bytes)",
+                cont_obs_bytes + gene_bytes,
+            )
 
-    # Optionally wait for all background sends to finish before returning
-    if _wait_for_all_sends:
+        # Optionally wait for all background sends to finish before returning
+        if _wait_for_all_sends:
+            logger.info(
+                "vis: waiting for {} background send tasks to complete",
+                len(futures),
+            )
+            for fut in as_completed(futures, timeout=None):
+                try:
+                    fut.result()
+                except Exception as e:
+                    logger.exception("vis: background send task raised: {}", e)
+            logger.info("vis: all background sends completed")
+
+        # add_* and remove_trait wait for these before sending deltas
+        w._pending_sends = futures
+
+        # shutdown executor but let running tasks finish (daemon threads not used)
+        executor.shutdown(wait=False)
+
+        total_time = _now() - start_total
+        total_bytes = (
+            point_bytes + total_anno_bytes + cont_obs_bytes + gene_bytes
+        )
         logger.info(
-            "vis: waiting for {} background send tasks to complete",
+            "vis: finished (dispatch phase) total_bytes={} total_time={:.3f}s background_tasks={}",
+            total_bytes,
+            total_time,
             len(futures),
         )
-        for fut in as_completed(futures, timeout=None):
-            try:
-                fut.result()
-            except Exception as e:
-                logger.exception("vis: background send task raised: {}", e)
-        logger.info("vis: all background sends completed")
-
-    # shutdown executor but let running tasks finish (daemon threads not used)
-    executor.shutdown(wait=False)
-
-    total_time = _now() - start_total
-    total_bytes = (
-        len(laz_bytes) + total_anno_bytes + cont_obs_bytes + gene_bytes
-    )
-    logger.info(
-        "vis: finished (dispatch phase) total_bytes={} total_time={:.3f}s background_tasks={}",
-        total_bytes,
-        total_time,
-        len(futures),
-    )
 
     return w
+
+
+def vis_file(
+    path,
+    position: str,
+    color: str,
+    section: str | None = None,
+    annotations: list[str] | None = None,
+    continuous: list[str] | None = None,
+    genes: list[str] | None = None,
+    layer: str | None = None,
+    **kwargs,
+):
+    """
+    Visualize an .h5ad file or .zarr store without loading it as AnnData.
+
+    Only ``obsm[position]``, the requested obs columns and ``var_names``
+    are read into memory. The expression matrix (``X`` or ``layer``) stays
+    on disk and only the requested genes are read from it, in row chunks
+    for CSR/dense storage and column by column for CSC. Reading .h5ad needs
+    h5py and reading .zarr needs zarr.
+
+    Parameters
+    ----------
+    path : str or Path
+        Path to an .h5ad file or a .zarr directory written by anndata.
+    position, color, section, annotations, continuous, genes, layer
+        As in ``vis``.
+    **kwargs
+        Any other ``vis`` argument (``height``, ``mode``, ``transport``,
+        ``chunk_size``, ...).
+
+    Returns
+    -------
+    SpatialVistaWidget
+        The configured widget ready for display. When genes can be fetched
+        on demand the widget keeps the store open.
+
+    Examples
+    --------
+    >>> import spatialvista as spv
+    >>> widget = spv.vis_file(
+    ...     "atlas.h5ad", position="spatial", color="region", genes=["Gad1"]
+    ... )
+    """
+    obs_keys = [
+        color,
+        section,
+        kwargs.get("stratify_by"),
+        *(annotations or []),
+        *(continuous or []),
+    ]
+    adata = read_subset(
+        path,
+        obsm=[position],
+        obs=[k for k in obs_keys if k is not None],
+        layer=layer,
+    )
+    if adata.X is None and layer is None:
+        # no expression matrix in the store
+        kwargs["on_demand_genes"] = False
+
+    return vis(
+        adata,
+        position=position,
+        color=color,
+        section=section,
+        annotations=annotations,
+        continuous=continuous,
+        genes=genes,
+        layer=layer,
+        **kwargs,
+    )
@@ -1,11 +1,44 @@
 # spatialvista/widget.py
+import threading
 import time
+from concurrent.futures import wait
 from pathlib import Path
 
 import anywidget
+import numpy as np
 import traitlets
 
 from ._logger import logger
+from .aggregate import VoxelAggregate
+from .cache import (
+    ByteLRUCache,
+    cached_call,
+    export_caches,
+    gene_export_source,
+)
+from .exporter import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_PRECISION_TOLERANCE,
+    _chunked_bounds,
+    _iter_coord_chunks,
+    export_annotations_blob,
+    export_continuous_gene_blob,
+    export_continuous_obs_blob,
+)
+from .layout import (
+    DEFAULT_LAYOUT_CACHE_BYTES,
+    LAYOUTS,
+    decode_trait,
+    export_layout,
+    histogram_layout,
+    treemap_layout,
+)
+from .metrics import MetricsCollector, collecting
+from .stats import annotation_groups
+from .transfer import ChunkedTransfer
+
+# Default byte budget for genes fetched on demand by the frontend
+DEFAULT_GENE_CACHE_BYTES = 256 * 1024 * 1024
 
 # Measure time to load the ESM JS file at import time
 _WIDGET_PATH = Path(__file__).parent / "_widget" / "spatialvista_widget.mjs"
@@ -30,11 +63,46 @@ except Exception as exc:
     )
 
 
+class Buffer(traitlets.TraitType):
+    """
+    Binary trait accepting any C-contiguous buffer (bytes, memoryview,
+    NumPy array) without copying it.
+
+    Values other than bytes are stored as flat byte memoryviews, which
+    ipywidgets sends as binary comm buffers as they are. ``traitlets.Bytes``
+    would require a bytes object, i.e. a full copy of every exported array.
+    """
+
+    default_value = b""
+    info_text = "a C-contiguous bytes-like object"
+
+    def validate(self, obj, value):
+        if isinstance(value, bytes):
+            return value
+        try:
+            view = memoryview(value)
+        except TypeError:
+            self.error(obj, value)
+        if not view.c_contiguous:
+            self.error(obj, value)
+        return view if view.format == "B" and view.ndim == 1 else view.cast("B")
+
+
 class SpatialVistaWidget(anywidget.AnyWidget):
     _esm = _WIDGET_JS
 
     # ========== Point cloud ==========
-    laz_bytes = traitlets.Bytes(help="LAZ point cloud bytes").tag(sync=True)
+    laz_bytes = Buffer(help="LAZ point cloud bytes").tag(sync=True)
+
+    position_config = traitlets.Dict(
+        key_trait=traitlets.Unicode(),
+        value_trait=traitlets.Any(),
+        help="Layout of position_bytes (transport, dtype, bounding box)",
+    ).tag(sync=True)
+
+    position_bytes = Buffer(
+        help="Uncompressed point positions (used instead of laz_bytes)"
+    ).tag(sync=True)
 
     # ========== Categorical annotations ==========
     annotation_config = traitlets.Dict(
@@ -45,7 +113,7 @@ class SpatialVistaWidget(anywidget.AnyWidget):
 
     annotation_bins = traitlets.Dict(
         key_trait=traitlets.Unicode(),
-        value_trait=traitlets.Bytes(),
+        value_trait=Buffer(),
         help="Annotation binary buffers",
     ).tag(sync=True)
 
@@ -58,10 +126,24 @@ class SpatialVistaWidget(anywidget.AnyWidget):
 
     continuous_bins = traitlets.Dict(
         key_trait=traitlets.Unicode(),
-        value_trait=traitlets.Bytes(),
+        value_trait=Buffer(),
         help="Continuous trait binary buffers (float32)",
     ).tag(sync=True)
 
+    # ========== Level-of-detail point cloud ==========
+    lod_config = traitlets.Dict(
+        key_trait=traitlets.Unicode(),
+        value_trait=traitlets.Any(),
+        help="LOD level layout (levels are streamed on request)",
+    ).tag(sync=True)
+
+    # ========== Chunked transfer (vis(transfer="chunked")) ==========
+    transfer_manifest = traitlets.Dict(
+        key_trait=traitlets.Unicode(),
+        value_trait=traitlets.Any(),
+        help="Buffers streamed as transfer_chunk messages (see transfer.py)",
+    ).tag(sync=True)
+
     # ========== Global config (frontend settings) ==========
     global_config = traitlets.Dict(
         key_trait=traitlets.Unicode(),
@@ -72,16 +154,682 @@ class SpatialVistaWidget(anywidget.AnyWidget):
     def __init__(self, *args, **kwargs):
         self._created_at = time.perf_counter()
         super().__init__(*args, **kwargs)
+        # stage timings, enabled by vis(metrics=True)
+        self._metrics = MetricsCollector(enabled=False)
+        # obs row (voxel with vis(aggregate=...)) index of every exported
+        # point (None means obs order)
+        self.obs_indices = None
+        # VoxelAggregate the points were drawn from, if any
+        self.voxels = None
+        self._lod_levels = []
+        # source for genes requested by the frontend (see _attach_gene_source)
+        self._gene_source = None
+        self._gene_cache = None
+        self._gene_list_requested = False
+        # set by _enable_chunked_transfer; None sends buffers via send_state
+        self._transfer = None
+        self._transfer_lock = threading.Lock()
+        # features announced by the frontend (see _handle_frontend_features)
+        self._frontend_features = set()
+        # data and export options of vis(), for add_* (see _attach_source)
+        self._source = None
+        self._pending_sends = []
+        # treemap/histogram layouts by (layout, annotation, trait)
+        self._layout_cache = ByteLRUCache(DEFAULT_LAYOUT_CACHE_BYTES)
+        self._layout_bounds = None
+        self._msg_handlers = {
+            "lod_request": self._handle_lod_request,
+            "gene_list_request": self._handle_gene_list_request,
+            "gene_request": self._handle_gene_request,
+            "layout_request": self._handle_layout_request,
+            "transfer_start": self._handle_transfer_start,
+            "transfer_ack": self._handle_transfer_ack,
+            "frontend_features": self._handle_frontend_features,
+        }
+        self.on_msg(self._on_custom_msg)
         logger.info("SpatialVistaWidget created at {:.6f}", self._created_at)
 
+    @property
+    def export_report(self) -> dict:
+        """
+        Timings and sizes of export and transfer stages.
+
+        Filled when the widget was created with ``vis(metrics=True)``; see
+        ``MetricsCollector.report`` for the layout. ``pd.DataFrame(
+        widget.export_report["spans"])`` gives one row per span.
+        """
+        return self._metrics.report()
+
+    @property
+    def transfer_progress(self) -> dict:
+        """
+        Acknowledged and total bytes per buffer of a chunked transfer.
+
+        Keys are buffer ids (``"laz_bytes"``, ``"annotation_bins/<key>"``,
+        ...); empty unless the widget was created with
+        ``vis(transfer="chunked")``.
+        """
+        if self._transfer is None:
+            return {}
+        return self._transfer.progress()
+
+    def cells(self, points) -> np.ndarray:
+        """
+        Obs row indices of the cells drawn as ``points``.
+
+        ``points`` are positions in the exported point order. Without
+        aggregation every point is one cell; with ``vis(aggregate="voxel")``
+        all cells of the points' voxels are returned, e.g. to drill down
+        with ``spv.vis(adata[widget.cells(points)], ...)``.
+        """
+        points = np.asarray(points)
+        rows = points if self.obs_indices is None else self.obs_indices[points]
+        if self.voxels is None:
+            return rows
+        return self.voxels.cells(rows)
+
+    def _enable_chunked_transfer(self, chunk_bytes: int, window: int):
+        """Send buffer traits through ``_publish_buffers`` from now on."""
+        self._transfer = ChunkedTransfer(
+            self.send, chunk_bytes, window, metrics=self._metrics
+        )
+
+    def _publish_buffers(self, trait_name: str, value):
+        """Stream a buffer trait in chunks and announce it in the manifest."""
+        with self._transfer_lock:
+            self._transfer.publish(trait_name, value)
+            self.transfer_manifest = self._transfer.manifest()
+            self.send_state("transfer_manifest")
+
+    def _handle_transfer_start(self, content, buffers):
+        if self._transfer is not None:
+            self._transfer.start()
+
+    def _handle_transfer_ack(self, content, buffers):
+        if self._transfer is not None:
+            self._transfer.ack(
+                content.get("id"),
+                content.get("version"),
+                content.get("seq"),
+            )
+
+    def _handle_frontend_features(self, content, buffers):
+        """
+        Record what the frontend supports; bundles that predate this message
+        announce nothing and get the fallbacks.
+        """
+        self._frontend_features.update(content.get("features", []))
+
+    def _on_custom_msg(self, widget, content, buffers):
+        """Dispatch custom messages from the frontend by their ``type``."""
+        if not isinstance(content, dict):
+            return
+        msg_type = content.get("type")
+        handler = self._msg_handlers.get(msg_type)
+        if handler is None:
+            logger.warning("Unknown custom message type: {}", msg_type)
+            return
+        try:
+            with (
+                collecting(self._metrics),
+                self._metrics.span(msg_type, "message"),
+            ):
+                handler(content, buffers)
+        except (LookupError, TypeError, ValueError) as e:
+            # malformed requests from the frontend; anything else reaches
+            # the comm manager, which logs it too
+            logger.exception(
+                "Error while handling custom message {}: {}", msg_type, e
+            )
+
+    def _attach_source(
+        self,
+        adata,
+        position=None,
+        indices=None,
+        layer=None,
+        gene_encoding: str = "dense",
+        chunk_size=None,
+        cache: bool = True,
+        precision=None,
+        precision_tolerance: float = DEFAULT_PRECISION_TOLERANCE,
+        binary_dictionaries: bool = False,
+    ):
+        """Remember what ``vis()`` exported from, for the ``add_*`` methods."""
+        self._source = {
+            "adata": adata,
+            "position": position,
+            "indices": indices,
+            "layer": layer,
+            "gene_encoding": gene_encoding,
+            "chunk_size": chunk_size,
+            "cache": cache,
+            "precision": precision,
+            "precision_tolerance": precision_tolerance,
+            "binary_dictionaries": binary_dictionaries,
+        }
+
+    def _require_source(self):
+        if self._source is None:
+            raise RuntimeError(
+                "This widget has no data source; create it with spv.vis()"
+            )
+        # let vis() finish its own sends so they do not overwrite the delta
+        wait(self._pending_sends)
+        src = self._source
+        return src, export_caches(src["cache"])
+
+    def add_genes(self, genes: list[str]) -> None:
+        """
+        Add gene expression traits to the displayed widget.
+
+        Only the new genes are exported (with the layer, encoding and point
+        order of the ``vis()`` call) and sent; the frontend merges them
+        into its continuous traits without reloading the point cloud.
+        Genes that are already present are skipped. With a widget bundle
+        that predates trait deltas the changed traits are synced in full
+        and show up when the widget is displayed again.
+        """
+        from .validation import validate_adata_key
+
+        src, caches = self._require_source()
+        adata = src["adata"]
+        for gene in genes:
+            validate_adata_key(adata, gene, "var")
+        genes = [
+            g
+            for g in dict.fromkeys(genes)
+            if f"Gene:{g}" not in self.continuous_config
+        ]
+        if not genes:
+            return
+        layer = src["layer"]
+        key_parts, gene_source = gene_export_source(adata, genes, layer)
+        groups = self._category_groups()
+        configs, bins = cached_call(
+            caches,
+            "genes",
+            (
+                *key_parts,
+                genes,
+                layer,
+                src["indices"],
+                src["gene_encoding"],
+                src["precision"],
+                src["precision_tolerance"],
+                {anno: codes for anno, (codes, _) in groups.items()},
+            ),
+            export_continuous_gene_blob,
+            gene_source,
+            genes,
+            layer=layer,
+            indices=src["indices"],
+            encoding=src["gene_encoding"],
+            chunk_size=src["chunk_size"],
+            precision=src["precision"],
+            tolerance=src["precision_tolerance"],
+            category_groups=groups,
+        )
+        self._send_delta("continuous", configs, bins)
+
+    def add_continuous(self, keys: list[str]) -> None:
+        """
+        Add continuous ``adata.obs`` columns to the displayed widget.
+
+        Only the new columns are exported and sent; columns that are already
+        present are skipped.
+        """
+        from .validation import validate_adata_key
+
+        src, caches = self._require_source()
+        adata = src["adata"]
+        for key in keys:
+            validate_adata_key(adata, key, "obs")
+        keys = [
+            k for k in dict.fromkeys(keys) if k not in self.continuous_config
+        ]
+        if not keys:
+            return
+        groups = self._category_groups()
+        configs, bins = cached_call(
+            caches,
+            "continuous_obs",
+            (
+                keys,
+                [adata.obs[k] for k in keys],
+                src["indices"],
+                src["precision"],
+                src["precision_tolerance"],
+                {anno: codes for anno, (codes, _) in groups.items()},
+            ),
+            export_continuous_obs_blob,
+            adata,
+            keys,
+            indices=src["indices"],
+            precision=src["precision"],
+            tolerance=src["precision_tolerance"],
+            category_groups=groups,
+        )
+        self._send_delta("continuous", configs, bins)
+
+    def add_annotations(self, keys: list[str]) -> None:
+        """
+        Add categorical ``adata.obs`` columns to the displayed widget.
+
+        Only the new annotations are exported and sent; annotations that are
+        already present are skipped.
+        """
+        from .validation import validate_adata_key
+
+        src, caches = self._require_source()
+        adata = src["adata"]
+        for key in keys:
+            validate_adata_key(adata, key, "obs")
+        if isinstance(adata, VoxelAggregate):
+            # vote on integer-coded labels instead of averaging them
+            adata.categorical.update(keys)
+        available = self.annotation_config.get("AvailableAnnoTypes", [])
+        keys = [k for k in dict.fromkeys(keys) if k not in available]
+        if not keys:
+            return
+        config, bins = cached_call(
+            caches,
+            "annotations",
+            (
+                keys,
+                [adata.obs[k] for k in keys],
+                src["indices"],
+                src["binary_dictionaries"],
+            ),
+            export_annotations_blob,
+            adata,
+            keys[0],
+            None,
+            keys[1:],
+            indices=src["indices"],
+            binary_dictionaries=src["binary_dictionaries"],
+        )
+        configs = {
+            "AnnoDtypes": config["AnnoDtypes"],
+            "AnnoMaps": config["AnnoMaps"],
+        }
+        self._send_delta("annotation", configs, bins)
+
+    def remove_trait(self, key: str, kind: str | None = None) -> None:
+        """
+        Remove an annotation or continuous trait from the displayed widget.
+
+        ``key`` is an annotation name, a continuous obs column or a gene
+        (``"Gene:<name>"`` or just the gene name). ``kind`` ("annotation",
+        "continuous" or "gene") is needed when ``key`` names more than one
+        of them. The coloring annotation and the section annotation cannot
+        be removed.
+        """
+        kinds = ("annotation", "continuous", "gene")
+        if kind is not None and kind not in kinds:
+            raise ValueError(
+                f"Invalid kind: {kind}. Valid kinds are: {', '.join(kinds)}"
+            )
+        self._require_source()
+        config = self.annotation_config
+        matches = {
+            "annotation": key in config.get("AvailableAnnoTypes", []),
+            "continuous": key in self.continuous_config
+            and not key.startswith("Gene:"),
+            "gene": (key if key.startswith("Gene:") else f"Gene:{key}")
+            in self.continuous_config,
+        }
+        found = [k for k in kinds if matches[k]]
+        if kind is None and len(found) > 1:
+            raise ValueError(
+                f"Trait '{key}' is shown as {' and '.join(found)}; pass kind= "
+                "to choose one"
+            )
+        if kind is None:
+            kind = found[0] if found else None
+        if kind is None or not matches[kind]:
+            raise KeyError(f"Trait '{key}' is not shown in this widget")
+
+        if kind == "annotation":
+            slice_key = self.global_config.get("GlobalConfig", {}).get(
+                "SliceKey"
+            )
+            if key in (config.get("DefaultAnnoType"), slice_key):
+                raise ValueError(
+                    f"Cannot remove '{key}': it is the coloring or section "
+                    "annotation"
+                )
+            removed = [key]
+            dict_key = config["AnnoMaps"].get(key, {}).get("Dictionary")
+            if dict_key is not None:
+                removed.append(dict_key)
+            self._send_delta("annotation", {}, {}, removed=removed)
+        elif kind == "continuous":
+            self._send_delta("continuous", {}, {}, removed=[key])
+        else:
+            gene_key = key if key.startswith("Gene:") else f"Gene:{key}"
+            self._send_delta("continuous", {}, {}, removed=[gene_key])
+
+    def _category_groups(self):
+        """``annotation_groups`` of the annotations shown now."""
+        return annotation_groups(
+            self.annotation_config, self._exported_bins("annotation_bins")
+        )
+
+    def _send_delta(self, kind, configs, bins, removed=()):
+        """
+        Merge new (or removed) traits into the widget state and send only
+        the change to the frontend.
+
+        The config and bins traits are updated in place, without a sync, so
+        views created later still receive the full state. Live views get a
+        ``traits_delta`` message carrying only the new buffers when the
+        frontend announced support for it, else the changed traits are
+        resent whole with ``send_state``; with the chunked transfer the
+        buffers go through it instead (already sent buffers are not resent).
+        """
+        t0 = time.perf_counter()
+        bins_trait = f"{kind}_bins"
+        if kind == "continuous":
+            config = self.continuous_config
+            config.update(configs)
+            for key in removed:
+                config.pop(key, None)
+        else:
+            # nested containers may be shared with cached exports: replace
+            # them rather than mutating
+            config = self.annotation_config
+            config["AvailableAnnoTypes"] = [
+                k
+                for k in config.get("AvailableAnnoTypes", [])
+                if k not in removed
+            ] + list(configs.get("AnnoDtypes", {}))
+            for name in ("AnnoDtypes", "AnnoMaps"):
+                config[name] = {
+                    k: v
+                    for k, v in config.get(name, {}).items()
+                    if k not in removed
+                }
+                config[name].update(configs.get(name, {}))
+
+        nbytes = sum(len(b) for b in bins.values())
+        content = {
+            "type": "traits_delta",
+            "kind": kind,
+            "configs": configs,
+            "removed": list(removed),
+        }
+        if self._transfer is None:
+            current = getattr(self, bins_trait)
+            current.update(bins)
+            for key in removed:
+                current.pop(key, None)
+            if "traits_delta" in self._frontend_features:
+                with self._metrics.span(
+                    f"{kind}_delta", "send", nbytes=nbytes
+                ):
+                    self.send(
+                        {**content, "keys": list(bins)},
+                        buffers=list(bins.values()),
+                    )
+            else:
+                # the traits were edited in place, which does not sync them
+                nbytes = sum(len(b) for b in current.values())
+                with self._metrics.span(
+                    f"{kind}_delta", "send", nbytes=nbytes
+                ):
+                    self.send_state([bins_trait, f"{kind}_config"])
+        else:
+            current = dict(self._transfer.published(bins_trait) or {})
+            current.update(bins)
+            for key in removed:
+                current.pop(key, None)
+            self.send({**content, "keys": []})
+            self._publish_buffers(bins_trait, current)
+
+        logger.info(
+            "SpatialVistaWidget sent {} delta: added={} removed={} ({} bytes) in {:.3f}s",
+            kind,
+            list(bins),
+            list(removed),
+            nbytes,
+            time.perf_counter() - t0,
+        )
+
+    def _attach_gene_source(
+        self,
+        adata,
+        layer=None,
+        indices=None,
+        encoding: str = "dense",
+        cache_bytes: int = DEFAULT_GENE_CACHE_BYTES,
+        chunk_size=None,
+        precision=None,
+        precision_tolerance: float = DEFAULT_PRECISION_TOLERANCE,
+    ):
+        """
+        Serve gene expression requested by the frontend from ``adata``.
+
+        Exported genes are kept in an LRU cache bounded by ``cache_bytes``.
+        """
+        self._gene_source = {
+            "adata": adata,
+            "layer": layer,
+            "indices": indices,
+            "encoding": encoding,
+            "chunk_size": chunk_size,
+            "precision": precision,
+            "precision_tolerance": precision_tolerance,
+        }
+        self._gene_cache = ByteLRUCache(cache_bytes)
+        # answer a list request that arrived before the source was attached
+        if self._gene_list_requested:
+            self._handle_gene_list_request({}, [])
+
+    def _handle_gene_list_request(self, content, buffers):
+        if self._gene_source is None:
+            self._gene_list_requested = True
+            return
+        var_names = self._gene_source["adata"].var_names
+        self.send({"type": "gene_list", "genes": [str(g) for g in var_names]})
+
+    def _fetch_gene(self, gene):
+        """Export ``gene`` from the gene source, through the LRU cache."""
+        cached = self._gene_cache.get(gene)
+        if cached is None:
+            traits, bins = export_continuous_gene_blob(
+                self._gene_source["adata"],
+                [gene],
+                layer=self._gene_source["layer"],
+                indices=self._gene_source["indices"],
+                encoding=self._gene_source["encoding"],
+                chunk_size=self._gene_source["chunk_size"],
+                precision=self._gene_source["precision"],
+                tolerance=self._gene_source["precision_tolerance"],
+                category_groups=self._category_groups(),
+            )
+            (key,) = traits
+            cached = (key, traits[key], bins[key])
+            self._gene_cache.put(gene, cached, nbytes=len(bins[key]))
+        return cached
+
+    def _handle_gene_request(self, content, buffers):
+        gene = content.get("gene")
+        if self._gene_source is None:
+            self.send(
+                {
+                    "type": "gene_error",
+                    "gene": gene,
+                    "error": "On-demand genes are not enabled for this widget",
+                }
+            )
+            return
+
+        t0 = time.perf_counter()
+        try:
+            key, config, data = self._fetch_gene(gene)
+        except KeyError as e:
+            self.send({"type": "gene_error", "gene": gene, "error": e.args[0]})
+            return
+
+        with self._metrics.span(f"gene:{gene}", "send", nbytes=len(data)):
+            self.send(
+                {"type": "gene", "gene": gene, "key": key, "config": config},
+                buffers=[data],
+            )
+        logger.info(
+            "SpatialVistaWidget served gene {} ({} bytes, cache {} genes / {} bytes) in {:.3f}s",
+            gene,
+            len(data),
+            len(self._gene_cache),
+            self._gene_cache.nbytes,
+            time.perf_counter() - t0,
+        )
+
+    def _handle_lod_request(self, content, buffers):
+        """Stream LOD levels, coarse first, to the requesting view."""
+        t0 = time.perf_counter()
+        n_levels = len(self._lod_levels)
+        for level, data in enumerate(self._lod_levels):
+            with self._metrics.span(
+                f"lod:level{level}", "send", nbytes=len(data)
+            ):
+                self.send(
+                    {"type": "lod_level", "level": level, "levels": n_levels},
+                    buffers=[data],
+                )
+        logger.info(
+            "SpatialVistaWidget streamed {} LOD levels ({} bytes) in {:.3f}s",
+            n_levels,
+            sum(len(b) for b in self._lod_levels),
+            time.perf_counter() - t0,
+        )
+
+    def _exported_bins(self, trait_name: str) -> dict:
+        """Buffers of a dict trait, also when they went through a transfer."""
+        if self._transfer is None:
+            return getattr(self, trait_name)
+        return self._transfer.published(trait_name) or {}
+
+    def _layout_trait(self, trait):
+        """Config and buffer of a shown continuous trait or gene."""
+        if trait in self.continuous_config:
+            bins = self._exported_bins("continuous_bins")
+            return self.continuous_config[trait], bins[trait]
+        if trait.startswith("Gene:") and self._gene_source is not None:
+            _, config, data = self._fetch_gene(trait[len("Gene:") :])
+            return config, data
+        raise KeyError(f"Trait '{trait}' is not shown in this widget")
+
+    def _layout_bounds_xy(self):
+        """x, y bounding box of the exported points (computed once)."""
+        if self._layout_bounds is None:
+            src, _ = self._require_source()
+            mins, maxs = _chunked_bounds(
+                _iter_coord_chunks(
+                    src["adata"],
+                    src["position"],
+                    src["chunk_size"] or DEFAULT_CHUNK_SIZE,
+                    indices=src["indices"],
+                )
+            )
+            self._layout_bounds = (tuple(mins[:2]), tuple(maxs[:2]))
+        return self._layout_bounds
+
+    def layout(self, layout: str, annotation: str, trait: str | None = None):
+        """
+        Treemap or histogram positions of the points, as sent to the
+        frontend (see ``spatialvista.layout``).
+
+        ``layout`` is "treemap" (points grouped by ``annotation``) or
+        "histogram" (the values of the continuous trait or gene ``trait``,
+        e.g. ``"Gene:Gad1"``, per category of ``annotation``). Results are
+        cached per (layout, annotation, trait).
+
+        Returns:
+          config: dict (DType, Scale, Offset, PointCount)
+          data: memoryview of uint16 x, y grid coordinates
+        """
+        if layout not in LAYOUTS:
+            raise ValueError(
+                f"Invalid layout: {layout}. Valid layouts are: {', '.join(LAYOUTS)}"
+            )
+        if layout == "histogram" and trait is None:
+            raise ValueError("The histogram layout needs a trait")
+        if layout == "treemap":
+            trait = None
+        key = (layout, annotation, trait)
+        cached = self._layout_cache.get(key)
+        if cached is not None:
+            return cached
+
+        bounds = self._layout_bounds_xy()
+        dtype = self.annotation_config.get("AnnoDtypes", {}).get(annotation)
+        if dtype is None:
+            raise KeyError(
+                f"Annotation '{annotation}' is not shown in this widget"
+            )
+        codes = np.frombuffer(
+            self._exported_bins("annotation_bins")[annotation], dtype=dtype
+        )
+        with self._metrics.span(f"layout:{layout}", "layout") as sp:
+            if layout == "treemap":
+                xy = treemap_layout(codes, bounds)
+            else:
+                config, data = self._layout_trait(trait)
+                # as the frontend does: the trait range, unless Max is 0
+                value_range = (
+                    (config["Min"], config["Max"])
+                    if config.get("Max")
+                    else (0.0, 1.0)
+                )
+                xy = histogram_layout(
+                    codes, decode_trait(config, data), value_range, bounds
+                )
+            result = export_layout(xy)
+            sp.set(nbytes=len(result[1]))
+        self._layout_cache.put(key, result, nbytes=len(result[1]))
+        return result
+
+    def _handle_layout_request(self, content, buffers):
+        t0 = time.perf_counter()
+        reply = {
+            "layout": content.get("layout"),
+            "annotation": content.get("annotation"),
+            "trait": content.get("trait"),
+        }
+        try:
+            config, data = self.layout(**reply)
+        except (KeyError, ValueError, RuntimeError) as e:
+            self.send({"type": "layout_error", **reply, "error": e.args[0]})
+            return
+        with self._metrics.span(
+            f"layout:{reply['layout']}", "send", nbytes=len(data)
+        ):
+            self.send(
+                {"type": "layout", **reply, "config": config}, buffers=[data]
+            )
+        logger.info(
+            "SpatialVistaWidget served {} layout of {} / {} ({} bytes) in {:.3f}s",
+            reply["layout"],
+            reply["annotation"],
+            reply["trait"],
+            len(data),
+            time.perf_counter() - t0,
+        )
+
     # Generic observer for several traits
     @traitlets.observe(
         "laz_bytes",
+        "position_bytes",
         "annotation_bins",
         "annotation_config",
         "continuous_bins",
         "continuous_config",
         "global_config",
+        "lod_config",
+        "position_config",
+        "transfer_manifest",
     )
     def _on_trait_change(self, change):
         """
@@ -93,7 +841,7 @@ class SpatialVistaWidget(anywidget.AnyWidget):
         new = change.get("new")
 
         try:
-            if name == "laz_bytes":
+            if name in ("laz_bytes", "position_bytes"):
                 size = len(new) if new is not None else 0
                 info = {"bytes": size}
             elif name in ("annotation_bins", "continuous_bins"):
@@ -105,7 +853,13 @@ class SpatialVistaWidget(anywidget.AnyWidget):
                     # values are bytes
                     total_bytes = sum(len(v) for v in new.values())
                 info = {"bins": count, "bytes": total_bytes}
-            elif name in ("annotation_config", "continuous_config"):
+            elif name in (
+                "annotation_config",
+                "continuous_config",
+                "lod_config",
+                "position_config",
+                "transfer_manifest",
+            ):
                 if new is None:
                     count = 0
                 else:
@@ -0,0 +1,256 @@
+import gc
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import spatialvista as spv
+from spatialvista import cache as cache_module
+from spatialvista.cache import (
+    ByteLRUCache,
+    DiskCache,
+    ExportCaches,
+    MemoryCache,
+    cached_call,
+    content_hash,
+)
+from spatialvista.exporter import EXPORTER_VERSION
+
+
+def test_lru_hit_and_miss():
+    cache = ByteLRUCache(max_bytes=100)
+    cache.put("a", b"x" * 10)
+
+    assert cache.get("a") == b"x" * 10
+    assert cache.get("b") is None
+    assert cache.get("b", "miss") == "miss"
+    assert "a" in cache
+    assert cache.nbytes == 10
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ByteLRUCache(max_bytes=30)
+    cache.put("a", b"a" * 10)
+    cache.put("b", b"b" * 10)
+    cache.put("c", b"c" * 10)
+    cache.get("a")  # "b" is now the least recently used
+    cache.put("d", b"d" * 10)
+
+    assert "b" not in cache
+    assert [k for k, _ in cache.items()] == ["c", "a", "d"]
+    assert cache.nbytes == 30
+
+
+def test_lru_counts_array_bytes():
+    cache = ByteLRUCache(max_bytes=100)
+    cache.put("a", np.zeros(10, dtype=np.float32))
+    cache.put("b", {"x": b"12345", "y": np.zeros(2, dtype=np.uint8)})
+
+    assert cache.nbytes == 40 + 7
+
+
+def test_lru_skips_entries_larger_than_budget():
+    cache = ByteLRUCache(max_bytes=10)
+    cache.put("a", b"a" * 5)
+    cache.put("big", b"b" * 11)
+
+    assert "big" not in cache
+    assert "a" in cache
+
+
+def test_lru_replace_and_pop_update_size():
+    cache = ByteLRUCache(max_bytes=100)
+    cache.put("a", b"a" * 10)
+    cache.put("a", b"a" * 20)
+    assert cache.nbytes == 20
+
+    assert cache.pop("a") == b"a" * 20
+    assert cache.pop("a") is None
+    assert cache.nbytes == 0
+    assert len(cache) == 0
+
+
+def test_disk_cache_round_trip(tmp_path):
+    cache = DiskCache(tmp_path)
+    value = (
+        {"Gene:a": {"Min": 0.0, "Max": 2.5}, 3: None},
+        {"Gene:a": memoryview(b"\x01\x02\x03")},
+        np.arange(4, dtype=np.float32),
+    )
+    cache.put("k", value)
+
+    config, bins, arr = cache.get("k")
+    assert config == value[0]
+    assert bytes(bins["Gene:a"]) == b"\x01\x02\x03"
+    np.testing.assert_array_equal(arr, value[2])
+    assert arr.dtype == np.float32
+
+
+def test_disk_cache_miss_and_unreadable_entry(tmp_path):
+    cache = DiskCache(tmp_path)
+    assert cache.get("missing") is None
+    assert cache.get("missing", "miss") == "miss"
+
+    (tmp_path / "bad.npz").write_bytes(b"not an npz file")
+    assert cache.get("bad") is None
+    assert not (tmp_path / "bad.npz").exists()
+
+
+def test_disk_cache_skips_object_arrays(tmp_path):
+    cache = DiskCache(tmp_path)
+    cache.put("k", np.array(["a", None], dtype=object))
+
+    assert cache.get("k") is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=10**9)
+    for i, key in enumerate(["old", "used", "new"]):
+        cache.put(key, np.zeros(1000, dtype=np.uint8))
+        os.utime(tmp_path / f"{key}.npz", (i, i))
+    cache.get("used")  # marks it as recently used
+    entry_bytes = (tmp_path / "new.npz").stat().st_size
+
+    cache.max_bytes = 2 * entry_bytes
+    cache.evict()
+
+    assert cache.get("old") is None
+    assert cache.get("used") is not None
+    assert cache.get("new") is not None
+
+
+def test_content_hash_follows_content():
+    a = np.arange(10)
+    assert content_hash(a, "x") == content_hash(a.copy(), "x")
+    assert content_hash(a, "x") != content_hash(a, "y")
+    b = a.copy()
+    b[3] = -1
+    assert content_hash(a) != content_hash(b)
+    assert content_hash(pd.Series(["a", "b"])) != content_hash(
+        pd.Series(["a", "c"])
+    )
+
+
+def test_cached_call_hits_disk_cache(tmp_path):
+    cache = DiskCache(tmp_path)
+    calls = []
+
+    def export(values):
+        calls.append(1)
+        return {"sum": float(values.sum())}
+
+    values = np.arange(5.0)
+    first = cached_call(cache, "test", (values,), export, values)
+    second = cached_call(cache, "test", (values.copy(),), export, values)
+    changed = values + 1
+    third = cached_call(cache, "test", (changed,), export, changed)
+
+    assert first == second == {"sum": 10.0}
+    assert third == {"sum": 15.0}
+    assert len(calls) == 2
+
+
+@pytest.fixture
+def by_identity(monkeypatch):
+    """Key every array by identity, as the memory cache does for large ones."""
+    monkeypatch.setattr(cache_module, "_FINGERPRINT_FULL_BYTES", 0)
+
+
+def memory_call(memory, values, calls):
+    def export(values):
+        calls.append(1)
+        return np.asarray(values) * 2
+
+    return cached_call(
+        ExportCaches(memory=memory), "test", (values,), export, values
+    )
+
+
+def test_memory_cache_hit_and_miss(by_identity):
+    memory = MemoryCache()
+    calls = []
+    values = np.arange(10.0)
+
+    first = memory_call(memory, values, calls)
+    second = memory_call(memory, values, calls)
+    memory_call(memory, values.copy(), calls)  # another array: a miss
+
+    assert second is first
+    assert len(calls) == 2
+    assert len(memory) == 2
+
+
+def test_memory_cache_keys_small_arrays_by_content():
+    memory = MemoryCache()
+    calls = []
+    values = np.arange(10.0)
+
+    memory_call(memory, values, calls)
+    memory_call(memory, values.copy(), calls)
+    values[0] = 5.0
+    memory_call(memory, values, calls)
+
+    assert len(calls) == 2
+
+
+def test_memory_cache_invalidate_after_in_place_edit(by_identity):
+    memory = MemoryCache()
+    calls = []
+    values = np.arange(1000.0)
+    other = np.arange(5.0)
+    memory_call(memory, values, calls)
+    memory_call(memory, other, calls)
+
+    values[1] = -1.0  # not in the sampled values: still a hit
+    memory_call(memory, values, calls)
+    assert len(calls) == 2
+
+    assert memory.invalidate(values) == 1
+    assert memory_call(memory, values, calls)[1] == -2.0
+    memory_call(memory, other, calls)
+    assert len(calls) == 3
+
+
+def test_memory_cache_invalidate_anndata_like(by_identity):
+    memory = MemoryCache()
+    calls = []
+    obs = pd.DataFrame({"score": np.arange(100.0)})
+    memory_call(memory, obs["score"], calls)
+
+    assert memory.invalidate(obs) == 1
+    memory_call(memory, obs["score"], calls)
+    assert len(calls) == 2
+
+
+def test_memory_cache_drops_entries_of_freed_sources(by_identity):
+    memory = MemoryCache()
+    calls = []
+    values = np.arange(10.0)
+    memory_call(memory, values, calls)
+    key, _ = memory.key(f"test:{EXPORTER_VERSION}", (values,))
+
+    del values
+    gc.collect()
+
+    assert memory.get(key) is None
+    assert len(memory) == 0
+
+
+def test_memory_cache_evicts_beyond_budget(by_identity):
+    memory = MemoryCache(max_bytes=200)
+    calls = []
+    a, b = np.arange(10.0), np.arange(10.0)
+    memory_call(memory, a, calls)
+    memory_call(memory, b, calls)
+    memory_call(memory, np.arange(10.0), calls)
+
+    assert memory.nbytes <= 200
+    memory_call(memory, a, calls)
+    assert len(calls) == 4
+
+
+def test_invalidate_cache_is_exported():
+    assert spv.invalidate_cache is cache_module.invalidate_cache
+    spv.invalidate_cache(pd.DataFrame({"a": [1.0]}))
@@ -0,0 +1,219 @@
+import anndata as ad
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+
+from spatialvista.exporter import (
+    _encode_gene_column,
+    _encode_values,
+    export_continuous_gene_blob,
+    export_continuous_obs_blob,
+)
+
+
+def decode_values(raw, meta):
+    """Encoded values as the frontend decodes them."""
+    dtype = np.dtype(meta["DType"])
+    codes = np.frombuffer(raw, dtype=dtype.newbyteorder("<"))
+    quantization = meta.get("Quantization")
+    if quantization is None:
+        return codes.astype(np.float64)
+    values = quantization["Offset"] + codes * quantization["Scale"]
+    if quantization["Log"]:
+        values = np.expm1(values)
+    values[codes == np.iinfo(dtype).max] = np.nan
+    return values
+
+
+def decode_gene(data, meta):
+    """Gene column as the frontend decodes it."""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if meta["Encoding"] == "dense":
+        return decode_values(raw, meta)
+    nnz = meta["NNZ"]
+    index_dtype = np.dtype(meta["IndexDType"])
+    index_bytes = nnz * index_dtype.itemsize
+    rows = np.cumsum(raw[:index_bytes].view(index_dtype).astype(np.int64))
+    column = np.zeros(meta["Length"])
+    column[rows] = decode_values(raw[index_bytes:], meta)
+    return column
+
+
+def test_sparse_gene_round_trip():
+    rows = np.array([0, 3, 4, 9])
+    values = np.array([1.5, 2.0, 0.25, 8.0])
+
+    data, meta, minmax, (stored, decoded) = _encode_gene_column(
+        rows, values, 10, encoding="sparse"
+    )
+
+    assert meta["Encoding"] == "sparse"
+    assert meta["NNZ"] == 4
+    assert meta["IndexDType"] == "uint16"
+    expected = np.zeros(10)
+    expected[rows] = values
+    np.testing.assert_array_equal(decode_gene(data, meta), expected)
+    np.testing.assert_array_equal(stored, rows)
+    np.testing.assert_array_equal(decoded, values)
+    assert minmax == (0.0, 8.0)
+
+
+def test_sparse_gene_wide_gaps_use_uint32_indices():
+    rows = np.array([1, 70_000])
+    values = np.array([1.0, 2.0])
+
+    data, meta, _, _ = _encode_gene_column(
+        rows, values, 70_001, encoding="sparse"
+    )
+
+    assert meta["IndexDType"] == "uint32"
+    column = decode_gene(data, meta)
+    assert column[1] == 1.0
+    assert column[70_000] == 2.0
+    assert np.count_nonzero(column) == 2
+
+
+def test_sparse_gene_from_dense_values():
+    values = np.array([0.0, 3.0, 0.0, 0.0, 1.0])
+
+    data, meta, _, (stored, _) = _encode_gene_column(
+        None, values, 5, encoding="sparse"
+    )
+
+    np.testing.assert_array_equal(stored, [1, 4])
+    np.testing.assert_array_equal(decode_gene(data, meta), values)
+
+
+@pytest.mark.parametrize(("nnz", "expected"), [(5, "sparse"), (900, "dense")])
+def test_auto_encoding_picks_smaller_layout(nnz, expected):
+    rows = np.arange(nnz)
+    values = np.ones(nnz)
+
+    data, meta, _, _ = _encode_gene_column(rows, values, 1000, encoding="auto")
+
+    assert meta["Encoding"] == expected
+    column = decode_gene(data, meta)
+    assert column[:nnz].sum() == nnz
+    assert not column[nnz:].any()
+
+
+def test_dense_gene_from_sparse_source_matches_dense_export():
+    rng = np.random.default_rng(0)
+    dense = rng.random((50, 3)) * (rng.random((50, 3)) < 0.3)
+    genes = ["g0", "g1", "g2"]
+
+    def export(X):
+        adata = ad.AnnData(X=X, var=pd.DataFrame(index=genes))
+        return export_continuous_gene_blob(adata, genes)
+
+    csr_traits, csr_bins = export(sp.csr_matrix(dense))
+    dense_traits, dense_bins = export(dense)
+
+    for key in dense_bins:
+        assert bytes(csr_bins[key]) == bytes(dense_bins[key])
+    assert csr_traits == dense_traits
+
+
+@pytest.mark.parametrize(
+    ("precision", "dtype", "max_error"),
+    [
+        ("float32", "float32", 1e-4),
+        ("float16", "float16", 0.25),
+        ("uint16", "uint16", 0.008),
+        ("uint8", "uint8", 2.0),
+        ("log-uint16", "uint16", 0.05),
+        ("log-uint8", "uint8", 15.0),
+    ],
+)
+def test_precision_round_trip(precision, dtype, max_error):
+    values = np.linspace(0.0, 1000.0, 257)
+    values[7] = np.nan
+
+    encoded, meta, decoded = _encode_values(values, precision)
+
+    assert meta["DType"] == dtype
+    assert encoded.dtype == np.dtype(dtype)
+    frontend = decode_values(encoded.tobytes(), meta)
+    np.testing.assert_allclose(frontend, decoded, rtol=1e-6, equal_nan=True)
+    assert np.isnan(decoded[7])
+    error = np.abs(np.delete(decoded, 7) - np.delete(values, 7))
+    assert error.max() <= max_error
+
+
+def test_auto_precision_respects_tolerance():
+    # integer counts up to 254 fit uint8 exactly
+    values = np.arange(255, dtype=np.float64)
+    _, meta, decoded = _encode_values(values, "auto", tolerance=1e-3)
+    assert meta["DType"] == "uint8"
+    np.testing.assert_array_equal(decoded, values)
+
+    values = np.arange(256, dtype=np.float64)
+    _, meta, _ = _encode_values(values, "auto", tolerance=1e-3)
+    assert meta["DType"] == "uint16"
+
+    values = np.random.default_rng(0).random(10_000)
+    _, meta, decoded = _encode_values(values, "auto", tolerance=1e-6)
+    assert meta["DType"] == "float32"
+    assert np.abs(decoded - values).max() <= 1e-6
+
+
+def test_log_precision_needs_non_negative_values():
+    with pytest.raises(ValueError, match="non-negative"):
+        _encode_values(np.array([-1.0, 2.0]), "log-uint8")
+
+
+def test_invalid_precision():
+    with pytest.raises(ValueError, match="Invalid precision"):
+        _encode_values(np.array([1.0]), "int8")
+
+
+def test_float16_overflow_falls_back_to_float32():
+    values = np.array([1.0, 70_000.0, np.nan])
+
+    encoded, meta, decoded = _encode_values(values, "float16")
+
+    assert meta["DType"] == "float32"
+    assert encoded.dtype == np.float32
+    assert decoded[1] == 70_000.0
+    assert np.isfinite(decoded[:2]).all()
+
+
+def test_float16_within_range_stays_float16():
+    encoded, meta, _ = _encode_values(np.array([-60_000.0, np.inf]), "float16")
+
+    assert meta["DType"] == "float16"
+    assert encoded.dtype == np.float16
+
+
+def test_obs_precision_by_column():
+    obs = pd.DataFrame(
+        {"a": np.linspace(0, 1, 100), "b": np.arange(100.0)},
+        index=[str(i) for i in range(100)],
+    )
+    adata = ad.AnnData(obs=obs)
+
+    traits, bins = export_continuous_obs_blob(
+        adata, ["a", "b"], precision={"b": "uint8"}
+    )
+
+    assert traits["a"]["DType"] == "float32"
+    assert traits["b"]["DType"] == "uint8"
+    assert len(bins["b"]) == 100
+    np.testing.assert_allclose(
+        decode_values(bins["b"], traits["b"]), obs["b"], atol=99 / 254
+    )
+    assert traits["b"]["Max"] == pytest.approx(99.0)
+
+
+def test_overflowing_gene_stats_come_from_sent_values():
+    X = np.array([[0.0], [1.0], [100_000.0]], dtype=np.float32)
+    adata = ad.AnnData(X=X, var=pd.DataFrame(index=["g"]))
+
+    traits, bins = export_continuous_gene_blob(adata, ["g"])
+
+    assert traits["Gene:g"]["DType"] == "float32"
+    np.testing.assert_array_equal(
+        decode_gene(bins["Gene:g"], traits["Gene:g"]), X[:, 0]
+    )
+    assert traits["Gene:g"]["Max"] == 100_000.0
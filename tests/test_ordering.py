@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from spatialvista.ordering import (
+    _hilbert_transpose,
+    _interleave,
+    curve_codes,
+    curve_order,
+)
+
+
+def grid_cells(dims, bits):
+    axes = np.meshgrid(*[np.arange(1 << bits)] * dims, indexing="ij")
+    return np.column_stack([a.ravel() for a in axes]).astype(np.uint64)
+
+
+def morton_reference(cell, bits):
+    code = 0
+    for b in range(bits - 1, -1, -1):
+        for x in cell:
+            code = (code << 1) | ((int(x) >> b) & 1)
+    return code
+
+
+@pytest.mark.parametrize("dims", [2, 3])
+def test_morton_interleaves_bits(dims):
+    grid = grid_cells(dims, 3)
+
+    codes = _interleave(grid)
+
+    expected = [morton_reference(cell, 3) for cell in grid]
+    np.testing.assert_array_equal(codes, expected)
+
+
+@pytest.mark.parametrize(("dims", "bits"), [(2, 4), (3, 3)])
+def test_hilbert_visits_every_cell_in_unit_steps(dims, bits):
+    grid = grid_cells(dims, bits)
+
+    codes = _interleave(_hilbert_transpose(grid, bits))
+
+    assert sorted(codes) == list(range(len(grid)))
+    path = grid[np.argsort(codes)].astype(np.int64)
+    steps = np.abs(np.diff(path, axis=0)).sum(axis=1)
+    assert np.all(steps == 1)
+
+
+def test_morton_order_of_unit_square():
+    coords = np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+
+    order = np.argsort(curve_codes(coords, "morton"))
+
+    np.testing.assert_array_equal(order, [0, 2, 1, 3])
+
+
+@pytest.mark.parametrize("curve", ["morton", "hilbert"])
+def test_curve_order_keeps_neighbours_close(curve):
+    rng = np.random.default_rng(0)
+    coords = rng.random((5_000, 3))
+    adata = SimpleNamespace(obsm={"spatial": coords})
+
+    order = curve_order(adata, "spatial", curve)
+
+    assert sorted(order) == list(range(5_000))
+    jumps = np.linalg.norm(np.diff(coords[order], axis=0), axis=1)
+    random_jumps = np.linalg.norm(np.diff(coords, axis=0), axis=1)
+    assert np.median(jumps) < np.median(random_jumps) / 5
+
+
+def test_curve_order_maps_indices_back_to_obs_rows():
+    coords = np.array([[3.0, 0.0], [0.0, 0.0], [2.0, 0.0], [1.0, 0.0]])
+    adata = SimpleNamespace(obsm={"spatial": coords})
+
+    order = curve_order(
+        adata, "spatial", "hilbert", indices=np.array([0, 2, 3])
+    )
+
+    np.testing.assert_array_equal(order, [3, 2, 0])
+
+
+def test_curve_order_is_stable_for_equal_positions():
+    coords = np.array([[1.0, 1.0, 0.0], [0.0, 0.0, 0.0], [1.0, 1.0, 0.0]])
+    adata = SimpleNamespace(obsm={"spatial": coords})
+
+    order = curve_order(adata, "spatial", "morton")
+
+    np.testing.assert_array_equal(order, [1, 0, 2])
+
+
+def test_curve_order_ignores_z_in_2d_mode():
+    coords = np.array([[0.0, 0.0, 1.0], [0.0, 1.0, 0.0], [0.0, 0.0, 0.0]])
+    adata = SimpleNamespace(obsm={"spatial": coords})
+
+    order_3d = curve_order(adata, "spatial", "morton")
+    order_2d = curve_order(adata, "spatial", "morton", mode="2D")
+
+    np.testing.assert_array_equal(order_3d, [2, 0, 1])
+    np.testing.assert_array_equal(order_2d, [0, 2, 1])
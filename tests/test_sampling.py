@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from spatialvista.sampling import _category_quotas, sample_points
+
+
+def make_adata(sizes):
+    labels = np.repeat([f"c{i}" for i in range(len(sizes))], sizes)
+    labels = np.random.default_rng(1).permutation(labels)
+    return SimpleNamespace(obs=pd.DataFrame({"celltype": labels}))
+
+
+def test_quotas_keep_minimum_then_share_by_size():
+    quotas = _category_quotas([10_000, 1_000, 50, 5], 1_000, 100)
+
+    assert quotas.sum() == 1_000
+    assert quotas[2] == 50  # all of a category below the minimum
+    assert quotas[3] == 5
+    assert quotas[1] >= 100
+    # the rest is proportional to the cells left after the minimum
+    assert quotas[0] > 9 * (quotas[1] - 100)
+
+
+def test_quotas_shrink_minimum_to_fit_budget():
+    quotas = _category_quotas([500, 500, 500, 500], 200, 100)
+
+    np.testing.assert_array_equal(quotas, [50, 50, 50, 50])
+
+
+def test_stratified_sample_keeps_rare_categories():
+    adata = make_adata([20_000, 30])
+
+    indices = sample_points(
+        adata, 1_000, stratify_by="celltype", min_per_category=100
+    )
+
+    kept = adata.obs["celltype"].to_numpy()[indices]
+    assert len(indices) == 1_000
+    assert (kept == "c1").sum() == 30
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_missing_values_form_a_category():
+    adata = make_adata([5_000, 40])
+    adata.obs.loc[adata.obs["celltype"] == "c1", "celltype"] = None
+
+    indices = sample_points(adata, 500, stratify_by="celltype")
+
+    assert adata.obs["celltype"].iloc[indices].isna().sum() == 40
+
+
+@pytest.mark.parametrize("stratify_by", [None, "celltype"])
+def test_sample_is_deterministic_for_a_seed(stratify_by):
+    adata = make_adata([3_000, 200])
+
+    a = sample_points(adata, 400, stratify_by=stratify_by, seed=3)
+    b = sample_points(adata, 400, stratify_by=stratify_by, seed=3)
+    c = sample_points(adata, 400, stratify_by=stratify_by, seed=4)
+
+    np.testing.assert_array_equal(a, b)
+    assert not np.array_equal(a, c)
+    assert len(a) == 400
+
+
+def test_no_sample_when_data_fits_budget():
+    assert sample_points(make_adata([10, 5]), 15) is None
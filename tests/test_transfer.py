@@ -0,0 +1,133 @@
+from spatialvista.transfer import ChunkedTransfer
+
+
+class Frontend:
+    """Records the chunks sent and assembles them like the frontend."""
+
+    def __init__(self):
+        # unacknowledged chunks, and every message ever sent
+        self.sent = []
+        self.log = []
+
+    def send(self, content, buffers):
+        self.sent.append((content, bytes(buffers[0])))
+        self.log.append(content)
+
+    def ack_all(self, transfer):
+        while self.sent:
+            content, _ = self.sent[0]
+            self.ack(transfer, content)
+
+    def ack(self, transfer, content):
+        self.sent = [m for m in self.sent if m[0] is not content]
+        transfer.ack(content["id"], content["version"], content["seq"])
+
+
+def make(chunk_bytes=4, window=2):
+    frontend = Frontend()
+    return ChunkedTransfer(frontend.send, chunk_bytes, window), frontend
+
+
+def test_nothing_is_sent_before_start():
+    transfer, frontend = make()
+    transfer.publish("points", b"0123456789")
+
+    assert frontend.sent == []
+    assert transfer.manifest()["Buffers"]["points"]["Chunks"] == 3
+
+
+def test_window_limits_unacknowledged_chunks():
+    transfer, frontend = make()
+    transfer.publish("points", b"0123456789")
+    transfer.start()
+
+    assert [c["seq"] for c, _ in frontend.sent] == [0, 1]
+    frontend.ack(transfer, frontend.sent[0][0])
+    assert [c["seq"] for c, _ in frontend.sent] == [1, 2]
+
+
+def test_acks_deliver_every_chunk_once():
+    transfer, frontend = make()
+    transfer.publish("points", b"0123456789")
+    transfer.start()
+
+    received = bytearray(10)
+    while frontend.sent:
+        content, chunk = frontend.sent[0]
+        received[content["offset"] : content["offset"] + len(chunk)] = chunk
+        frontend.ack(transfer, content)
+
+    assert bytes(received) == b"0123456789"
+    assert transfer.progress()["points"] == {
+        "acked_bytes": 10,
+        "nbytes": 10,
+        "done": True,
+    }
+
+
+def test_progress_counts_acknowledged_chunks():
+    transfer, frontend = make()
+    transfer.publish("points", b"0123456789")
+    transfer.start()
+    frontend.ack(transfer, frontend.sent[0][0])
+
+    progress = transfer.progress()["points"]
+    assert progress["acked_bytes"] == 4
+    assert not progress["done"]
+
+
+def test_republish_supersedes_queued_chunks():
+    transfer, frontend = make(window=1)
+    transfer.publish("points", b"aaaaaaaa")
+    transfer.start()
+    old = frontend.sent[0][0]
+
+    transfer.publish("points", b"bbbbbbbb")
+    frontend.ack(transfer, old)
+    frontend.ack_all(transfer)
+
+    assert transfer.progress()["points"]["done"]
+    later = frontend.log[1:]
+    assert [c["seq"] for c in later] == [0, 1]
+    assert {c["version"] for c in later} == {old["version"] + 1}
+    assert transfer.published("points") == b"bbbbbbbb"
+
+
+def test_stale_ack_is_ignored():
+    transfer, frontend = make()
+    transfer.publish("points", b"0123")
+    transfer.start()
+    content = frontend.sent[0][0]
+
+    transfer.ack("points", content["version"] + 1, 0)
+
+    assert not transfer.progress()["points"]["done"]
+
+
+def test_dict_traits_are_sent_per_key():
+    transfer, frontend = make(chunk_bytes=16)
+    transfer.publish("genes", {"a": b"12", "b": b"345"})
+    transfer.start()
+
+    chunks = {c["id"]: (c["key"], chunk) for c, chunk in frontend.sent}
+    assert chunks == {"genes/a": ("a", b"12"), "genes/b": ("b", b"345")}
+    assert transfer.manifest()["Targets"]["genes"] == {
+        "Keyed": True,
+        "Buffers": ["genes/a", "genes/b"],
+    }
+
+    transfer.publish("genes", {"b": b"345"})
+    assert list(transfer.progress()) == ["genes/b"]
+
+
+def test_restart_resends_everything():
+    transfer, frontend = make(chunk_bytes=16)
+    transfer.publish("points", b"0123")
+    transfer.start()
+    frontend.ack_all(transfer)
+    assert transfer.progress()["points"]["done"]
+
+    transfer.start()
+
+    assert not transfer.progress()["points"]["done"]
+    assert [c["seq"] for c, _ in frontend.sent] == [0]